@@ -7,12 +7,11 @@
 @Email : tao.xu2008@outlook.com
 """
 
-from .xlog import LogConfig, log
-from .xlog2 import *
+import importlib
 """
 Default(config.ini):
-Save 30 days
-info logs rotating every 1MB
+Save 30 days (rotated segments older than 30 days are deleted, see rotation.py)
+info logs rotating every 1MB or at midnight
 error logs rotating every day
 """
 
@@ -23,6 +22,40 @@ __email__ = 'tao.xu2008@outlook.com'
 __names__ = 'xlogs'
 __url__ = 'https://github.com/txu2k8/python-xlogs'
 
+# public name -> submodule, imported on first access (PEP 562): `import xlogs`
+# stays cheap for tools which only call get_logger(), see test_import.py
+_LAZY_NAMES = {
+    'LogConfig': 'xlog', 'log': 'xlog',
+    'bind': 'context', 'unbind': 'context', 'get_context': 'context',
+}
+_LAZY_NAMES.update((name, 'xlog2') for name in (
+    'debug', 'info', 'warning', 'error', 'critical',
+    'get_logger', 'set_loglevel', 'get_inited_logger_name', 'basic_config',
+    'ROTATION', 'INFINITE', 'parse_msg', 'HybridRotatingFileHandler',
+    'OVERFLOW_BLOCK', 'OVERFLOW_DROP_OLDEST', 'OVERFLOW_DROP_NEWEST',
+    'backtrace_info', 'backtrace_debug', 'backtrace_warn', 'backtrace_error', 'backtrace_critical',
+    'debug_if', 'info_if', 'error_if', 'warn_if', 'critical_if',
+))
+__all__ = list(_LAZY_NAMES)
+# the submodules themselves, `xlogs.xlog2` as with the former star import
+_LAZY_NAMES.update(xlog='xlog', xlog2='xlog2')
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+    value = importlib.import_module('.' + module, __name__)
+    if name != module:
+        value = getattr(value, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
+
 
 if __name__ == '__main__':
     pass
@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : aio.py
+@Time  : 2026/10/19 01:10
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import asyncio
+
+from .queue_handler import AsyncQueueHandler, ThreadLocalQueueHandler, QUEUE_SIZE, OVERFLOW_DROP_OLDEST
+from . import xlog2
+
+"""
+Logging from coroutines without blocking the event loop: the records are
+only appended to the AsyncQueueHandler queue in the loop thread, the
+xlogs-writer thread formats and writes them. The default overflow policy
+drops the oldest records instead of making the loop wait for the writer.
+
+Each record gets the name of the asyncio task which logged it (`taskName`,
+the LogRecord attribute of Python 3.12+) and the values of the given
+ContextVars, as record attributes named like the variables.
+
+how to use:
+
+import contextvars
+from xlogs import aio
+
+request_id = contextvars.ContextVar('request_id')
+logger = aio.get_logger(logfile='service.log', context_vars=[request_id])
+
+async def handle(request):
+    request_id.set(request.headers['X-Request-Id'])
+    logger.info('start')            # never waits for the disk
+    ...
+    await logger.aflush()           # everything logged so far is written
+
+# fmt: '%(asctime)s %(taskName)s %(request_id)s %(levelname)s: %(message)s'
+python -m xlogs.bench.aio   # event loop lag while logging
+"""
+
+_MISSING = object()
+
+
+def attach_context(record, context_vars=()):
+    """set record.taskName (current asyncio task, None outside a task) and the context_vars values"""
+    if getattr(record, 'taskName', None) is None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            # no running event loop in this thread
+            task = None
+        record.taskName = task.get_name() if task is not None else None
+    for var in context_vars:
+        value = var.get(_MISSING)
+        if value is not _MISSING and var.name not in record.__dict__:
+            record.__dict__[var.name] = value
+    return record
+
+
+class AioQueueHandler(AsyncQueueHandler):
+    """
+    AsyncQueueHandler for event loops: records get the task name and the
+    context_vars values in the caller, flush / shutdown have awaitable
+    forms which wait in an executor thread.
+    """
+
+    def __init__(self, handlers, queue_size=QUEUE_SIZE, overflow=OVERFLOW_DROP_OLDEST, context_vars=()):
+        AsyncQueueHandler.__init__(self, handlers, queue_size=queue_size, overflow=overflow)
+        self.context_vars = tuple(context_vars)
+
+    def handle(self, record):
+        attach_context(record, self.context_vars)
+        return AsyncQueueHandler.handle(self, record)
+
+    async def aflush(self, timeout=None):
+        """wait until every record queued so far is written, without blocking the loop"""
+        await asyncio.get_running_loop().run_in_executor(None, self.flush, timeout)
+
+    async def ashutdown(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+
+
+def _flush_handlers(logger, timeout=None):
+    for handler in logger.handlers:
+        if isinstance(handler, (AsyncQueueHandler, ThreadLocalQueueHandler)):
+            handler.flush(timeout)
+        else:
+            handler.flush()
+
+
+async def aflush(logger, timeout=None):
+    """flush the handlers of logger (waiting for the async writer) in an executor thread"""
+    await asyncio.get_running_loop().run_in_executor(None, _flush_handlers, logger, timeout)
+
+
+def get_logger(*args, **kwargs):
+    """
+    xlog2.get_logger() with the handlers behind an AioQueueHandler,
+    kwargs: the LoggerConfig ones, overflow defaults to OVERFLOW_DROP_OLDEST,
+    context_vars: ContextVars copied to the records.
+    A logger already configured without asyncio mode is reconfigured (reset=True).
+    """
+    config = getattr(xlog2.LoggerConfig, '_instance', None)
+    logger = getattr(config, '_mylogger', None)
+    if logger is not None and not any(isinstance(h, AioQueueHandler) for h in logger.handlers):
+        kwargs['reset'] = True
+    kwargs['async_mode'] = xlog2.ASYNC_ASYNCIO
+    kwargs.setdefault('overflow', OVERFLOW_DROP_OLDEST)
+    return xlog2.get_logger(*args, **kwargs)
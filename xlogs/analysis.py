@@ -0,0 +1,245 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : analysis.py
+@Time  : 2026/10/18 19:30
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from functools import partial
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from .parser import LogParser, iter_segments, open_binary
+from .blockgzip import block_ranges, read_block, is_block_gzip
+from .compress import PENDING_SUFFIX
+from .xlog2 import FILE_FORMATE, INFO_FORMATE, DEBUG_FORMATE
+
+"""
+Count the records of a rotated log by level, logger name, source line
+(`filename[lineno]`) and time bucket on all cores.
+
+The segments are split into work units: byte ranges of plain files (cut
+anywhere, a unit counts the records whose first line starts inside it),
+the blocks of `gzip_blocks` archives, and whole other compressed archives.
+A ProcessPoolExecutor scans the units and the partial Aggregates are merged.
+
+how to use:
+
+from xlogs.analysis import analyze
+
+result = analyze('log/message.log', fmt=DEBUG_FORMATE, bucket=60, workers=8)
+print(result.levels.most_common(), result.srclines.most_common(10))
+
+python -m xlogs.analysis log/message.log --format debug --bucket 60 --workers 8
+"""
+
+# bytes of plain text per work unit
+CHUNK_SIZE = 32 * 1024 * 1024
+# seconds per time bucket
+BUCKET = 60
+
+
+class Aggregate(object):
+    """record counts of a scan, merge() partial results"""
+
+    def __init__(self):
+        self.records = 0
+        self.levels = Counter()
+        self.names = Counter()
+        self.srclines = Counter()
+        # bucket start (epoch seconds) -> records
+        self.buckets = Counter()
+        self.first = None
+        self.last = None
+
+    def merge(self, other):
+        self.records += other.records
+        self.levels.update(other.levels)
+        self.names.update(other.names)
+        self.srclines.update(other.srclines)
+        self.buckets.update(other.buckets)
+        if other.first is not None and (self.first is None or other.first < self.first):
+            self.first = other.first
+        if other.last is not None and (self.last is None or other.last > self.last):
+            self.last = other.last
+        return self
+
+    def as_dict(self, top=None):
+        return {
+            'records': self.records,
+            'first': self.first,
+            'last': self.last,
+            'levels': dict(self.levels.most_common()),
+            'names': dict(self.names.most_common(top)),
+            'srclines': dict(self.srclines.most_common(top)),
+            'buckets': {str(k): v for k, v in sorted(self.buckets.items())},
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, Aggregate) and self.as_dict() == other.as_dict()
+
+
+def work_units(logfile, chunk_size=CHUNK_SIZE):
+    """[(kind, path, a, b)]: ('range', path, begin, end) | ('block', path, coffset, length) | ('stream', path, 0, 0)"""
+    units = []
+    for segment in iter_segments(logfile):
+        name = segment[:-len(PENDING_SUFFIX)] if segment.endswith(PENDING_SUFFIX) else segment
+        ext = os.path.splitext(name)[1]
+        try:
+            if ext == '.gz' and is_block_gzip(segment):
+                units.extend(('block', segment, coffset, length) for coffset, length, _ in block_ranges(segment))
+            elif ext in ('.gz', '.zz', '.bz2', '.xz'):
+                units.append(('stream', segment, 0, 0))
+            else:
+                size = os.path.getsize(segment)
+                units.extend(('range', segment, begin, min(begin + chunk_size, size))
+                             for begin in range(0, size, chunk_size))
+        except FileNotFoundError:
+            # rotated or committed meanwhile
+            continue
+    return units
+
+
+def _range_lines(path, begin, end):
+    with open(path, 'rb') as f:
+        if begin > 0:
+            # the line crossing `begin` belongs to the previous unit
+            f.seek(begin - 1)
+            pos = begin - 1 + len(f.readline())
+        else:
+            pos = 0
+        while pos < end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line
+
+
+def _unit_lines(kind, path, a, b):
+    if kind == 'range':
+        return _range_lines(path, a, b)
+    elif kind == 'block':
+        return iter(read_block(path, a, b).splitlines(True))
+    return _closing_lines(open_binary(path))
+
+
+def _closing_lines(f):
+    with f:
+        for line in iter(f.readline, b''):
+            yield line
+
+
+def scan_unit(unit, fmt, datefmt=None, bucket=BUCKET, encoding='utf-8'):
+    """Aggregate of one work unit, runs in the pool workers"""
+    parser = LogParser(fmt, datefmt, encoding)
+    keys = [f for f in ('levelname', 'name', 'filename', 'lineno') if f in parser.fields]
+    has_time = 'asctime' in parser.fields
+    # one m.group() call per line: the key fields, then asctime
+    groups = [parser.fields.index(f) + 1 for f in keys + (['asctime'] if has_time else [])] or [0]
+    # asctime text of the second, without the ',%03d' milliseconds of the default layout
+    second = None if datefmt else -4
+    match = parser.regex.match
+    # asctime second -> {key fields: records}
+    seconds = {}
+    current_second = current = None
+    first = last = None
+    for line in _unit_lines(*unit):
+        m = match(line.decode(encoding, 'replace'))
+        if m is None:
+            continue
+        values = m.group(*groups) if len(groups) > 1 else (m.group(groups[0]),)
+        if has_time:
+            last = values[-1]
+            if first is None:
+                first = last
+            text = last[:second]
+            if text != current_second:
+                current_second = text
+                current = seconds.setdefault(text, {})
+            values = values[:-1]
+        elif current is None:
+            current = seconds.setdefault(None, {})
+        current[values] = current.get(values, 0) + 1
+
+    result = Aggregate()
+    counters = [(keys.index(f), counter) for f, counter in (('levelname', result.levels), ('name', result.names))
+                if f in keys]
+    srcline = 'filename' in keys and 'lineno' in keys
+    for text, counts in seconds.items():
+        total = sum(counts.values())
+        result.records += total
+        if text is not None:
+            result.buckets[int(parser.created(text + ',000' if second else text) // bucket * bucket)] += total
+        for values, count in counts.items():
+            for index, counter in counters:
+                counter[values[index]] += count
+            if srcline:
+                result.srclines['%s[%s]' % values[-2:]] += count
+    if first is not None:
+        result.first, result.last = parser.created(first), parser.created(last)
+    return result
+
+
+def analyze(logfile, fmt=FILE_FORMATE, datefmt=None, bucket=BUCKET, workers=None, chunk_size=CHUNK_SIZE,
+            executor=None):
+    """
+    Aggregate of all segments of logfile. workers: pool size, default
+    os.cpu_count(), 1 scans in this process; executor: an existing pool.
+    """
+    units = work_units(logfile, chunk_size)
+    result = Aggregate()
+    if not units:
+        return result
+    scan = partial(scan_unit, fmt=fmt, datefmt=datefmt, bucket=bucket)
+    if executor is not None:
+        partials = executor.map(scan, units)
+    elif workers == 1 or len(units) == 1:
+        partials = map(scan, units)
+    else:
+        with ProcessPoolExecutor(min(workers or os.cpu_count() or 1, len(units))) as pool:
+            partials = list(pool.map(scan, units))
+    for aggregate in partials:
+        result.merge(aggregate)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m xlogs.analysis', description='count xlogs records')
+    parser.add_argument('logfile', help='live log file, its rotated segments are counted too')
+    parser.add_argument('--format', default='info', help='info | debug | a logging format string')
+    parser.add_argument('--datefmt', default=None, help='datefmt of the log format')
+    parser.add_argument('--bucket', type=int, default=BUCKET, help='seconds per time bucket')
+    parser.add_argument('--workers', type=int, default=None, help='processes, default cpu count')
+    parser.add_argument('--top', type=int, default=20, help='rows of the name / source line tables')
+    parser.add_argument('--json', action='store_true', help='print the result as json')
+    args = parser.parse_args(argv)
+
+    fmt = {'info': INFO_FORMATE, 'debug': DEBUG_FORMATE}.get(args.format, args.format)
+    result = analyze(args.logfile, fmt, args.datefmt, args.bucket, args.workers)
+    if args.json:
+        print(json.dumps(result.as_dict(args.top), indent=2))
+        return 0
+    print('records: {0}'.format(result.records))
+    for title, counter, top in (('level', result.levels, None), ('logger', result.names, args.top),
+                                ('source line', result.srclines, args.top)):
+        if counter:
+            print('\n{0:>40} {1:>12}'.format(title, 'records'))
+            for key, count in counter.most_common(top):
+                print('{0:>40} {1:>12}'.format(key, count))
+    if result.buckets:
+        print('\n{0:>40} {1:>12}'.format('time (bucket %ds)' % args.bucket, 'records'))
+        for key, count in sorted(result.buckets.items()):
+            print('{0:>40} {1:>12}'.format(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(key)), count))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,16 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : __init__.py
+@Time  : 2026/10/18 12:20
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+"""
+Benchmarks, each module is runnable: python -m xlogs.bench.<module> --help
+The suite of the main logger configurations, JSON report: python -m xlogs.bench --help
+"""
+
+if __name__ == '__main__':
+    pass
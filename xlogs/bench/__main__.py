@@ -0,0 +1,19 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : __main__.py
+@Time  : 2026/10/19 03:40
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import sys
+
+from xlogs.bench.suite import main
+
+"""
+python -m xlogs.bench: the benchmark suite, see suite.py
+"""
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : aio.py
+@Time  : 2026/10/19 01:45
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+
+from xlogs.xlog2 import DEBUG_FORMATE
+from xlogs.formatter import FastFormatter
+from xlogs.queue_handler import AsyncQueueHandler
+from xlogs.aio import AioQueueHandler
+
+"""
+Event loop lag under heavy logging: producer coroutines log records in
+bursts while a ticker coroutine sleeps `tick` seconds in a loop and records
+how late it wakes up (p50 / p99 / max ms). The file write can be slowed down
+(`--write-delay` seconds per record) to mimic a busy disk. Cases: the file
+handler called in the loop, AsyncQueueHandler, AioQueueHandler.
+
+usage:
+python -m xlogs.bench.aio --records 20000 --write-delay 0.0001
+"""
+
+
+class _SlowFileHandler(logging.FileHandler):
+    def __init__(self, filename, delay=0.0):
+        logging.FileHandler.__init__(self, filename, encoding='utf-8')
+        self.delay = delay
+
+    def emit(self, record):
+        if self.delay:
+            time.sleep(self.delay)
+        logging.FileHandler.emit(self, record)
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def _measure(logger, records, producers, burst, tick):
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        loop = asyncio.get_running_loop()
+        while not done.is_set():
+            start = loop.time()
+            await asyncio.sleep(tick)
+            lags.append(loop.time() - start - tick)
+
+    async def producer(n):
+        for i in range(0, n, burst):
+            for j in range(i, min(n, i + burst)):
+                logger.info('request %d done in %.3fs', j, 0.25)
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(producer(records // producers) for _ in range(producers)))
+    produced = time.perf_counter() - start
+    done.set()
+    await task
+    return lags, produced
+
+
+def run(records=20000, producers=4, burst=50, tick=0.001, write_delay=0.0):
+    """return [(case, lag p50 ms, p99 ms, max ms, records/s in the loop)]"""
+    result = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ('file handler', 'AsyncQueueHandler', 'AioQueueHandler'):
+            file_handler = _SlowFileHandler(os.path.join(tmp, 'aio.log'), write_delay)
+            file_handler.setFormatter(FastFormatter(DEBUG_FORMATE))
+            if name == 'AsyncQueueHandler':
+                handler = AsyncQueueHandler([file_handler])
+            elif name == 'AioQueueHandler':
+                handler = AioQueueHandler([file_handler], queue_size=records)
+            else:
+                handler = file_handler
+            logger = logging.getLogger('bench.aio')
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.handlers = [handler]
+            lags, produced = asyncio.run(_measure(logger, records, producers, burst, tick))
+            handler.close()
+            result.append((name, round(_percentile(lags, 0.5) * 1e3, 2), round(_percentile(lags, 0.99) * 1e3, 2),
+                           round(max(lags or [0]) * 1e3, 2), int(records / produced)))
+        logging.getLogger('bench.aio').handlers = []
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='asyncio event loop lag while logging')
+    parser.add_argument('--records', type=int, default=20000, help='records logged per case')
+    parser.add_argument('--producers', type=int, default=4, help='logging coroutines')
+    parser.add_argument('--burst', type=int, default=50, help='records between two awaits')
+    parser.add_argument('--tick', type=float, default=0.001, help='ticker sleep, seconds')
+    parser.add_argument('--write-delay', type=float, default=0.0, help='extra seconds per written record')
+    args = parser.parse_args(argv)
+    print('{0:>18} {1:>10} {2:>10} {3:>10} {4:>12}'.format('case', 'p50 ms', 'p99 ms', 'max ms', 'records/s'))
+    for row in run(args.records, args.producers, args.burst, args.tick, args.write_delay):
+        print('{0:>18} {1:>10} {2:>10} {3:>10} {4:>12}'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : analysis.py
+@Time  : 2026/10/18 19:50
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from xlogs.xlog2 import DEBUG_FORMATE
+from xlogs.compress import compress_file, archive_ext
+from xlogs.analysis import analyze
+
+"""
+Scaling of xlogs.analysis over a synthetic rotated log in DEBUG_FORMATE:
+the same corpus is analyzed with 1, 2, 4 ... N processes and every result
+is checked against the single process one.
+
+usage:
+python -m xlogs.bench.analysis --size-mb 2048 --segments 8 --workers 8
+python -m xlogs.bench.analysis --codec gzip_blocks   # archives as block gzip
+"""
+
+LEVELS = ('DEBUG', 'INFO', 'INFO', 'INFO', 'WARNING', 'ERROR')
+NAMES = ('app', 'app.db', 'app.http', 'worker')
+SOURCES = (('views.py', 42), ('models.py', 108), ('tasks.py', 7), ('client.py', 233), ('util.py', 33))
+START = 1790000000
+
+
+def make_corpus(logfile, size_mb=256, segments=4, codec=None):
+    """write `segments` rotated segments + the live file, about size_mb MB of text in total"""
+    segment_size = size_mb * 1024 * 1024 // (segments + 1)
+    created = float(START)
+    seq = 0
+    paths = ['%s.%d' % (logfile, i) for i in range(segments, 0, -1)] + [logfile]
+    for path in paths:
+        lines = []
+        written = 0
+        with open(path, 'w') as f:
+            while written < segment_size:
+                for _ in range(1000):
+                    filename, lineno = SOURCES[seq % 5]
+                    asctime = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created))
+                    lines.append('%s,%03d %s %s[%d] [4242:140000] %s: request %d done\n' % (
+                        asctime, int(created * 1000) % 1000, NAMES[seq % 4], filename, lineno,
+                        LEVELS[seq % 6], seq))
+                    created += 0.0007
+                    seq += 1
+                chunk = ''.join(lines)
+                lines = []
+                f.write(chunk)
+                written += len(chunk)
+        if codec and path != logfile:
+            compress_file(path, path + archive_ext(codec), codec, 1)
+            os.remove(path)
+    return seq
+
+
+def run(size_mb=256, segments=4, workers=None, codec=None, log_dir=None):
+    """[(workers, seconds, MB/s, speedup)], aborts if a result differs"""
+    workers = workers or os.cpu_count() or 1
+    counts = []
+    n = 1
+    while n < workers:
+        counts.append(n)
+        n *= 2
+    counts.append(workers)
+    with tempfile.TemporaryDirectory(dir=log_dir) as tmp:
+        logfile = os.path.join(tmp, 'message.log')
+        records = make_corpus(logfile, size_mb, segments, codec)
+        rows = []
+        expect = None
+        for n in counts:
+            begin = time.perf_counter()
+            result = analyze(logfile, DEBUG_FORMATE, workers=n)
+            seconds = time.perf_counter() - begin
+            if result.records != records or (expect is not None and result != expect):
+                raise AssertionError('{0} workers: result differs'.format(n))
+            expect = expect or result
+            baseline = rows[0][1] if rows else seconds
+            rows.append((n, round(seconds, 2), round(size_mb / seconds, 1), round(baseline / seconds, 2)))
+        return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='analysis scaling benchmark')
+    parser.add_argument('--size-mb', type=int, default=256, help='MB of log text')
+    parser.add_argument('--segments', type=int, default=4, help='rotated segments besides the live file')
+    parser.add_argument('--workers', type=int, default=None, help='max processes, default cpu count')
+    parser.add_argument('--codec', default=None, help='compress the rotated segments, e.g. gzip_blocks')
+    parser.add_argument('--log-dir', default=None, help='directory of the corpus (default: temp dir)')
+    args = parser.parse_args(argv)
+    print('{0:>8} {1:>10} {2:>10} {3:>8}'.format('workers', 'seconds', 'MB/s', 'speedup'))
+    for row in run(args.size_mb, args.segments, args.workers, args.codec, args.log_dir):
+        print('{0:>8} {1:>10} {2:>10} {3:>7}x'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : backtrace.py
+@Time  : 2026/10/18 15:05
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import timeit
+import logging
+import argparse
+import threading
+
+from xlogs.xlog2 import get_logger, backtrace_debug, backtrace_info, LoggerConfig, INFO_FORMATE
+
+"""
+Cost of the backtrace_* helpers per call, for a disabled level (DEBUG with
+the logger at INFO) and an enabled one writing to a null stream, compared
+with the previous implementation which built the prefix before the level
+check.
+
+usage:
+python -m xlogs.bench.backtrace --number 200000
+"""
+
+
+class _NullStream(object):
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _legacy_log(method, msg, back_trace_len=0):
+    # the former _log_file_func_info + LoggerConfig() lookup, prefix built on every call
+    ptid = str(os.getpid()) + ':' + str(threading.current_thread().ident)
+    filename = os.path.basename(sys._getframe(2 + back_trace_len).f_code.co_filename)
+    lineno = sys._getframe(2 + back_trace_len).f_lineno
+    msg = '%s%s' % (' * [%s] [%s:%s] ' % (ptid, filename, lineno), msg)
+    getattr(LoggerConfig().m_logger, method)(msg)
+
+
+def legacy_debug(msg, back_trace_len=0):
+    _legacy_log('debug', msg, back_trace_len)
+
+
+def legacy_info(msg, back_trace_len=0):
+    _legacy_log('info', msg, back_trace_len)
+
+
+def setup():
+    logger = get_logger(logger_name='bench', output_logfile=False, print_console=False, reset=True)
+    handler = logging.StreamHandler(_NullStream())
+    handler.setFormatter(logging.Formatter(INFO_FORMATE))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+def run(number=100000):
+    """return {case: ns per call}"""
+    setup()
+    cases = [
+        ('disabled legacy', lambda: legacy_debug('hello world')),
+        ('disabled', lambda: backtrace_debug('hello world')),
+        ('enabled legacy', lambda: legacy_info('hello world')),
+        ('enabled', lambda: backtrace_info('hello world')),
+    ]
+    result = {}
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        result[name] = round(seconds / number * 1e9, 1)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='backtrace_* helpers microbenchmark')
+    parser.add_argument('--number', type=int, default=100000, help='calls per case')
+    args = parser.parse_args(argv)
+    for name, ns in run(args.number).items():
+        print('{0:>16}: {1:>10} ns/call'.format(name, ns))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
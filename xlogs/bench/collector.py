@@ -0,0 +1,120 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : collector.py
+@Time  : 2026/10/18 13:55
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import glob
+import time
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from logging.handlers import RotatingFileHandler
+
+from xlogs.xlog2 import FILE_FORMATE, FILE_MAXBYTES, _ProcessSafeRotatingFileHandler
+from xlogs.collector import CollectorHandler, run_collector
+
+"""
+Throughput of N worker processes logging through the collector compared with
+direct file writes from every process.
+
+modes:
+direct      every process writes its own file (RotatingFileHandler), the upper bound
+shared      every process writes the same file (process_safe handler)
+collector   every process sends batches to one collector process over a Unix socket
+
+usage:
+python -m xlogs.bench.collector --processes 8 --records 50000
+"""
+
+MODES = ('direct', 'shared', 'collector')
+
+
+def _worker(mode, target, records, payload, start):
+    if mode == 'direct':
+        handler = RotatingFileHandler('%s.%d' % (target, os.getpid()), maxBytes=FILE_MAXBYTES,
+                                      backupCount=100, encoding='utf-8')
+    elif mode == 'shared':
+        handler = _ProcessSafeRotatingFileHandler(target, maxBytes=FILE_MAXBYTES, backupCount=100)
+    else:
+        handler = CollectorHandler(target, spill_dir=os.path.dirname(target))
+    handler.setFormatter(logging.Formatter(FILE_FORMATE))
+    logger = logging.getLogger('bench')
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    fill = 'x' * payload
+    start.wait()
+    for seq in range(records):
+        logger.info('seq=%d %s', seq, fill)
+    handler.close()
+
+
+def _count_lines(pattern):
+    total = 0
+    for path in glob.glob(pattern):
+        if path.endswith('.lock') or path.endswith('.sock'):
+            continue
+        with open(path, 'rb') as f:
+            total += sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1024 * 1024), b''))
+    return total
+
+
+def run(processes=4, records=20000, payload=64, mode='collector'):
+    """time `processes` x `records` records until they are all on disk"""
+    ctx = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        logfile = os.path.join(tmp, 'message.log')
+        collector = None
+        target = logfile
+        if mode == 'collector':
+            target = os.path.join(tmp, 'xlogs.sock')
+            collector = run_collector(target, ctx=ctx, logger_name='collector', logfile=logfile,
+                                      print_console=False, maxsize=FILE_MAXBYTES, backup_count=100, buffered=True)
+        start = ctx.Event()
+        workers = [ctx.Process(target=_worker, args=(mode, target, records, payload, start))
+                   for _ in range(processes)]
+        for p in workers:
+            p.start()
+        begin = time.perf_counter()
+        start.set()
+        for p in workers:
+            p.join()
+        if collector is not None:
+            collector.terminate()
+            collector.join()
+        elapsed = time.perf_counter() - begin
+        written = _count_lines(glob.escape(logfile) + '*')
+    total = processes * records
+    return {
+        'mode': mode,
+        'processes': processes,
+        'records': total,
+        'written': written,
+        'seconds': round(elapsed, 4),
+        'records_per_sec': round(total / elapsed, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='collector vs direct file write throughput')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--records', type=int, default=20000, help='records per process')
+    parser.add_argument('--payload', type=int, default=64, help='payload bytes per record')
+    parser.add_argument('--mode', choices=MODES, action='append', help='default: all modes')
+    args = parser.parse_args(argv)
+    print('{0:>10} {1:>10} {2:>10} {3:>10} {4:>14}'.format('mode', 'records', 'written', 'seconds', 'records/s'))
+    for mode in args.mode or MODES:
+        r = run(args.processes, args.records, args.payload, mode)
+        print('{mode:>10} {records:>10} {written:>10} {seconds:>10} {records_per_sec:>14}'.format(**r))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : contention.py
+@Time  : 2026/10/19 04:20
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+from xlogs.xlog2 import get_logger, LoggerConfig, ASYNC_THREADS
+
+"""
+Many threads logging to one get_logger(gen_wf=True) file logger, half the
+records WARNING (written by the .wf handler too): the handlers called by
+each thread (sync), one AsyncQueueHandler (async), and the per-thread
+queues of ThreadLocalQueueHandler (threads). Records/s until everything is
+written, for 1, 8 and 64 threads.
+
+usage:
+python -m xlogs.bench.contention --records 20000 --threads 1 8 64
+"""
+
+MODES = (('sync', False), ('async', True), ('threads', ASYNC_THREADS))
+
+
+def _run_mode(async_mode, threads, records, log_dir):
+    logger = get_logger(logger_name='bench.contention', logfile=os.path.join(log_dir, 'contention.log'),
+                        print_console=False, gen_wf=True, async_mode=async_mode, reset=True)
+    per_thread = max(records // threads, 1)
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for i in range(per_thread // 2):
+            logger.info('record %d of the contention benchmark', i)
+            logger.warning('record %d of the contention benchmark', i)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    LoggerConfig().flush()
+    seconds = time.perf_counter() - start
+    LoggerConfig().shutdown()
+    for handler in logger.handlers:
+        handler.close()
+    return per_thread // 2 * 2 * threads / seconds
+
+
+def run(records=20000, thread_counts=(1, 8, 64)):
+    """return [(threads, {mode: records/s})]"""
+    result = []
+    for threads in thread_counts:
+        row = {}
+        for name, async_mode in MODES:
+            with tempfile.TemporaryDirectory() as log_dir:
+                row[name] = round(_run_mode(async_mode, threads, records, log_dir))
+        result.append((threads, row))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='multithreaded logging contention benchmark')
+    parser.add_argument('--records', type=int, default=20000, help='records per run, split between the threads')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 64], help='thread counts')
+    args = parser.parse_args(argv)
+    print('{0:>8} {1}'.format('threads', ' '.join('{0:>12}'.format(name + ' r/s') for name, _ in MODES)))
+    for threads, row in run(args.records, args.threads):
+        print('{0:>8} {1}'.format(threads, ' '.join('{0:>12}'.format(row[name]) for name, _ in MODES)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
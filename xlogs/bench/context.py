@@ -0,0 +1,80 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : context.py
+@Time  : 2026/10/19 02:30
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import sys
+import timeit
+import logging
+import argparse
+
+from xlogs.context import bind, clear_context
+from xlogs.formatter import FastFormatter
+
+"""
+Cost of request / tenant ids on every line: a LoggerAdapter building the
+`extra` dict per call vs the bound context rendered by FastFormatter
+(ns per formatted record, and per bind() of two fields).
+
+usage:
+python -m xlogs.bench.context --number 100000
+"""
+
+FMT = '%(asctime)s %(name)s %(levelname)s: %(message)s'
+
+
+class _FormatHandler(logging.Handler):
+    """format the records, write nothing"""
+
+    def emit(self, record):
+        self.format(record)
+
+
+class _ContextAdapter(logging.LoggerAdapter):
+    def process(self, msg, kwargs):
+        kwargs['extra'] = self.extra
+        return '[request_id=%s tenant=%s] %s' % (self.extra['request_id'], self.extra['tenant'], msg), kwargs
+
+
+def run(number=100000):
+    """return [(case, ns/call)]"""
+    logger = logging.getLogger('bench.context')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    handler = _FormatHandler()
+    logger.handlers = [handler]
+    adapter = _ContextAdapter(logger, {'request_id': 'abc', 'tenant': 't1'})
+    result = []
+
+    def _case(name, func, formatter):
+        handler.setFormatter(formatter)
+        seconds = min(timeit.repeat(func, number=number, repeat=3))
+        result.append((name, round(seconds / number * 1e9, 1)))
+
+    _case('no context', lambda: logger.info('disk %s is %d%% full', 'sda', 99), FastFormatter(FMT))
+    _case('LoggerAdapter', lambda: adapter.info('disk %s is %d%% full', 'sda', 99), FastFormatter(FMT))
+    with bind(request_id='abc', tenant='t1'):
+        _case('bound context', lambda: logger.info('disk %s is %d%% full', 'sda', 99),
+              FastFormatter(FMT, context=True))
+    seconds = min(timeit.repeat(lambda: bind(request_id='abc', tenant='t1').reset(), number=number, repeat=3))
+    result.append(('bind() + reset()', round(seconds / number * 1e9, 1)))
+    clear_context()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='log context benchmark')
+    parser.add_argument('--number', type=int, default=100000, help='calls per case')
+    args = parser.parse_args(argv)
+    print('{0:>20} {1:>12}'.format('case', 'ns/call'))
+    for row in run(args.number):
+        print('{0:>20} {1:>12}'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : fastpath.py
+@Time  : 2026/10/18 23:20
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import sys
+import timeit
+import logging
+import argparse
+
+from xlogs import xlog2
+from xlogs.xlog2 import get_logger, backtrace_debug, debug_if
+
+"""
+Overhead of a disabled DEBUG call (logger at INFO): an empty function call
+(the floor), a plain logging.Logger.debug(), the _FastLogger returned by
+get_logger(), the module level xlogs.debug() (root logger at WARNING),
+backtrace_debug() and debug_if(True, ...) (ns per call).
+
+usage:
+python -m xlogs.bench.fastpath --number 1000000
+"""
+
+
+def _noop(msg, *args, **kwargs):
+    pass
+
+
+def run(number=1000000):
+    """return [(case, ns/call)]"""
+    fast = get_logger(logger_name='bench.fastpath', output_logfile=False, print_console=False, reset=True)
+    fast.setLevel(logging.INFO)
+    logger = logging.getLogger('bench.fastpath.plain')
+    logger.setLevel(logging.INFO)
+    cases = (
+        ('no-op function', lambda: _noop('x %d', 1)),
+        ('logging.Logger', lambda: logger.debug('x %d', 1)),
+        ('get_logger()', lambda: fast.debug('x %d', 1)),
+        ('xlogs.debug()', lambda: xlog2.debug('x %d', 1)),
+        ('backtrace_debug', lambda: backtrace_debug('x')),
+        ('debug_if', lambda: debug_if(True, 'x')),
+    )
+    result = []
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        result.append((name, round(seconds / number * 1e9, 1)))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='disabled log call overhead')
+    parser.add_argument('--number', type=int, default=1000000, help='calls per case')
+    args = parser.parse_args(argv)
+    print('{0:>18} {1:>12}'.format('case', 'ns/call'))
+    for row in run(args.number):
+        print('{0:>18} {1:>12}'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
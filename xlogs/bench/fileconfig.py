@@ -0,0 +1,90 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : fileconfig.py
+@Time  : 2026/10/19 00:55
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import timeit
+import logging
+import argparse
+import tempfile
+
+from xlogs import fileconfig
+from xlogs.fileconfig import load_config, apply_config
+
+"""
+Reconfiguration cost of the package config.ini (ms per call): the former
+LogConfig._config() path (RawConfigParser, eval of the args, fileConfig()
+rebuilding every handler) vs the compiled config: parse, load from the
+pickled sidecar, cached load, and apply_config() with nothing changed.
+
+usage:
+python -m xlogs.bench.fileconfig --number 50
+"""
+
+CONFIG = os.path.join(os.path.dirname(fileconfig.__file__), 'config.ini')
+
+
+def _legacy(log_dir):
+    import configparser
+    import logging.config
+    cfg = configparser.RawConfigParser()
+    cfg.read(CONFIG)
+    for _, v in cfg.items('handlers'):
+        for vs in v.split(','):
+            for key, value in cfg.items('handler_' + vs):
+                if key == 'args':
+                    e = eval(value)
+                    if isinstance(e[0], str):
+                        value = str((log_dir + os.sep + os.path.basename(e[0]), *e[1:]))
+                        cfg.set('handler_' + vs, 'args', value)
+    logging.config.fileConfig(cfg)
+
+
+def _sidecar(cache_file):
+    fileconfig._CACHE.clear()
+    return load_config(CONFIG, cache_file)
+
+
+def run(number=50):
+    """return [(case, ms/call)]"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        cache_file = os.path.join(log_dir, 'config.ini.cache')
+        with open(CONFIG) as f:
+            text = f.read()
+        load_config(CONFIG, cache_file)
+        cases = (
+            ('fileConfig', lambda: _legacy(log_dir)),
+            ('parse', lambda: fileconfig.compile_config(text)),
+            ('sidecar load', lambda: _sidecar(cache_file)),
+            ('cached load', lambda: load_config(CONFIG, cache_file)),
+            ('apply, no change', lambda: apply_config(load_config(CONFIG), log_dir=log_dir)),
+        )
+        result = []
+        for name, func in cases:
+            seconds = min(timeit.repeat(func, number=number, repeat=3))
+            result.append((name, round(seconds / number * 1e3, 3)))
+        for _, handler in fileconfig._APPLIED.values():
+            handler.close()
+        fileconfig._APPLIED.clear()
+        logging.shutdown()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ini config reconfiguration benchmark')
+    parser.add_argument('--number', type=int, default=50, help='calls per case')
+    args = parser.parse_args(argv)
+    print('{0:>18} {1:>10}'.format('case', 'ms/call'))
+    for row in run(args.number):
+        print('{0:>18} {1:>10}'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : formatter.py
+@Time  : 2026/10/18 16:10
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import sys
+import time
+import timeit
+import logging
+import argparse
+
+from xlogs.xlog2 import INFO_FORMATE, DEBUG_FORMATE, DATE_FORMATE
+from xlogs.formatter import FastFormatter
+
+"""
+logging.Formatter vs xlogs FastFormatter, ns per record, for the xlogs
+formats. Every record's output is compared first, the benchmark aborts on
+any difference.
+
+usage:
+python -m xlogs.bench.formatter --number 200000
+"""
+
+CASES = (
+    ('INFO_FORMATE', INFO_FORMATE, None),
+    ('DEBUG_FORMATE', DEBUG_FORMATE, None),
+    ('CONSOLE (datefmt)', INFO_FORMATE, DATE_FORMATE),
+)
+
+
+def make_records(count=1000, start=None):
+    """records spread over a few seconds, as a busy logger produces them"""
+    start = time.time() if start is None else start
+    logger = logging.getLogger('bench.formatter')
+    records = []
+    for i in range(count):
+        record = logger.makeRecord(logger.name, logging.INFO, __file__, 42, 'request %d done in %.3fs',
+                                   (i, i / 7.0), None, 'make_records')
+        record.created = start + i * 0.003
+        record.msecs = int((record.created - int(record.created)) * 1000) + 0.0
+        records.append(record)
+    return records
+
+
+def run(number=100000):
+    """return [(case, logging ns/record, xlogs ns/record, speedup)]"""
+    records = make_records()
+    result = []
+    for name, fmt, datefmt in CASES:
+        std = logging.Formatter(fmt, datefmt)
+        fast = FastFormatter(fmt, datefmt)
+        for record in records:
+            if std.format(record) != fast.format(record):
+                raise AssertionError('{0}: output differs\n{1!r}\n{2!r}'.format(
+                    name, std.format(record), fast.format(record)))
+        timings = []
+        for formatter in (std, fast):
+            loops = max(1, number // len(records))
+            seconds = min(timeit.repeat(lambda: [formatter.format(r) for r in records], number=loops, repeat=3))
+            timings.append(seconds / (loops * len(records)) * 1e9)
+        result.append((name, round(timings[0], 1), round(timings[1], 1), round(timings[0] / timings[1], 2)))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='formatter benchmark')
+    parser.add_argument('--number', type=int, default=100000, help='records per case')
+    args = parser.parse_args(argv)
+    print('{0:>20} {1:>14} {2:>14} {3:>8}'.format('case', 'logging ns', 'xlogs ns', 'speedup'))
+    for row in run(args.number):
+        print('{0:>20} {1:>14} {2:>14} {3:>7}x'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
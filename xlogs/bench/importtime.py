@@ -0,0 +1,58 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : importtime.py
+@Time  : 2026/10/18 23:55
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import sys
+import argparse
+import statistics
+import subprocess
+
+"""
+Import cost of the package in a fresh interpreter (median of N runs, ms):
+`import xlogs`, `from xlogs import get_logger`, the ini LogConfig and the
+whole xlog2 module, with the modules each one loads. The test suite guards
+the module lists, see xlogs/test/test_import.py.
+
+usage:
+python -m xlogs.bench.importtime --runs 20
+"""
+
+CASES = (
+    ('import xlogs', 'import xlogs'),
+    ('get_logger', 'from xlogs import get_logger'),
+    ('LogConfig', 'from xlogs import LogConfig'),
+    ('xlogs.xlog2', 'import xlogs.xlog2'),
+)
+_TIMED = 'import sys, time\nt = time.perf_counter()\n{0}\nprint((time.perf_counter() - t) * 1e3, len(sys.modules))'
+
+
+def run(runs=10):
+    """return [(case, median ms, modules loaded)]"""
+    result = []
+    for name, code in CASES:
+        samples = []
+        for _ in range(runs):
+            output = subprocess.run([sys.executable, '-c', _TIMED.format(code)], stdout=subprocess.PIPE,
+                                    check=True, universal_newlines=True).stdout.split()
+            samples.append((float(output[0]), int(output[1])))
+        result.append((name, round(statistics.median(ms for ms, _ in samples), 2), samples[-1][1]))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='xlogs import time benchmark')
+    parser.add_argument('--runs', type=int, default=10, help='interpreters per case')
+    args = parser.parse_args(argv)
+    print('{0:>14} {1:>12} {2:>12}'.format('case', 'ms', 'modules'))
+    for row in run(args.runs):
+        print('{0:>14} {1:>12} {2:>12}'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
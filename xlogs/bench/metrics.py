@@ -0,0 +1,70 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : metrics.py
+@Time  : 2026/10/19 03:20
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import sys
+import timeit
+import logging
+import argparse
+
+from xlogs.metrics import Metrics, MetricsFilter
+from xlogs.formatter import FastFormatter
+
+"""
+Overhead of the pipeline metrics: one logger with a formatting handler,
+plain vs instrumented (MetricsFilter + timed formatter / emit), ns per
+record, and the cost of a snapshot().
+
+usage:
+python -m xlogs.bench.metrics --number 100000
+"""
+
+FMT = '%(asctime)s %(name)s %(levelname)s: %(message)s'
+
+
+class _FormatHandler(logging.Handler):
+    """format the records, write nothing"""
+
+    def emit(self, record):
+        self.format(record)
+
+
+def run(number=100000):
+    """return [(case, ns/call)]"""
+    result = []
+    metrics = Metrics()
+    for name in ('plain', 'metrics'):
+        logger = logging.getLogger('bench.metrics.' + name)
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        handler = _FormatHandler()
+        handler.setFormatter(FastFormatter(FMT))
+        logger.handlers = [handler]
+        if name == 'metrics':
+            logger.filters = [MetricsFilter(metrics)]
+            metrics.instrument(handler, 'bench')
+        seconds = min(timeit.repeat(lambda: logger.info('disk %s is %d%% full', 'sda', 99),
+                                    number=number, repeat=3))
+        result.append((name, round(seconds / number * 1e9, 1)))
+    seconds = min(timeit.repeat(metrics.snapshot, number=1000, repeat=3))
+    result.append(('snapshot()', round(seconds / 1000 * 1e9, 1)))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pipeline metrics benchmark')
+    parser.add_argument('--number', type=int, default=100000, help='calls per case')
+    args = parser.parse_args(argv)
+    print('{0:>12} {1:>12}'.format('case', 'ns/call'))
+    for row in run(args.number):
+        print('{0:>12} {1:>12}'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : multiprocess.py
+@Time  : 2026/10/18 12:24
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import re
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import multiprocessing
+from logging.handlers import RotatingFileHandler
+
+from xlogs.xlog2 import FILE_FORMATE, _ProcessSafeRotatingFileHandler, _ProcessSafeCompressedRotatingFileHandler
+from xlogs.parser import iter_segments, open_segment
+
+"""
+Stress N processes logging into one rotating log file, then read every
+segment back and check that no line is lost, duplicated or torn.
+
+usage:
+python -m xlogs.bench.multiprocess --processes 8 --records 20000 --maxbytes 1048576
+python -m xlogs.bench.multiprocess --mode unsafe   # stdlib RotatingFileHandler, for comparison
+"""
+
+MODES = ('safe', 'safe-compress', 'unsafe')
+LINE_RE = re.compile(r'^\S+ \S+ \S+ INFO: pid=(\d+) seq=(\d+) (x*)$')
+
+
+def _handler(mode, logfile, maxbytes, backup_count):
+    if mode == 'safe':
+        return _ProcessSafeRotatingFileHandler(logfile, maxBytes=maxbytes, backupCount=backup_count)
+    elif mode == 'safe-compress':
+        return _ProcessSafeCompressedRotatingFileHandler(logfile, maxBytes=maxbytes, backupCount=backup_count)
+    return RotatingFileHandler(logfile, maxBytes=maxbytes, backupCount=backup_count, encoding='utf-8')
+
+
+def _worker(mode, logfile, records, payload, maxbytes, backup_count, start):
+    # the unsafe mode fails rollover races, count them in verify() instead of printing tracebacks
+    logging.raiseExceptions = False
+    handler = _handler(mode, logfile, maxbytes, backup_count)
+    handler.setFormatter(logging.Formatter(FILE_FORMATE))
+    logger = logging.getLogger('bench')
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    pid = os.getpid()
+    fill = 'x' * payload
+    start.wait()
+    for seq in range(records):
+        logger.info('pid=%d seq=%d %s', pid, seq, fill)
+    handler.close()
+
+
+def _read_lines(logfile):
+    for path in iter_segments(logfile):
+        with open_segment(path) as f:
+            for line in f:
+                yield line.rstrip('\n')
+
+
+def verify(logfile, pids, records, payload):
+    """count lost / duplicated / torn lines of every writer"""
+    seen = {pid: set() for pid in pids}
+    torn = duplicated = 0
+    for line in _read_lines(logfile):
+        m = LINE_RE.match(line)
+        if m is None or len(m.group(3)) != payload or int(m.group(1)) not in seen:
+            torn += 1
+            continue
+        pid_seen = seen[int(m.group(1))]
+        seq = int(m.group(2))
+        if seq in pid_seen:
+            duplicated += 1
+        pid_seen.add(seq)
+    lost = sum(records - len(pid_seen) for pid_seen in seen.values())
+    return {'lost': lost, 'duplicated': duplicated, 'torn': torn}
+
+
+def run(processes=4, records=10000, payload=64, maxbytes=256 * 1024, mode='safe', log_dir=None):
+    """run the stress test, return a dict of throughput and integrity results"""
+    if mode not in MODES:
+        raise ValueError('mode must be one of {0}'.format(MODES))
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    with tempfile.TemporaryDirectory(dir=log_dir) as tmp:
+        logfile = os.path.join(tmp, 'message.log')
+        line_size = len(FILE_FORMATE) + payload + 64
+        # keep every segment so that all lines can be verified
+        backup_count = processes * records * line_size // maxbytes + 10
+        start = ctx.Event()
+        workers = [ctx.Process(target=_worker, args=(mode, logfile, records, payload, maxbytes, backup_count, start))
+                   for _ in range(processes)]
+        for p in workers:
+            p.start()
+        begin = time.perf_counter()
+        start.set()
+        for p in workers:
+            p.join()
+        elapsed = time.perf_counter() - begin
+        result = verify(logfile, [p.pid for p in workers], records, payload)
+        result.update({
+            'mode': mode,
+            'processes': processes,
+            'records': processes * records,
+            'seconds': round(elapsed, 4),
+            'records_per_sec': round(processes * records / elapsed, 1),
+            'segments': len([p for p in os.listdir(tmp) if not p.endswith('.lock')]),
+        })
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='multi-process rotating file handler stress benchmark')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--records', type=int, default=10000, help='records per process')
+    parser.add_argument('--payload', type=int, default=64, help='payload bytes per record')
+    parser.add_argument('--maxbytes', type=int, default=256 * 1024)
+    parser.add_argument('--mode', choices=MODES, default='safe')
+    args = parser.parse_args(argv)
+    result = run(args.processes, args.records, args.payload, args.maxbytes, args.mode)
+    for key, value in result.items():
+        print('{0:>16}: {1}'.format(key, value))
+    return 0 if not (result['lost'] or result['torn'] or result['duplicated']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : ratelimit.py
+@Time  : 2026/10/18 22:10
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import sys
+import timeit
+import logging
+import argparse
+
+from xlogs.xlog2 import _RateLimitFilter
+
+"""
+Cost of a hot `logger.warning()` call site: no filter, _RateLimitFilter
+passing the record, and _RateLimitFilter suppressing it (ns per call,
+handler is a no-op so only the logging call and the filter are measured).
+
+usage:
+python -m xlogs.bench.ratelimit --number 200000
+"""
+
+
+class _CountHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def run(number=100000):
+    """return [(case, ns/call, records passed)]"""
+    cases = (
+        ('no filter', None, logging.WARNING),
+        ('filter, passing', _RateLimitFilter(rate=1e12, burst=1e12, summary_interval=3600), logging.WARNING),
+        ('filter, suppressed', _RateLimitFilter(rate=1e-9, burst=1, summary_interval=3600), logging.WARNING),
+        ('filter, sampled out', _RateLimitFilter(rate=None, sample=0.0, summary_interval=3600), logging.INFO),
+    )
+    logger = logging.getLogger('bench.ratelimit')
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    result = []
+    for name, log_filter, level in cases:
+        handler = _CountHandler()
+        logger.handlers = [handler]
+        logger.filters = [log_filter] if log_filter else []
+        seconds = min(timeit.repeat(lambda: logger.log(level, 'disk %s is %d%% full', 'sda', 99),
+                                    number=number, repeat=3))
+        result.append((name, round(seconds / number * 1e9, 1), handler.count))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='rate limit filter benchmark')
+    parser.add_argument('--number', type=int, default=100000, help='calls per case')
+    args = parser.parse_args(argv)
+    print('{0:>22} {1:>12} {2:>12}'.format('case', 'ns/call', 'passed'))
+    for row in run(args.number):
+        print('{0:>22} {1:>12} {2:>12}'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : ringbuffer.py
+@Time  : 2026/10/18 22:50
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import timeit
+import logging
+import argparse
+import tempfile
+
+from xlogs.xlog2 import DEBUG_FORMATE, _RingBufferHandler
+from xlogs.formatter import FastFormatter
+
+"""
+Steady-state cost of a `logger.debug()` call: written by a FileHandler
+(DEBUG_FORMATE) vs kept by _RingBufferHandler, and the cost per record of
+dumping a full ring to the file (ns per record).
+
+usage:
+python -m xlogs.bench.ringbuffer --number 200000 --capacity 10000
+"""
+
+
+def run(number=100000, capacity=10000):
+    """return [(case, ns/record, bytes written)]"""
+    result = []
+    with tempfile.TemporaryDirectory() as tmp:
+        logfile = os.path.join(tmp, 'ring.log')
+        file_handler = logging.FileHandler(logfile, encoding='utf-8')
+        file_handler.setFormatter(FastFormatter(DEBUG_FORMATE))
+        ring = _RingBufferHandler(file_handler, capacity=capacity)
+        logger = logging.getLogger('bench.ringbuffer')
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        for name, handler in (('file handler', file_handler), ('ring buffer', ring)):
+            logger.handlers = [handler]
+            seconds = min(timeit.repeat(lambda: logger.debug('disk %s is %d%% full', 'sda', 99),
+                                        number=number, repeat=3))
+            file_handler.flush()
+            result.append((name, round(seconds / number * 1e9, 1), os.path.getsize(logfile)))
+        size = os.path.getsize(logfile)
+        count = len(ring)
+        seconds = timeit.timeit(ring.dump, number=1)
+        file_handler.flush()
+        result.append(('dump', round(seconds / max(1, count) * 1e9, 1), os.path.getsize(logfile) - size))
+        logger.handlers = []
+        ring.close()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ring buffer handler benchmark')
+    parser.add_argument('--number', type=int, default=100000, help='records per case')
+    parser.add_argument('--capacity', type=int, default=10000, help='records kept by the ring')
+    args = parser.parse_args(argv)
+    print('{0:>14} {1:>12} {2:>14}'.format('case', 'ns/record', 'bytes written'))
+    for row in run(args.number, args.capacity):
+        print('{0:>14} {1:>12} {2:>14}'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : serialize.py
+@Time  : 2026/10/18 20:40
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import io
+import sys
+import json
+import timeit
+import argparse
+
+from xlogs.xlog2 import DEBUG_FORMATE
+from xlogs.formatter import FastFormatter, JsonFormatter, BinaryFormatter
+from xlogs.parser import LogParser, parse_binary
+from xlogs.bench.formatter import make_records
+
+"""
+text (DEBUG_FORMATE) vs JSON vs binary records: ns per record to serialize
+into the file handler's buffer, bytes per record, and MB/s to read the
+output back (LogParser regex, json.loads per line, parse_binary). Every
+format is read back and compared with the records first.
+
+usage:
+python -m xlogs.bench.serialize --number 200000
+"""
+
+
+def _text_bytes(formatter, record, buf):
+    buf += (formatter.format(record) + '\n').encode('utf-8')
+    return buf
+
+
+def _json_lines(data):
+    return [json.loads(line) for line in io.BytesIO(data)]
+
+
+def run(number=100000):
+    """return [(format, serialize ns/record, bytes/record, read MB/s)]"""
+    records = make_records()
+    for i, record in enumerate(records):
+        record.request_id = i
+    text = FastFormatter(DEBUG_FORMATE)
+    cases = (
+        ('text', lambda r, buf: _text_bytes(text, r, buf),
+         lambda data: list(LogParser(DEBUG_FORMATE).parse(io.BytesIO(data)))),
+        ('json', JsonFormatter().format_bytes, _json_lines),
+        ('binary', BinaryFormatter().format_bytes, lambda data: list(parse_binary(io.BytesIO(data)))),
+    )
+    expect = [r.getMessage() for r in records]
+    result = []
+    for name, serialize, read in cases:
+        buf = bytearray()
+        for record in records:
+            serialize(record, buf)
+        data = bytes(buf)
+        back = read(data)
+        messages = [e['message'] for e in back] if name == 'json' else [e.message for e in back]
+        if messages != expect:
+            raise AssertionError('{0}: read back differs'.format(name))
+
+        def _serialize():
+            buf.clear()
+            for r in records:
+                serialize(r, buf)
+
+        loops = max(1, number // len(records))
+        seconds = min(timeit.repeat(_serialize, number=loops, repeat=3))
+        read_seconds = min(timeit.repeat(lambda: read(data), number=max(1, loops // 4), repeat=3))
+        result.append((name, round(seconds / (loops * len(records)) * 1e9, 1), round(len(data) / len(records), 1),
+                       round(len(data) * max(1, loops // 4) / read_seconds / 1e6, 1)))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='text / json / binary serialization benchmark')
+    parser.add_argument('--number', type=int, default=100000, help='records per case')
+    args = parser.parse_args(argv)
+    print('{0:>10} {1:>14} {2:>14} {3:>12}'.format('format', 'write ns', 'bytes/record', 'read MB/s'))
+    for row in run(args.number):
+        print('{0:>10} {1:>14} {2:>14} {3:>12}'.format(*row))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : suite.py
+@Time  : 2026/10/19 03:40
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import tempfile
+import threading
+
+import xlogs
+from xlogs import xlog2, fileconfig
+from xlogs.xlog import LogConfig
+from xlogs.xlog2 import get_logger, backtrace_info, LoggerConfig, INFO_FORMATE, DATE_FORMATE, \
+    DEFAULT_FIELD_STYLES, DEFAULT_LEVEL_STYLES, ASYNC_THREADS
+from xlogs.formatter import FastFormatter
+from xlogs.color_stream_handler import StyledStreamHandler
+
+"""
+End to end benchmark suite: records/s and ns/record of the main logger
+configurations, best of --repeat runs, written to JSON to compare versions.
+
+cases: get_logger() to a file (plain, gen_wf, compress, buffered, async),
+LogConfig from the package config.ini, plain vs colored console (null
+stream), backtrace_info(), a disabled debug() call, N threads logging to
+one file (direct and async_mode='threads'), and rollover heavy loggers (64KB files, with and without
+compression).
+
+usage:
+python -m xlogs.bench --number 20000 --output bench.json
+python -m xlogs.bench --compare bench.json      # ratios vs a previous run
+python -m xlogs.bench --case console --case threads --threads 64
+"""
+
+
+class _NullStream(object):
+    def write(self, data):
+        pass
+
+    def flush(self):
+        pass
+
+
+def _close(logger):
+    for handler in xlog2._iter_handlers(logger.handlers):
+        handler.close()
+
+
+def _file_case(**kwargs):
+    """time `number` logger.info() calls of get_logger(**kwargs) writing to log_dir"""
+    def case(number, log_dir):
+        logger = get_logger(logger_name='bench.suite', logfile=os.path.join(log_dir, 'bench.log'),
+                            print_console=False, reset=True, **kwargs)
+        method = logger.warning if kwargs.get('gen_wf') else logger.info
+        start = time.perf_counter()
+        for i in range(number):
+            method('record %d of the benchmark suite, some text to reach a usual length', i)
+        LoggerConfig().flush()
+        seconds = time.perf_counter() - start
+        LoggerConfig().shutdown()
+        _close(logger)
+        return seconds
+    return case
+
+
+def _handler_case(handler, call=None):
+    def case(number, log_dir):
+        logger = get_logger(logger_name='bench.suite', output_logfile=False, print_console=False, reset=True)
+        logger.addHandler(handler)
+        func = call or logger.info
+        start = time.perf_counter()
+        for i in range(number):
+            func('record %d of the benchmark suite' % i)
+        seconds = time.perf_counter() - start
+        logger.removeHandler(handler)
+        return seconds
+    return case
+
+
+def _console_handler():
+    handler = logging.StreamHandler(_NullStream())
+    handler.setFormatter(FastFormatter(INFO_FORMATE, DATE_FORMATE))
+    return handler
+
+
+def _disabled_case(number, log_dir):
+    logger = get_logger(logger_name='bench.suite', output_logfile=False, print_console=False, reset=True)
+    logger.setLevel(logging.INFO)
+    start = time.perf_counter()
+    for i in range(number):
+        logger.debug('record %d', i)
+    return time.perf_counter() - start
+
+
+def _threads_case(threads, async_mode=False):
+    def case(number, log_dir):
+        logger = get_logger(logger_name='bench.suite', logfile=os.path.join(log_dir, 'threads.log'),
+                            print_console=False, reset=True, gen_wf=True, async_mode=async_mode)
+        per_thread = max(number // threads, 1)
+        barrier = threading.Barrier(threads + 1)
+
+        def worker():
+            barrier.wait()
+            for i in range(per_thread):
+                logger.warning('record %d of the benchmark suite', i)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for worker_thread in workers:
+            worker_thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for worker_thread in workers:
+            worker_thread.join()
+        LoggerConfig().flush()
+        seconds = time.perf_counter() - start
+        LoggerConfig().shutdown()
+        _close(logger)
+        # timed for number records, whatever the rounding of per_thread
+        return seconds * number / (per_thread * threads)
+    return case
+
+
+def _logconfig_case(number, log_dir):
+    # apply_config() reconfigures root / test / info / error and disables the other loggers: restored after
+    saved = [(logger, logger.disabled, logger.handlers, logger.level, logger.propagate)
+             for logger in [logging.root] + list(logging.root.manager.loggerDict.values())
+             if isinstance(logger, logging.Logger)]
+    LogConfig(log_dir=log_dir).reset()
+    logger = logging.getLogger('info')
+    start = time.perf_counter()
+    for i in range(number):
+        logger.info('record %d of the benchmark suite, some text to reach a usual length', i)
+    seconds = time.perf_counter() - start
+    for _, handler in fileconfig._APPLIED.values():
+        handler.close()
+    fileconfig._APPLIED.clear()
+    for name in ('test', 'info', 'error'):
+        logging.getLogger(name).handlers = []
+    for logger, disabled, handlers, level, propagate in saved:
+        logger.disabled, logger.handlers, logger.level, logger.propagate = disabled, handlers, level, propagate
+    xlog2._refresh_fast_loggers()
+    return seconds
+
+
+def cases(threads=8):
+    """[(case name, func(number, log_dir) -> seconds)]"""
+    return [
+        ('file', _file_case()),
+        ('file gen_wf', _file_case(gen_wf=True)),
+        ('file compress', _file_case(compress=True)),
+        ('file buffered', _file_case(buffered=True)),
+        ('file async', _file_case(async_mode=True)),
+        ('console plain', _handler_case(_console_handler())),
+        ('console colored', _handler_case(StyledStreamHandler(
+            _NullStream(), INFO_FORMATE, DATE_FORMATE, DEFAULT_FIELD_STYLES, DEFAULT_LEVEL_STYLES))),
+        ('backtrace_info', _handler_case(_console_handler(), backtrace_info)),
+        ('disabled debug', _disabled_case),
+        ('threads %d' % threads, _threads_case(threads)),
+        ('threads %d local queues' % threads, _threads_case(threads, ASYNC_THREADS)),
+        ('rollover', _file_case(maxsize=64 * 1024, backup_count=3)),
+        ('rollover compress', _file_case(maxsize=64 * 1024, backup_count=3, compress=True)),
+        ('LogConfig config.ini', _logconfig_case),
+    ]
+
+
+def run(number=20000, repeat=3, threads=8, selected=None):
+    """return {case: {'records', 'seconds', 'records_per_s', 'ns_per_record'}}, the best of repeat runs"""
+    result = {}
+    for name, func in cases(threads):
+        if selected and not any(s in name for s in selected):
+            continue
+        best = None
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as log_dir:
+                seconds = func(number, log_dir)
+            best = seconds if best is None else min(best, seconds)
+        result[name] = {
+            'records': number,
+            'seconds': round(best, 6),
+            'records_per_s': round(number / best),
+            'ns_per_record': round(best / number * 1e9, 1),
+        }
+    return result
+
+
+def report(result, number, repeat, threads):
+    return {
+        'xlogs': xlogs.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'number': number,
+        'repeat': repeat,
+        'threads': threads,
+        'results': result,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m xlogs.bench', description='xlogs benchmark suite')
+    parser.add_argument('--number', type=int, default=20000, help='records per case')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case, the best one is kept')
+    parser.add_argument('--threads', type=int, default=8, help='threads of the contention case')
+    parser.add_argument('--case', action='append', help='only the cases whose name contains this, repeatable')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--compare', help='JSON report of a previous run, print the ns/record ratio')
+    args = parser.parse_args(argv)
+
+    result = run(args.number, args.repeat, args.threads, args.case)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+    print('{0:>22} {1:>12} {2:>14} {3:>8}'.format('case', 'records/s', 'ns/record', 'ratio' if baseline else ''))
+    for name, row in result.items():
+        ratio = ''
+        if name in baseline:
+            ratio = '{0:.2f}'.format(row['ns_per_record'] / baseline[name]['ns_per_record'])
+        print('{0:>22} {1:>12} {2:>14} {3:>8}'.format(name, row['records_per_s'], row['ns_per_record'], ratio))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report(result, args.number, args.repeat, args.threads), f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
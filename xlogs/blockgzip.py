@@ -0,0 +1,244 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : blockgzip.py
+@Time  : 2026/10/18 18:50
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import zlib
+import struct
+from bisect import bisect_right
+
+"""
+Block gzip archives: a `.gz` file of independent gzip members of ~1MB of
+text each, cut at line ends, plus an empty trailer member whose FEXTRA field
+holds the block index (compressed offset, text offset of every member).
+
+A multi-member gzip file is a valid gzip file: zcat, gzip.open() and
+xlogs.parser read it as usual. BlockGzipReader uses the trailer to seek()
+to any text offset or tail() the archive by decompressing only the members
+needed, and read_block() / block_ranges() let a process pool decompress
+the members in parallel.
+
+layout:
+member 0 | member 1 | ... | trailer member:
+  1f 8b 08 04 <mtime 0> 00 ff <XLEN> 'XL' <LEN> <text size Q, blocks I, (coffset Q, offset Q) * blocks, 'XLBK', trailer size I>
+  03 00 <crc32 0> <isize 0>
+"""
+
+BLOCK_SIZE = 1024 * 1024
+_MAGIC = b'XLBK'
+_SUBFIELD = b'XL'
+_INDEX_HEAD = struct.Struct('<QI')
+_INDEX_ENTRY = struct.Struct('<QQ')
+_FOOTER = struct.Struct('<4sI')
+# empty deflate stream + crc32 + isize of the trailer member
+_TRAILER_END = b'\x03\x00' + b'\x00' * 8
+_MAX_EXTRA = 0xffff - 4
+
+
+def _member(data, level):
+    compressor = zlib.compressobj(9 if level is None else level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _trailer(size, blocks):
+    # FEXTRA holds at most 64KB, keep every n-th block of huge archives (members stay independent)
+    stride = 1
+    while _INDEX_HEAD.size + len(blocks[::stride]) * _INDEX_ENTRY.size + _FOOTER.size > _MAX_EXTRA:
+        stride *= 2
+    blocks = blocks[::stride]
+    index = _INDEX_HEAD.pack(size, len(blocks)) + b''.join(_INDEX_ENTRY.pack(*b) for b in blocks)
+    trailer_size = 10 + 2 + 4 + len(index) + _FOOTER.size + len(_TRAILER_END)
+    payload = index + _FOOTER.pack(_MAGIC, trailer_size)
+    extra = _SUBFIELD + struct.pack('<H', len(payload)) + payload
+    return b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff' + struct.pack('<H', len(extra)) + extra + _TRAILER_END
+
+
+class BlockGzipFile(object):
+    """writable file object producing a block gzip archive on fileobj"""
+
+    def __init__(self, fileobj, level=None, block_size=BLOCK_SIZE):
+        self._fileobj = fileobj
+        self._level = level
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self._blocks = []
+        self._coffset = 0
+        self._offset = 0
+
+    def _write_member(self, data):
+        member = _member(bytes(data), self._level)
+        self._fileobj.write(member)
+        self._blocks.append((self._coffset, self._offset))
+        self._coffset += len(member)
+        self._offset += len(data)
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= self._block_size:
+            cut = self._buffer.rfind(b'\n', 0, self._block_size) + 1 or self._buffer.find(b'\n') + 1 \
+                or len(self._buffer)
+            self._write_member(self._buffer[:cut])
+            del self._buffer[:cut]
+        return len(data)
+
+    def close(self):
+        if self._buffer:
+            self._write_member(self._buffer)
+            self._buffer = bytearray()
+        self._fileobj.write(_trailer(self._offset, self._blocks))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_index(path):
+    """([(compressed offset, text offset)], text size, trailer offset), None if not a block gzip archive"""
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        tail_size = _FOOTER.size + len(_TRAILER_END)
+        if end < tail_size:
+            return None
+        f.seek(end - tail_size)
+        tail = f.read(tail_size)
+        if tail[-len(_TRAILER_END):] != _TRAILER_END:
+            return None
+        magic, trailer_size = _FOOTER.unpack_from(tail)
+        if magic != _MAGIC or trailer_size > end:
+            return None
+        f.seek(end - trailer_size)
+        trailer = f.read(trailer_size)
+    if trailer[:4] != b'\x1f\x8b\x08\x04' or trailer[12:14] != _SUBFIELD:
+        return None
+    size, count = _INDEX_HEAD.unpack_from(trailer, 16)
+    pos = 16 + _INDEX_HEAD.size
+    blocks = [entry for entry in _INDEX_ENTRY.iter_unpack(trailer[pos:pos + count * _INDEX_ENTRY.size])]
+    return blocks, size, end - trailer_size
+
+
+def is_block_gzip(path):
+    try:
+        return read_index(path) is not None
+    except OSError:
+        return False
+
+
+def block_ranges(path):
+    """[(compressed offset, compressed length, text offset)] of every indexed block"""
+    blocks, _, trailer_offset = read_index(path)
+    ranges = []
+    for i, (coffset, offset) in enumerate(blocks):
+        cend = blocks[i + 1][0] if i + 1 < len(blocks) else trailer_offset
+        ranges.append((coffset, cend - coffset, offset))
+    return ranges
+
+
+def read_block(path, coffset, length):
+    """decompressed text of the member(s) at [coffset, coffset + length), picklable for process pools"""
+    with open(path, 'rb') as f:
+        f.seek(coffset)
+        data = f.read(length)
+    out = []
+    while data:
+        decompressor = zlib.decompressobj(31)
+        out.append(decompressor.decompress(data))
+        data = decompressor.unused_data
+    return b''.join(out)
+
+
+class BlockGzipReader(object):
+    """random access binary reader of a block gzip archive: read(), readline(), seek(), tell(), tail()"""
+
+    def __init__(self, path):
+        index = read_index(path)
+        if index is None:
+            raise ValueError('not a block gzip archive: %s' % path)
+        self.path = path
+        self.size = index[1]
+        self._ranges = block_ranges(path)
+        self._offsets = [r[2] for r in self._ranges]
+        self._block = -1
+        self._data = b''
+        self._pos = 0
+
+    def _load(self, i):
+        if i != self._block:
+            coffset, length, _ = self._ranges[i]
+            self._data = read_block(self.path, coffset, length)
+            self._block = i
+
+    def _locate(self):
+        """load the block holding the current position, return the position inside it"""
+        i = bisect_right(self._offsets, self._pos) - 1
+        if i < 0:
+            return None
+        self._load(i)
+        inner = self._pos - self._offsets[i]
+        if inner >= len(self._data):
+            return None
+        return inner
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self.size
+        self._pos = max(0, min(offset, self.size))
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def readline(self):
+        parts = []
+        while self._pos < self.size:
+            inner = self._locate()
+            if inner is None:
+                break
+            end = self._data.find(b'\n', inner)
+            end = len(self._data) if end < 0 else end + 1
+            parts.append(self._data[inner:end])
+            self._pos += end - inner
+            if parts[-1].endswith(b'\n'):
+                break
+        return b''.join(parts)
+
+    def read(self, size=-1):
+        stop = self.size if size is None or size < 0 else min(self.size, self._pos + size)
+        parts = []
+        while self._pos < stop:
+            inner = self._locate()
+            if inner is None:
+                break
+            chunk = self._data[inner:inner + stop - self._pos]
+            parts.append(chunk)
+            self._pos += len(chunk)
+        return b''.join(parts)
+
+    def __iter__(self):
+        return iter(self.readline, b'')
+
+    def tail(self, lines=10):
+        """last `lines` lines, decompressing blocks from the end only until enough are found"""
+        data = b''
+        for coffset, length, _ in reversed(self._ranges):
+            data = read_block(self.path, coffset, length) + data
+            if data.count(b'\n') + (not data.endswith(b'\n')) >= lines:
+                break
+        return data.splitlines(True)[-lines:] if lines > 0 else []
+
+    def close(self):
+        self._data = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
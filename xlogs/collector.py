@@ -0,0 +1,378 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : collector.py
+@Time  : 2026/10/18 13:10
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import re
+import sys
+import time
+import socket
+import struct
+import signal
+import logging
+import threading
+import socketserver
+
+from .xlog2 import get_logger
+from .compress import WINDOWS, _pid_alive
+from .serialize import pack_record, unpack_records
+
+"""
+Collector mode: one process owns the LoggerConfig file handlers and rotation,
+worker processes send it their records instead of opening the log file.
+
+Records are packed in a compact binary layout and sent in batches, one frame
+per send over a Unix domain socket or a multiprocessing Connection (pipe).
+When the collector can not be reached the client appends the frames to a
+local spill file and replays it after reconnecting, together with the spill
+files left in the same spill_dir by dead (crashed / restarted) workers.
+
+how to use:
+
+# collector process
+from xlogs.collector import run_collector
+proc = run_collector('/tmp/xlogs.sock', logger_name='test', logfile='message.log')
+
+# worker processes
+import logging
+from xlogs.collector import CollectorHandler
+logger = logging.getLogger('worker')
+logger.addHandler(CollectorHandler('/tmp/xlogs.sock', spill_dir='/tmp'))
+logger.info('hello')
+
+frame  := <u32 frame length> <u32 record count> record*
+record := binary record of xlogs.formatter (pack_record), extra attributes included
+"""
+
+# client: send a frame once this many records are batched
+BATCH_SIZE = 256
+# client: send a partial batch after this many seconds
+FLUSH_INTERVAL = 0.5
+# client: seconds to wait before reconnecting to a collector that is down
+RETRY_INTERVAL = 1.0
+
+_FRAME = struct.Struct('<II')
+# xlogs-<pid>.spill, or xlogs-<pid>.spill.<claimer pid>.claim once another worker took it over
+_SPILL_NAME = re.compile(r'^xlogs-(\d+)\.spill(?:\.(\d+)\.claim)?$')
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1024 * 1024))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class CollectorHandler(logging.Handler):
+    """
+    Client handler: batch records and send them to the collector.
+
+    address is the collector's Unix socket path, or a multiprocessing
+    Connection. Frames which can not be sent go to `<spill_dir>/xlogs-<pid>.spill`
+    and are replayed after the next successful (re)connect. The spill files
+    of dead processes are renamed to a claim of this process first (only one
+    worker gets each) and replayed before its own.
+    """
+
+    def __init__(self, address, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 spill_dir=None, retry_interval=RETRY_INTERVAL, flush_level=logging.ERROR):
+        logging.Handler.__init__(self)
+        self.address = address
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_dir = spill_dir or os.path.join(os.getcwd(), 'log')
+        self.retry_interval = retry_interval
+        self.flush_level = flush_level
+        self._batch = bytearray()
+        self._count = 0
+        self._sock = None
+        self._next_retry = 0
+        self._timer = None
+        self._pid = os.getpid()
+        # check for frames spilled by an earlier process with the same pid
+        self._spilled = True
+
+    @property
+    def spill_file(self):
+        return os.path.join(self.spill_dir, 'xlogs-%d.spill' % os.getpid())
+
+    def _connect(self):
+        if not isinstance(self.address, str):
+            return self.address
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.address)
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+        return self._sock
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _send_bytes(self, data):
+        conn = self._connect()
+        if isinstance(conn, socket.socket):
+            conn.sendall(data)
+        else:
+            # multiprocessing Connection, one message per frame
+            view = memoryview(data)
+            while view:
+                length, _ = _FRAME.unpack_from(view)
+                conn.send_bytes(view[:length])
+                view = view[length:]
+
+    def _spill(self, frame):
+        if not os.path.isdir(self.spill_dir):
+            os.makedirs(self.spill_dir, exist_ok=True)
+        with open(self.spill_file, 'ab') as f:
+            f.write(frame)
+        self._spilled = True
+
+    def _claim_stale_spills(self):
+        """rename the spill files of dead processes to claims of this one, return the claims, oldest first"""
+        pid = os.getpid()
+        try:
+            names = os.listdir(self.spill_dir)
+        except OSError:
+            return []
+        claims = []
+        for name in names:
+            match = _SPILL_NAME.match(name)
+            if match is None:
+                continue
+            origin = int(match.group(1))
+            owner = int(match.group(2) or origin)
+            path = os.path.join(self.spill_dir, name)
+            if owner == pid:
+                if match.group(2) is not None:
+                    # claimed earlier, its replay failed
+                    claims.append(path)
+                continue
+            # os.kill() would terminate the process on Windows, no claims there
+            if WINDOWS or _pid_alive(owner):
+                continue
+            claim = os.path.join(self.spill_dir, 'xlogs-%d.spill.%d.claim' % (origin, pid))
+            if os.path.exists(claim):
+                continue
+            try:
+                os.rename(path, claim)
+            except OSError:
+                # claimed by another worker first
+                continue
+            claims.append(claim)
+        claims.sort(key=lambda path: os.stat(path).st_mtime)
+        return claims
+
+    def _replay(self):
+        if not self._spilled:
+            return
+        for spill_file in self._claim_stale_spills() + [self.spill_file]:
+            if os.path.exists(spill_file):
+                with open(spill_file, 'rb') as f:
+                    data = f.read()
+                if data:
+                    self._send_bytes(data)
+                os.remove(spill_file)
+        self._spilled = False
+
+    def _send_batch(self):
+        # caller holds self.lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._count:
+            return
+        frame = bytearray(_FRAME.pack(_FRAME.size + len(self._batch), self._count))
+        frame += self._batch
+        self._batch.clear()
+        self._count = 0
+        if time.monotonic() >= self._next_retry:
+            try:
+                self._replay()
+                self._send_bytes(frame)
+                return
+            except (OSError, EOFError):
+                self._disconnect()
+                self._next_retry = time.monotonic() + self.retry_interval
+        self._spill(frame)
+
+    def _on_timer(self):
+        self.acquire()
+        try:
+            self._timer = None
+            records = self._count
+            self._send_batch()
+        except Exception:
+            # e.g. the spill file can not be written: reported like a failed emit()
+            self.handleError(logging.makeLogRecord({
+                'msg': 'timed send of %d batched records to the collector', 'args': (records,)}))
+        finally:
+            self.release()
+
+    def emit(self, record):
+        try:
+            if self._pid != os.getpid():
+                # forked child: never share the parent's socket
+                self._sock = None
+                self._batch.clear()
+                self._count = 0
+                self._timer = None
+                self._pid = os.getpid()
+                self._spilled = True
+            pack_record(record, self._batch)
+            self._count += 1
+            if self._count >= self.batch_size or record.levelno >= self.flush_level:
+                self._send_batch()
+            elif self._timer is None and self.flush_interval:
+                self._timer = threading.Timer(self.flush_interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._send_batch()
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            self._send_batch()
+            self._disconnect()
+        finally:
+            self.release()
+        logging.Handler.close(self)
+
+
+class _FrameRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            head = _recv_exact(self.request, _FRAME.size)
+            if head is None:
+                return
+            length, count = _FRAME.unpack(head)
+            body = _recv_exact(self.request, length - _FRAME.size)
+            if body is None:
+                return
+            self.server.collector.dispatch(body, count)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = False
+    block_on_close = True
+
+
+class LogCollector(object):
+    """
+    Single writer: owns the LoggerConfig handlers (get_logger kwargs) and writes
+    every record received from the workers.
+    """
+
+    def __init__(self, address, **kwargs):
+        self.address = address
+        self.logger = get_logger(**kwargs)
+        self.received = 0
+        # dispatch() runs in a thread per connection
+        self._received_lock = threading.Lock()
+        self._server = None
+
+    def dispatch(self, data, count):
+        for record in unpack_records(data, count):
+            self.logger.handle(record)
+        with self._received_lock:
+            self.received += count
+
+    def serve_connection(self, conn):
+        """read frames from a multiprocessing Connection until the other end closes it"""
+        while True:
+            try:
+                frame = conn.recv_bytes()
+            except (EOFError, OSError):
+                return
+            length, count = _FRAME.unpack_from(frame)
+            self.dispatch(memoryview(frame)[_FRAME.size:length], count)
+
+    def bind(self):
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        self._server = _UnixServer(self.address, _FrameRequestHandler)
+        self._server.collector = self
+
+    def shutdown(self):
+        """stop serve_forever() running in another thread"""
+        if self._server is not None:
+            self._server.shutdown()
+
+    def serve_forever(self):
+        """serve the Unix socket until SIGTERM / SIGINT, then flush the handlers"""
+        if self._server is None:
+            self.bind()
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            for handler in self.logger.handlers:
+                handler.flush()
+            if os.path.exists(self.address):
+                os.remove(self.address)
+
+
+def _stop(signum, frame):
+    raise SystemExit(0)
+
+
+def _collector_main(address, ready, kwargs):
+    signal.signal(signal.SIGTERM, _stop)
+    collector = LogCollector(address, **kwargs)
+    collector.bind()
+    ready.set()
+    try:
+        collector.serve_forever()
+    finally:
+        logging.shutdown()
+
+
+def run_collector(address, ctx=None, **kwargs):
+    """
+    Start the collector in a new process listening on Unix socket `address`,
+    kwargs go to get_logger(). Return the process once it accepts connections,
+    stop it with process.terminate() + process.join().
+    """
+    if ctx is None:
+        import multiprocessing
+        ctx = multiprocessing.get_context()
+    ready = ctx.Event()
+    proc = ctx.Process(target=_collector_main, args=(address, ready, kwargs), name='xlogs-collector')
+    proc.start()
+    if not ready.wait(30):
+        proc.terminate()
+        raise RuntimeError('xlogs collector did not start on {0}'.format(address))
+    return proc
+
+
+if __name__ == '__main__':
+    # python -m xlogs.collector <socket path> [logfile]
+    _collector_main(sys.argv[1], threading.Event(),
+                    {'logfile': sys.argv[2] if len(sys.argv) > 2 else 'message.log', 'print_console': False})
@@ -7,8 +7,10 @@
 @Email : tao.xu2008@outlook.com
 """
 
+import sys
 import logging
-import platform
+
+from .formatter import ColoredFormatter
 
 """
 colored stream handler for python logging framework (use the ColorStreamHandler class).
@@ -144,8 +146,21 @@ class _WinColorStreamHandler(logging.StreamHandler):
         self._set_color(self.FOREGROUND_WHITE)
 
 
+class StyledStreamHandler(logging.StreamHandler):
+    """
+    ANSI colored console handler, a dependency-free replacement of coloredlogs.install().
+    field_styles / level_styles use the coloredlogs style dicts, e.g.
+    xlog2.DEFAULT_FIELD_STYLES / xlog2.DEFAULT_LEVEL_STYLES.
+    context: prefix the messages with the bound log context.
+    """
+    def __init__(self, stream=None, fmt=None, datefmt=None, field_styles=None, level_styles=None, context=False):
+        logging.StreamHandler.__init__(self, stream)
+        self.setFormatter(ColoredFormatter(fmt, datefmt, field_styles=field_styles, level_styles=level_styles,
+                                           context=context))
+
+
 # select ColorStreamHandler based on platform
-if platform.system() == 'Windows':
+if sys.platform.startswith('win'):
     ColorStreamHandler = _WinColorStreamHandler
 else:
     ColorStreamHandler = _AnsiColorStreamHandler
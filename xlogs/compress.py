@@ -0,0 +1,299 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : compress.py
+@Time  : 2026/10/18 11:02
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import glob
+import time
+import queue
+import threading
+
+"""
+Background compression of rotated log files.
+
+Rollover only renames the live file to `<logfile>.<time_ns>.pending` and
+submits a RolloverJob. One worker thread per process compresses the pending
+file into a temp file, then commits it atomically: shift the `.N<ext>`
+archives up, os.replace() the temp file to `.1<ext>` and remove the pending
+file. Pending files left over by a crash or kill are finished by recover()
+the next time a handler opens the same log file.
+With a job `index`, the `.idx` time/level index of the archive (query.py)
+is written next to it and shifted with it.
+
+ArchiveJob compresses a segment which already has its final name (the
+timestamped segments of rotation.py) in place, nothing is shifted.
+"""
+
+# codec name -> archive file extension
+COMPRESS_CODECS = {
+    'gzip': '.gz',
+    # ~1MB gzip members + trailer index, seekable and still zcat readable, see blockgzip.py
+    'gzip_blocks': '.gz',
+    'zlib': '.zz',
+    'bz2': '.bz2',
+    'lzma': '.xz',
+}
+COMPRESS_CODEC = 'gzip'
+PENDING_SUFFIX = '.pending'
+WINDOWS = sys.platform.startswith('win')
+
+
+class _ZlibFile(object):
+    """minimal writable file object for a raw zlib stream"""
+    def __init__(self, fileobj, level=None):
+        import zlib
+        self._fileobj = fileobj
+        self._compressor = zlib.compressobj(-1 if level is None else level)
+
+    def write(self, data):
+        self._fileobj.write(self._compressor.compress(data))
+
+    def close(self):
+        self._fileobj.write(self._compressor.flush())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _codec_writer(codec, fileobj, level=None):
+    """wrap a binary file object with the codec's compressing writer"""
+    if codec == 'gzip':
+        import gzip
+        return gzip.GzipFile(filename='', mode='wb', fileobj=fileobj,
+                             compresslevel=9 if level is None else level)
+    elif codec == 'gzip_blocks':
+        from .blockgzip import BlockGzipFile
+        return BlockGzipFile(fileobj, level)
+    elif codec == 'zlib':
+        return _ZlibFile(fileobj, level)
+    elif codec == 'bz2':
+        import bz2
+        return bz2.BZ2File(fileobj, 'wb', compresslevel=9 if level is None else level)
+    elif codec == 'lzma':
+        import lzma
+        return lzma.LZMAFile(fileobj, 'wb', preset=level)
+    raise ValueError('unknown compress codec {0!r}, expect one of {1}'.format(codec, sorted(COMPRESS_CODECS)))
+
+
+def archive_ext(codec):
+    """file extension of the archives written by `codec`"""
+    try:
+        return COMPRESS_CODECS[codec]
+    except KeyError:
+        raise ValueError('unknown compress codec {0!r}, expect one of {1}'.format(codec, sorted(COMPRESS_CODECS)))
+
+
+def compress_file(src, dst, codec=COMPRESS_CODEC, level=None):
+    """compress src into dst and fsync it, src is left in place"""
+    import shutil
+    with open(src, 'rb') as f_in, open(dst, 'wb') as raw:
+        with _codec_writer(codec, raw, level) as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def pending_name(base_filename, stamp):
+    return '%s.%d%s' % (base_filename, stamp, PENDING_SUFFIX)
+
+
+class _NullLock(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class RolloverJob(object):
+    """compress one pending file and commit it as `<base>.1<ext>`"""
+
+    def __init__(self, pending, base_filename, backup_count, codec=COMPRESS_CODEC, level=None, lock=None,
+                 index=None):
+        self.pending = pending
+        self.base_filename = base_filename
+        self.backup_count = backup_count
+        self.codec = codec
+        self.level = level
+        self.lock = lock or _NullLock()
+        # (fmt, datefmt): also write the `.idx` time/level index of the archive, see query.py
+        self.index = index
+        self.error = None
+        self.done = threading.Event()
+
+    def archive(self, index):
+        return '%s.%d%s' % (self.base_filename, index, archive_ext(self.codec))
+
+    def run(self):
+        if not os.path.exists(self.pending):
+            return
+        tmp = '%s%s.%d.tmp' % (self.pending, archive_ext(self.codec), os.getpid())
+        idx_tmp = '%s%s.idx.%d.tmp' % (self.pending, archive_ext(self.codec), os.getpid())
+        try:
+            compress_file(self.pending, tmp, self.codec, self.level)
+            indexed = self._write_index(tmp, idx_tmp)
+            with self.lock:
+                if not os.path.exists(self.pending):
+                    # committed by another process meanwhile
+                    os.remove(tmp)
+                    return
+                for i in range(self.backup_count - 1, 0, -1):
+                    sfn = self.archive(i)
+                    if os.path.exists(sfn):
+                        os.replace(sfn, self.archive(i + 1))
+                        self._shift_index(sfn, self.archive(i + 1))
+                os.replace(tmp, self.archive(1))
+                if indexed:
+                    os.replace(idx_tmp, self.archive(1) + '.idx')
+                elif os.path.exists(self.archive(1) + '.idx'):
+                    os.remove(self.archive(1) + '.idx')
+                os.remove(self.pending)
+        finally:
+            for path in (tmp, idx_tmp):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _write_index(self, archive, idx_path):
+        """index the pending text for the archive, a failure only costs the index"""
+        if not self.index:
+            return False
+        from .query import write_index
+        try:
+            write_index(archive, self.index[0], self.index[1], source=self.pending, path=idx_path)
+        except Exception as e:
+            sys.stderr.write('xlogs: index {0} failed: {1}\n'.format(self.pending, e))
+            return False
+        return True
+
+    @staticmethod
+    def _shift_index(src, dst):
+        if os.path.exists(src + '.idx'):
+            os.replace(src + '.idx', dst + '.idx')
+        elif os.path.exists(dst + '.idx'):
+            os.remove(dst + '.idx')
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def __str__(self):
+        return 'compress {0}'.format(self.pending)
+
+
+class ArchiveJob(RolloverJob):
+    """compress one rotated segment into `<segment><ext>` and remove the segment"""
+
+    def __init__(self, segment, codec=COMPRESS_CODEC, level=None, index=None):
+        super(ArchiveJob, self).__init__(segment, segment, 0, codec, level, None, index)
+
+    def run(self):
+        if not os.path.exists(self.pending):
+            return
+        archive = self.pending + archive_ext(self.codec)
+        tmp = '%s.%d.tmp' % (archive, os.getpid())
+        idx_tmp = '%s.idx.%d.tmp' % (archive, os.getpid())
+        try:
+            compress_file(self.pending, tmp, self.codec, self.level)
+            indexed = self._write_index(tmp, idx_tmp)
+            os.replace(tmp, archive)
+            if indexed:
+                os.replace(idx_tmp, archive + '.idx')
+            os.remove(self.pending)
+        finally:
+            for path in (tmp, idx_tmp):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+class _Compressor(object):
+    """single background thread running compression jobs in FIFO order"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        # observer(job, seconds) called after each job, see metrics.py
+        self.observers = []
+
+    def submit(self, job):
+        with self._lock:
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                # first use, or a forked child where the worker does not exist
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, args=(self._queue,),
+                                                name='xlogs-compressor', daemon=True)
+                self._thread.start()
+            self._queue.put(job)
+        return job
+
+    def _run(self, jobs):
+        while True:
+            job = jobs.get()
+            start = time.perf_counter()
+            try:
+                job.run()
+            except Exception as e:
+                job.error = e
+                sys.stderr.write('xlogs: {0} failed: {1}\n'.format(job, e))
+            finally:
+                # observed before done: wait_compressed() callers see the job measured
+                self._observe(job, time.perf_counter() - start)
+                job.done.set()
+
+    def _observe(self, job, seconds):
+        for observer in self.observers:
+            try:
+                observer(job, seconds)
+            except Exception as e:
+                sys.stderr.write('xlogs: compressor observer failed: {0}\n'.format(e))
+
+
+COMPRESSOR = _Compressor()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def remove_stale_tmp(pattern):
+    """remove the `<name>.<pid>.tmp` files matching the glob pattern whose process is gone"""
+    if WINDOWS:
+        # os.kill() would terminate the process on Windows, keep stale temp files there
+        return
+    for tmp in glob.glob(pattern):
+        pid = tmp.rsplit('.', 2)[-2]
+        if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def recover(base_filename, backup_count, codec=COMPRESS_CODEC, level=None, lock=None, index=None):
+    """
+    Resubmit pending files left by a previous run of `base_filename`, oldest
+    first, and remove temp files of dead processes. Return the submitted jobs.
+    index: (fmt, datefmt) of the `.idx` index, as for RolloverJob.
+    """
+    pattern = glob.escape(base_filename) + '.*' + PENDING_SUFFIX
+    remove_stale_tmp(pattern + '.*.tmp')
+    jobs = []
+    for pending in sorted(glob.glob(pattern)):
+        jobs.append(COMPRESSOR.submit(RolloverJob(pending, base_filename, backup_count, codec, level, lock, index)))
+    return jobs
@@ -0,0 +1,176 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : context.py
+@Time  : 2026/10/19 02:00
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import logging
+from contextvars import ContextVar
+
+"""
+Log context: key=value fields bound to the current thread / asyncio task
+(a ContextVar) and rendered on every record, without a LoggerAdapter.
+
+The context is an immutable linked snapshot: bind() prepends one node per
+field to the current snapshot, O(1) per field, nothing is copied, and the
+snapshots of other threads / tasks are not affected. A record only keeps a
+reference to the snapshot (`record.context`, set by ContextFilter or by the
+formatter); the rendered text is built once per snapshot and shared by all
+the records logged under it.
+
+how to use:
+
+from xlogs import bind, get_logger
+
+logger = get_logger()
+with bind(request_id='abc', tenant='t1'):
+    logger.info('start')    # ... INFO: [request_id=abc tenant=t1] start
+
+bind(user='tao')            # until the end of the current task / context
+
+fmt '%(context)s' renders 'request_id=abc tenant=t1', JsonFormatter adds
+the fields to the object, BinaryFormatter keeps them as a `context` extra.
+"""
+
+# longer chains are rebuilt without the shadowed fields
+MAX_DEPTH = 32
+
+
+class Context(object):
+    """one snapshot: the last bound field and the snapshot it was bound on"""
+    __slots__ = ('key', 'value', 'parent', 'depth', '_items', '_text')
+
+    def __init__(self, key=None, value=None, parent=None):
+        self.key = key
+        self.value = value
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self._items = None
+        self._text = None
+
+    @classmethod
+    def from_items(cls, items, parent=None):
+        context = parent if parent is not None else EMPTY
+        for key, value in items:
+            context = cls(key, value, context)
+        return context
+
+    def __bool__(self):
+        return self.depth > 0
+
+    def items(self):
+        """((key, value), ...) in bind order, a key rebound keeps its first position"""
+        if self._items is None:
+            nodes = []
+            node = self
+            while node.depth:
+                nodes.append(node)
+                node = node.parent
+            fields = {}
+            for node in reversed(nodes):
+                fields[node.key] = node.value
+            self._items = tuple(fields.items())
+        return self._items
+
+    def get(self, key, default=None):
+        node = self
+        while node.depth:
+            if node.key == key:
+                return node.value
+            node = node.parent
+        return default
+
+    @property
+    def text(self):
+        """'key=value key2=value2'"""
+        if self._text is None:
+            self._text = ' '.join(['%s=%s' % item for item in self.items()])
+        return self._text
+
+    @property
+    def prefix(self):
+        """'[key=value key2=value2] ', '' for the empty context"""
+        return '[' + self.text + '] ' if self.depth else ''
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return 'Context({0})'.format(self.text)
+
+    def __eq__(self, other):
+        return isinstance(other, Context) and self.items() == other.items()
+
+    def __hash__(self):
+        return hash(self.items())
+
+
+EMPTY = Context()
+_CONTEXT = ContextVar('xlogs_context', default=EMPTY)
+
+
+def current_context():
+    """the Context snapshot of the current thread / task"""
+    return _CONTEXT.get()
+
+
+class _Binding(object):
+    """bind() result: `with bind(...):` restores the previous context on exit"""
+    __slots__ = ('context', '_token')
+
+    def __init__(self, context, token):
+        self.context = context
+        self._token = token
+
+    def reset(self):
+        if self._token is not None:
+            _CONTEXT.reset(self._token)
+            self._token = None
+
+    def __enter__(self):
+        return self.context
+
+    def __exit__(self, *exc):
+        self.reset()
+
+
+def _set(context):
+    if context.depth > MAX_DEPTH:
+        # a long-lived context rebinding the same keys: drop the shadowed nodes
+        context = Context.from_items(context.items())
+    return _Binding(context, _CONTEXT.set(context))
+
+
+def bind(**fields):
+    """add fields to the context of the current thread / task"""
+    return _set(Context.from_items(fields.items(), _CONTEXT.get()))
+
+
+def unbind(*keys):
+    """remove fields from the context of the current thread / task"""
+    return _set(Context.from_items([item for item in _CONTEXT.get().items() if item[0] not in keys]))
+
+
+def clear_context():
+    return _Binding(EMPTY, _CONTEXT.set(EMPTY))
+
+
+def get_context():
+    """the fields of the current context as a dict"""
+    return dict(_CONTEXT.get().items())
+
+
+class ContextFilter(logging.Filter):
+    """
+    set record.context to the current snapshot when the record is logged,
+    for handlers which format it later in another thread (async writer,
+    ring buffer, collector)
+    """
+
+    def filter(self, record):
+        if 'context' not in record.__dict__:
+            record.context = _CONTEXT.get()
+        return True
@@ -0,0 +1,485 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : file_handler.py
+@Time  : 2026/10/19 11:05
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import time
+import logging
+import threading
+try:
+    import fcntl
+except ImportError:
+    # Windows, process_safe is not supported
+    fcntl = None
+from logging.handlers import RotatingFileHandler
+
+from .xlog2 import BUFFER_SIZE, BUFFER_RECORDS, FLUSH_INTERVAL, LoggerException
+from .compress import COMPRESSOR, COMPRESS_CODEC, RolloverJob, ArchiveJob, archive_ext, pending_name, recover
+from .rotation import JANITOR, MAX_AGE, next_rollover, next_segment, stamped_segments, segment_key, \
+    recover_segments
+
+"""
+The rotating file handlers of LoggerConfig(compress / buffered / process_safe
+/ rotate_when): imported with the first of them, so a logger without those
+options loads neither this module nor the compressor and the janitor.
+xlogs.xlog2 gives access to the same names.
+
+how to use:
+
+from xlogs.xlog2 import HybridRotatingFileHandler
+
+handler = HybridRotatingFileHandler('message.log', maxBytes=1024 ** 2, when='midnight', codec='gzip')
+"""
+
+
+class _CompressedRotatingFileHandler(RotatingFileHandler):
+    """
+    Compress and rotating file handler.
+
+    Rollover only renames the file to a `.pending` name and reopens the stream,
+    the compression runs on the background compressor thread (see compress.py).
+    """
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding=None, delay=False,
+                 codec=COMPRESS_CODEC, level=None, index=True):
+        archive_ext(codec)  # validate codec
+        # not `level`: that is the handler's log level
+        self.compress_codec = codec
+        self.compress_level = level
+        self.index = index
+        self._jobs = []
+        self._recovered = False
+        super(_CompressedRotatingFileHandler, self).__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+
+    def _recover(self):
+        """
+        finish the compression left over by a previous run, once: at the first
+        setFormatter() (the format of the archive's index), rollover or close
+        """
+        if self._recovered:
+            return
+        self._recovered = True
+        self._jobs.extend(recover(self.baseFilename, self.backupCount, self.compress_codec, self.compress_level,
+                                  self._commit_lock(), self._index_format()))
+
+    def setFormatter(self, fmt):
+        super(_CompressedRotatingFileHandler, self).setFormatter(fmt)
+        self._recover()
+
+    def _commit_lock(self):
+        """lock held by the compressor while it shifts the archives, None within one process"""
+        return None
+
+    def _index_format(self):
+        """(fmt, datefmt) for the archive's time/level index (xlogs.query), None if not indexable"""
+        formatter = self.formatter
+        if not self.index or formatter is None or type(formatter._style) is not logging.PercentStyle \
+                or not formatter.usesTime():
+            return None
+        return formatter._fmt, formatter.datefmt
+
+    def doRollover(self):
+        # the pending files of a previous run are older: committed first
+        self._recover()
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if self.backupCount > 0:
+            # Issue 18940: A file may not have been created if delay is True.
+            if os.path.exists(self.baseFilename):
+                pending = pending_name(self.baseFilename, time.time_ns())
+                os.rename(self.baseFilename, pending)
+                self._jobs = [job for job in self._jobs if not job.done.is_set()]
+                self._jobs.append(COMPRESSOR.submit(RolloverJob(
+                    pending, self.baseFilename, self.backupCount, self.compress_codec, self.compress_level,
+                    self._commit_lock(), self._index_format())))
+        if not self.delay:
+            self.stream = self._open()
+
+    def wait_compressed(self, timeout=None):
+        """wait for the background compression of the rotated files"""
+        self._recover()
+        for job in self._jobs:
+            job.wait(timeout)
+
+    def close(self):
+        super(_CompressedRotatingFileHandler, self).close()
+        self.wait_compressed()
+
+
+class _BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler which coalesces formatted records into one write().
+
+    Records are encoded into a byte buffer and written when buffer_size bytes,
+    buffer_records records or flush_interval seconds are reached, or at once
+    for records >= flush_level. The file size is tracked in memory instead of
+    calling tell() for every record, rollover still happens at maxBytes.
+    """
+    # time of the next time based rollover, set by HybridRotatingFileHandler
+    rollover_at = None
+    # the formatter's format_bytes() is used when it has one (json / binary)
+    uses_format_bytes = True
+
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding='utf-8',
+                 buffer_size=BUFFER_SIZE, buffer_records=BUFFER_RECORDS,
+                 flush_interval=FLUSH_INTERVAL, flush_level=logging.ERROR, **kwargs):
+        self.buffer_size = buffer_size
+        self.buffer_records = buffer_records
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self._buffer = bytearray()
+        self._records = 0
+        self._size = 0
+        self._timer = None
+        super(_BufferedRotatingFileHandler, self).__init__(filename, mode, maxBytes, backupCount, encoding, **kwargs)
+
+    def _open(self):
+        stream = open(self.baseFilename, 'wb' if self.mode.startswith('w') else 'ab')
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def _write_buffer(self):
+        # caller holds self.lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        if self.stream is None:
+            self.stream = self._open()
+        self.stream.write(self._buffer)
+        self.stream.flush()
+        self._size += len(self._buffer)
+        self._buffer.clear()
+        self._records = 0
+
+    def _on_timer(self):
+        self.acquire()
+        try:
+            self._timer = None
+            records = self._records
+            self._write_buffer()
+        except Exception:
+            # disk full, EIO...: reported like a failed emit(), the records stay buffered
+            self.handleError(logging.makeLogRecord({
+                'msg': 'timed write of %d buffered records to %s', 'args': (records, self.baseFilename)}))
+        finally:
+            self.release()
+
+    def _serialize(self, record):
+        """append the encoded record to the buffer, return its length"""
+        mark = len(self._buffer)
+        try:
+            format_bytes = getattr(self.formatter, 'format_bytes', None)
+            if format_bytes is not None:
+                # json / binary formatters serialize straight into the buffer
+                format_bytes(record, self._buffer)
+            else:
+                self._buffer += (self.format(record) + self.terminator).encode(self.encoding or 'utf-8')
+        except BaseException:
+            # drop a partly serialized record
+            del self._buffer[mark:]
+            raise
+        return len(self._buffer) - mark
+
+    def emit(self, record):
+        try:
+            length = self._serialize(record)
+            mark = len(self._buffer) - length
+            pending = self._size + mark
+            if (0 < self.maxBytes <= pending + length and pending > 0) \
+                    or (self.rollover_at is not None and record.created >= self.rollover_at):
+                data = self._buffer[mark:]
+                del self._buffer[mark:]
+                self._write_buffer()
+                self.doRollover()
+                self._buffer += data
+            self._records += 1
+            if len(self._buffer) >= self.buffer_size or self._records >= self.buffer_records \
+                    or record.levelno >= self.flush_level:
+                self._write_buffer()
+            elif self._timer is None and self.flush_interval:
+                self._timer = threading.Timer(self.flush_interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        super(_BufferedRotatingFileHandler, self).doRollover()
+        if self.stream is None:
+            self.stream = self._open()
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._write_buffer()
+        finally:
+            self.release()
+
+    def close(self):
+        self.acquire()
+        try:
+            self._write_buffer()
+        finally:
+            self.release()
+        super(_BufferedRotatingFileHandler, self).close()
+
+
+class _BufferedCompressedRotatingFileHandler(_BufferedRotatingFileHandler, _CompressedRotatingFileHandler):
+    """Buffered writes, compress and rotating file handler"""
+
+
+class HybridRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotate on whichever comes first: maxBytes, or the `when` * interval time
+    boundary (S, M, H, D / midnight, local time).
+
+    Rollover renames the file to a timestamped segment `<logfile>.<%Y%m%d-%H%M%S>`
+    (no rename cascade), optionally compressed in the background (`codec`).
+    Segments older than max_age seconds, beyond backupCount, or over the
+    total_bytes budget of the log directory are deleted by the retention jobs
+    of the janitor, never in emit(). See rotation.py.
+    """
+    rollover_at = None
+
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding=None, delay=False,
+                 when='midnight', interval=1, max_age=MAX_AGE, total_bytes=None, codec=None, level=None,
+                 index=True):
+        self.when = when
+        self.interval = interval
+        self.max_age = max_age
+        self.total_bytes = total_bytes
+        self.compress_codec = codec
+        self.compress_level = level
+        self.index = index
+        self._jobs = []
+        self._recovered = False
+        super(HybridRotatingFileHandler, self).__init__(filename, mode, maxBytes, backupCount, encoding, delay)
+        segments = stamped_segments(self.baseFilename)
+        self._last = segment_key(self.baseFilename, segments[-1]) if segments else None
+        if when:
+            # a live file left by a previous run rolls at the boundary after its last write
+            try:
+                start = os.path.getmtime(self.baseFilename)
+            except FileNotFoundError:
+                start = time.time()
+            self.rollover_at = next_rollover(start, when, interval)
+        JANITOR.register(self.baseFilename, max_age, backupCount, total_bytes)
+        self._jobs.extend(JANITOR.submit(os.path.dirname(self.baseFilename)))
+
+    _index_format = _CompressedRotatingFileHandler._index_format
+
+    def setFormatter(self, fmt):
+        super(HybridRotatingFileHandler, self).setFormatter(fmt)
+        self._recover()
+
+    def _recover(self):
+        """compress the segments left by a previous run, once: at the first setFormatter(), rollover or close"""
+        if self._recovered:
+            return
+        self._recovered = True
+        if self.compress_codec:
+            self._jobs.extend(recover_segments(self.baseFilename, self.compress_codec, self.compress_level,
+                                               self._index_format()))
+
+    def shouldRollover(self, record):
+        if self.rollover_at is not None and record.created >= self.rollover_at:
+            return True
+        return super(HybridRotatingFileHandler, self).shouldRollover(record)
+
+    def doRollover(self):
+        self._recover()
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        now = time.time()
+        try:
+            size = os.path.getsize(self.baseFilename)
+        except FileNotFoundError:
+            size = 0
+        if size:
+            self._last, segment = next_segment(self.baseFilename, now, self._last)
+            os.rename(self.baseFilename, segment)
+            self._jobs = [job for job in self._jobs if not job.done.is_set()]
+            if self.compress_codec:
+                self._jobs.append(COMPRESSOR.submit(ArchiveJob(
+                    segment, self.compress_codec, self.compress_level, self._index_format())))
+            self._jobs.extend(JANITOR.submit(os.path.dirname(self.baseFilename)))
+        if self.rollover_at is not None:
+            self.rollover_at = next_rollover(now, self.when, self.interval)
+        if not self.delay:
+            self.stream = self._open()
+
+    def wait_compressed(self, timeout=None):
+        """wait for the background compression and retention jobs"""
+        self._recover()
+        for job in self._jobs:
+            job.wait(timeout)
+
+    def close(self):
+        super(HybridRotatingFileHandler, self).close()
+        JANITOR.unregister(self.baseFilename)
+        self.wait_compressed()
+
+
+class _BufferedHybridRotatingFileHandler(_BufferedRotatingFileHandler, HybridRotatingFileHandler):
+    """Buffered writes, size or time rotating file handler"""
+
+
+class _FileLock(object):
+    """
+    flock() on a side lock file, shared by every process writing one log file.
+
+    Use as context manager for an exclusive lock that opens and closes its own
+    fd, flock() conflicts between separate open() calls even in one process.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def _lock(self, operation):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, operation)
+
+    def acquire_shared(self):
+        self._lock(fcntl.LOCK_SH)
+
+    def acquire(self):
+        self._lock(fcntl.LOCK_EX)
+
+    def release(self):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        self.close()
+
+
+class _ProcessSafeRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler for several processes (e.g. pre-fork workers)
+    writing the same log file.
+
+    Every record is a single os.write() on an O_APPEND fd under a shared lock
+    on `<logfile>.lock`, so lines are never torn. Rollover takes the exclusive
+    lock and re-checks the size, so only one process rotates; the others see
+    the inode change on their next write and just reopen the file.
+    """
+    uses_format_bytes = True
+
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding='utf-8', delay=False, **kwargs):
+        if fcntl is None:
+            raise LoggerException('process_safe file handler is not supported on this platform')
+        self._fd = None
+        self._ino = None
+        self._file_lock = _FileLock(os.path.abspath(os.fspath(filename)) + '.lock')
+        # the stream is never opened, records go to self._fd
+        super(_ProcessSafeRotatingFileHandler, self).__init__(
+            filename, 'a', maxBytes, backupCount, encoding, delay=True, **kwargs)
+        if not delay:
+            self._file_lock.acquire_shared()
+            try:
+                self._reopen()
+            finally:
+                self._file_lock.release()
+
+    def _commit_lock(self):
+        return _FileLock(self._file_lock.path)
+
+    def _reopen(self):
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        st = os.fstat(self._fd)
+        self._ino = st.st_ino
+        return st.st_size
+
+    def _current_size(self):
+        """size of the live file, reopen first if another process rotated it"""
+        try:
+            st = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return self._reopen()
+        if self._fd is None or st.st_ino != self._ino:
+            return self._reopen()
+        return st.st_size
+
+    def _need_rollover(self, size, length):
+        return self.maxBytes > 0 and self.backupCount > 0 and size > 0 and size + length >= self.maxBytes
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+
+    def emit(self, record):
+        try:
+            format_bytes = getattr(self.formatter, 'format_bytes', None)
+            if format_bytes is not None:
+                data = format_bytes(record, bytearray())
+            else:
+                data = (self.format(record) + self.terminator).encode(self.encoding or 'utf-8')
+            self._file_lock.acquire_shared()
+            try:
+                rollover = self._need_rollover(self._current_size(), len(data))
+                if not rollover:
+                    self._write(data)
+            finally:
+                self._file_lock.release()
+            if rollover:
+                # flock can not be upgraded atomically, re-check under the exclusive lock
+                self._file_lock.acquire()
+                try:
+                    if self._need_rollover(self._current_size(), len(data)):
+                        self.doRollover()
+                    self._write(data)
+                finally:
+                    self._file_lock.release()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def doRollover(self):
+        # caller holds the exclusive lock
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        super(_ProcessSafeRotatingFileHandler, self).doRollover()
+        self._reopen()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.acquire()
+        try:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._file_lock.close()
+        finally:
+            self.release()
+        super(_ProcessSafeRotatingFileHandler, self).close()
+
+
+class _ProcessSafeCompressedRotatingFileHandler(_ProcessSafeRotatingFileHandler, _CompressedRotatingFileHandler):
+    """Process safe, compress and rotating file handler"""
@@ -0,0 +1,331 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : fileconfig.py
+@Time  : 2026/10/19 00:20
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import ast
+import logging
+import pickle
+import importlib
+import threading
+from collections import namedtuple
+
+"""
+Compiled logging.config.fileConfig() ini files: parsed once into a
+CompiledConfig, cached by mtime (and content hash) in memory and optionally
+in a pickled sidecar file, then applied incrementally: a handler whose
+class, args and kwargs did not change is kept (only its level and formatter
+are set again), the others are built, and the replaced / removed ones are
+closed. Loggers are configured like fileConfig(), disable_existing_loggers
+included.
+
+args / kwargs are not eval()ed: they may only hold literals, tuples, lists,
+dicts and dotted names (`sys.stdout`, `handlers.SysLogHandler.LOG_USER`),
+resolved from the logging namespace first like fileConfig() does.
+
+how to use:
+
+from xlogs.fileconfig import load_config, apply_config
+
+config = load_config('config.ini', cache_file='config.ini.cache')
+apply_config(config, log_dir='log')
+# after editing config.ini: only the changed handlers are rebuilt
+apply_config(load_config('config.ini'), log_dir='log')
+"""
+
+# bumped when the pickled CompiledConfig layout changes
+CACHE_VERSION = 1
+
+FormatterSpec = namedtuple('FormatterSpec', 'class_name fmt datefmt style')
+HandlerSpec = namedtuple('HandlerSpec', 'class_name args kwargs level formatter target')
+LoggerSpec = namedtuple('LoggerSpec', 'level handlers propagate')
+
+
+class Ref(object):
+    """a dotted name of an args / kwargs expression, resolved when the handler is built"""
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Ref) and self.name == other.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return 'Ref({0!r})'.format(self.name)
+
+    def __getstate__(self):
+        return self.name
+
+    def __setstate__(self, state):
+        self.name = state
+
+
+class CompiledConfig(object):
+    """formatters / handlers / loggers specs of one ini file, picklable"""
+
+    def __init__(self, digest, formatters, handlers, root, loggers):
+        self.digest = digest
+        # name -> FormatterSpec, name -> HandlerSpec (in the [handlers] order)
+        self.formatters = formatters
+        self.handlers = handlers
+        # LoggerSpec of the root logger, qualname -> LoggerSpec
+        self.root = root
+        self.loggers = loggers
+
+    def __eq__(self, other):
+        return isinstance(other, CompiledConfig) and self.__dict__ == other.__dict__
+
+
+def _dotted(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return _dotted(node.value) + '.' + node.attr
+    raise ValueError('unsupported expression {0}'.format(ast.dump(node)))
+
+
+def _convert(node):
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)) \
+            and isinstance(node.operand, ast.Constant) and isinstance(node.operand.value, (int, float)):
+        return -node.operand.value if isinstance(node.op, ast.USub) else node.operand.value
+    if isinstance(node, ast.Tuple):
+        return tuple(_convert(e) for e in node.elts)
+    if isinstance(node, ast.List):
+        return [_convert(e) for e in node.elts]
+    if isinstance(node, ast.Dict):
+        return {_convert(k): _convert(v) for k, v in zip(node.keys, node.values)}
+    return Ref(_dotted(node))
+
+
+def compile_expr(text):
+    """args / kwargs text -> value, dotted names as Ref; ValueError for calls, operators..."""
+    try:
+        tree = ast.parse(text.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError('invalid expression {0!r}: {1}'.format(text, e))
+    try:
+        return _convert(tree.body)
+    except ValueError as e:
+        raise ValueError('{0!r}: {1}'.format(text, e))
+
+
+def _import_attr(found, used, part):
+    try:
+        return getattr(found, part), used + '.' + part
+    except AttributeError:
+        importlib.import_module(used + '.' + part)
+        return getattr(found, part), used + '.' + part
+
+
+def resolve(name):
+    """the object of a dotted name: logging namespace first (`StreamHandler`, `handlers.X`), then imports"""
+    parts = name.split('.')
+    try:
+        found, used = _import_attr(logging, 'logging', parts[0])
+    except ImportError:
+        found, used = importlib.import_module(parts[0]), parts[0]
+    for part in parts[1:]:
+        found, used = _import_attr(found, used, part)
+    return found
+
+
+def resolve_value(value):
+    if isinstance(value, Ref):
+        return resolve(value.name)
+    if isinstance(value, tuple):
+        return tuple(resolve_value(v) for v in value)
+    if isinstance(value, list):
+        return [resolve_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: resolve_value(v) for k, v in value.items()}
+    return value
+
+
+def _keys(text):
+    return [key.strip() for key in text.split(',') if key.strip()]
+
+
+def compile_config(text, digest=None):
+    """CompiledConfig of the text of a fileConfig() ini file"""
+    import configparser
+    cp = configparser.RawConfigParser()
+    cp.read_string(text)
+    formatters = {}
+    for name in _keys(cp.get('formatters', 'keys', fallback='')):
+        section = cp['formatter_' + name]
+        formatters[name] = FormatterSpec(section.get('class') or None, section.get('format'),
+                                         section.get('datefmt'), section.get('style', '%'))
+    handlers = {}
+    for name in _keys(cp.get('handlers', 'keys', fallback='')):
+        section = cp['handler_' + name]
+        handlers[name] = HandlerSpec(section['class'], compile_expr(section.get('args', '()')),
+                                     compile_expr(section.get('kwargs', '{}')), section.get('level') or None,
+                                     section.get('formatter') or None, section.get('target') or None)
+    root = None
+    loggers = {}
+    for name in _keys(cp.get('loggers', 'keys', fallback='')):
+        section = cp['logger_' + name]
+        spec = LoggerSpec(section.get('level') or None, tuple(_keys(section.get('handlers', ''))),
+                          section.getint('propagate', fallback=1))
+        if name == 'root':
+            root = spec
+        else:
+            loggers[section['qualname']] = spec
+    return CompiledConfig(digest, formatters, handlers, root, loggers)
+
+
+# config path -> (st_mtime_ns, st_size, CompiledConfig)
+_CACHE = {}
+
+
+def _read_cache(cache_file, digest):
+    # the sidecar is trusted like the ini file next to it
+    try:
+        with open(cache_file, 'rb') as f:
+            version, compiled = pickle.load(f)
+    except Exception:
+        return None
+    if version != CACHE_VERSION or not isinstance(compiled, CompiledConfig) or compiled.digest != digest:
+        return None
+    return compiled
+
+
+def _write_cache(cache_file, compiled):
+    tmp = '%s.%d.tmp' % (cache_file, os.getpid())
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump((CACHE_VERSION, compiled), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+    except OSError:
+        # a read-only directory: no sidecar
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def load_config(path, cache_file=None):
+    """
+    CompiledConfig of an ini file: parsed again only when its mtime / size
+    and content hash changed. cache_file: pickled sidecar, reused by new processes.
+    """
+    import hashlib
+    st = os.stat(path)
+    cached = _CACHE.get(path)
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+    if cached is not None and cached[2].digest == digest:
+        compiled = cached[2]
+    else:
+        compiled = _read_cache(cache_file, digest) if cache_file else None
+        if compiled is None:
+            compiled = compile_config(data.decode('utf-8'), digest)
+            if cache_file:
+                _write_cache(cache_file, compiled)
+    _CACHE[path] = (st.st_mtime_ns, st.st_size, compiled)
+    return compiled
+
+
+# handler name -> ((class_name, args, kwargs), handler) of the applied config
+_APPLIED = {}
+_apply_lock = threading.Lock()
+
+
+def _handler_args(spec, log_dir):
+    args = spec.args if isinstance(spec.args, tuple) else (spec.args,)
+    if log_dir is not None and args and isinstance(args[0], str):
+        args = (log_dir + os.sep + os.path.basename(args[0]),) + args[1:]
+    return args
+
+
+def apply_config(compiled, disable_existing_loggers=True, log_dir=None):
+    """
+    configure logging from a CompiledConfig, keeping the handlers whose
+    class / args / kwargs did not change since the last apply_config().
+    log_dir: directory of the file handlers (the str first arg), like LogConfig.
+    Return the names of the handlers built.
+    """
+    with _apply_lock, logging._lock:
+        formatters = {}
+        for name, spec in compiled.formatters.items():
+            klass = resolve(spec.class_name) if spec.class_name else logging.Formatter
+            formatters[name] = klass(spec.fmt, spec.datefmt, spec.style)
+
+        built = []
+        handlers = {}
+        stale = []
+        for name, spec in compiled.handlers.items():
+            key = (spec.class_name, _handler_args(spec, log_dir), spec.kwargs)
+            old = _APPLIED.get(name)
+            if old is not None and old[0] == key:
+                handler = old[1]
+            else:
+                if old is not None:
+                    stale.append(old[1])
+                handler = resolve(spec.class_name)(*resolve_value(key[1]), **resolve_value(spec.kwargs))
+                handler.name = name
+                built.append(name)
+            handler.setLevel(spec.level or logging.NOTSET)
+            handler.setFormatter(formatters[spec.formatter] if spec.formatter else None)
+            handlers[name] = handler
+            _APPLIED[name] = (key, handler)
+        for name, spec in compiled.handlers.items():
+            if spec.target and hasattr(handlers[name], 'setTarget'):
+                handlers[name].setTarget(handlers[spec.target])
+        for name in [name for name in _APPLIED if name not in compiled.handlers]:
+            stale.append(_APPLIED.pop(name)[1])
+
+        root = logging.root
+        if compiled.root is not None:
+            _set_logger(root, compiled.root, handlers)
+        # as fileConfig(): existing loggers which are not configured are disabled,
+        # except the children of configured loggers, which are reset
+        existing = sorted(root.manager.loggerDict)
+        children = set()
+        for qualname, spec in compiled.loggers.items():
+            prefix = qualname + '.'
+            children.update(name for name in existing if name.startswith(prefix))
+            logger = logging.getLogger(qualname)
+            _set_logger(logger, spec, handlers)
+            logger.propagate = spec.propagate
+            logger.disabled = False
+        for name in existing:
+            if name in compiled.loggers:
+                continue
+            logger = root.manager.loggerDict[name]
+            if name in children:
+                if not isinstance(logger, logging.PlaceHolder):
+                    logger.setLevel(logging.NOTSET)
+                    logger.handlers = []
+                    logger.propagate = True
+            elif isinstance(logger, logging.Logger):
+                logger.disabled = disable_existing_loggers
+
+    # out of the locks: closing may wait (pending compression, a writer thread)
+    for handler in stale:
+        handler.close()
+    # levels and `disabled` changed: the levels cached by get_logger()
+    from .xlog2 import _refresh_fast_loggers
+    _refresh_fast_loggers()
+    return built
+
+
+def _set_logger(logger, spec, handlers):
+    if spec.level:
+        logger.setLevel(spec.level)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    for name in spec.handlers:
+        logger.addHandler(handlers[name])
@@ -0,0 +1,295 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : formatter.py
+@Time  : 2026/10/18 15:40
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import re
+import sys
+import time
+import logging
+import importlib
+from operator import attrgetter
+
+"""
+FastFormatter: drop-in logging.Formatter for %-style formats, with byte-for-byte
+identical output.
+
+The format is compiled once into a positional format string plus one
+attrgetter, e.g. '%(asctime)s %(name)s %(levelname)s: %(message)s' becomes
+'%s %s %s: %s' % attrgetter('asctime', 'name', 'levelname', 'message')(record),
+and the strftime() text of asctime is cached per second so only the
+milliseconds are added for each record.
+
+The log context (xlogs.context.bind()) is rendered by the `%(context)s`
+field, or in front of the message with context=True.
+
+JsonFormatter and BinaryFormatter are in xlogs.serialize, imported on first
+access of their names here.
+
+config.ini usage:
+[formatter_infoFormatter]
+class = xlogs.formatter.FastFormatter
+format = %(asctime)s %(name)s %(levelname)s: %(message)s
+
+[formatter_jsonFormatter]
+class = xlogs.formatter.JsonFormatter
+# the fields of the JSON objects
+format = %(created)f %(asctime)s %(name)s %(levelname)s %(filename)s %(lineno)d %(message)s
+"""
+
+# same field syntax as logging.PercentStyle.validation_pattern, '%%' is matched to be skipped
+FIELD_PATTERN = re.compile(r'%%|%\((\w+)\)([#0+ -]*(?:\*|\d+)?(?:\.(?:\*|\d+))?[diouxefgcrsa%])', re.I)
+
+
+def compile_format(fmt):
+    """
+    split a %-style format into (positional format, field names)
+    '%(name)s [%(lineno)5d]' -> ('%s [%5d]', ('name', 'lineno'))
+    """
+    fields = []
+
+    def _positional(match):
+        if match.group(1) is None:
+            return '%%'
+        fields.append(match.group(1))
+        return '%' + match.group(2)
+    return FIELD_PATTERN.sub(_positional, fmt), tuple(fields)
+
+
+def record_context(record):
+    """the Context of a record, the current one for a record logged without ContextFilter"""
+    context = record.__dict__.get('context')
+    if context is None:
+        context = record.context = _current_context()
+    return context
+
+
+def _current_context():
+    # first call: import xlogs.context, its current_context() replaces this function
+    global _current_context
+    from .context import current_context as _current_context
+    return _current_context()
+
+
+# nothing is bound before xlogs.context is imported: context=True skips the lookup until then
+_CONTEXT_MODULE = __package__ + '.context'
+
+
+class FastFormatter(logging.Formatter):
+    """
+    logging.Formatter with a precompiled %-format and a per-second asctime cache.
+    context: prefix the message with the bound context, '[key=value ...] ',
+    unless fmt has a %(context)s field.
+    """
+
+    def __init__(self, fmt=None, datefmt=None, style='%', validate=True, context=False, **kwargs):
+        super(FastFormatter, self).__init__(fmt, datefmt, style, validate, **kwargs)
+        self._time_cache = (None, None, None)
+        self._compiled = None
+        if style == '%' and not kwargs.get('defaults'):
+            self._compiled = self._compile(self._fmt)
+        self._uses_time = self.usesTime()
+        self._uses_context = self._has_field('context')
+        self.context = context and not self._uses_context
+
+    def _has_field(self, name):
+        if isinstance(self._style, logging.PercentStyle):
+            return name in compile_format(self._fmt)[1]
+        # {name} / ${name}: the name is enough for a lookup that may be skipped
+        return name in self._fmt
+
+    @staticmethod
+    def _compile(fmt):
+        """(positional format, getter returning the field tuple), None if fmt has no field"""
+        positional, fields = compile_format(fmt)
+        if not fields:
+            return None
+        getter = attrgetter(*fields)
+        if len(fields) == 1:
+            return positional, lambda record: (getter(record),)
+        return positional, getter
+
+    def _cached_strftime(self, created, datefmt):
+        second = int(created)
+        cached_second, cached_datefmt, text = self._time_cache
+        if cached_second != second or cached_datefmt != datefmt:
+            text = time.strftime(datefmt, self.converter(second))
+            # one tuple assignment, safe for concurrent formatting threads
+            self._time_cache = (second, datefmt, text)
+        return text
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            if datefmt != self.datefmt:
+                return super(FastFormatter, self).formatTime(record, datefmt)
+            return self._cached_strftime(record.created, datefmt)
+        s = self._cached_strftime(record.created, self.default_time_format)
+        if self.default_msec_format:
+            s = self.default_msec_format % (s, record.msecs)
+        return s
+
+    def formatMessage(self, record):
+        if self._compiled is None:
+            return super(FastFormatter, self).formatMessage(record)
+        positional, getter = self._compiled
+        try:
+            return positional % getter(record)
+        except AttributeError as e:
+            raise ValueError('Formatting field not found in record: %s' % e)
+
+    def format(self, record):
+        record.message = record.getMessage()
+        if self._uses_context:
+            record_context(record)
+        elif self.context and _CONTEXT_MODULE in sys.modules:
+            context = record_context(record)
+            if context:
+                record.message = context.prefix + record.message
+        if self._uses_time:
+            record.asctime = self.formatTime(record, self.datefmt)
+        s = self.formatMessage(record)
+        if record.exc_info:
+            # Cache the traceback text to avoid converting it multiple times
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if s[-1:] != '\n':
+                s = s + '\n'
+            s = s + record.exc_text
+        if record.stack_info:
+            if s[-1:] != '\n':
+                s = s + '\n'
+            s = s + self.formatStack(record.stack_info)
+        return s
+
+
+# ANSI SGR codes, same names as the coloredlogs / humanfriendly styles
+ANSI_TEXT_STYLES = (('bold', 1), ('faint', 2), ('italic', 3), ('underline', 4), ('inverse', 7),
+                    ('strike_through', 9))
+ANSI_COLORS = dict(black=0, red=1, green=2, yellow=3, blue=4, magenta=5, cyan=6, white=7)
+ANSI_RESET = '\x1b[0m'
+
+
+def ansi_style(color=None, background=None, bright=False, **styles):
+    """escape sequence for one style dict, e.g. dict(color='red', bold=True) -> '\\x1b[1;31m'"""
+    codes = [str(code) for name, code in ANSI_TEXT_STYLES if styles.get(name)]
+    for value, offset in ((color, 30), (background, 40)):
+        if value is None:
+            continue
+        if isinstance(value, int):
+            codes.append('%d;5;%d' % (offset + 8, value))
+        else:
+            codes.append(str(ANSI_COLORS[value] + offset + (60 if bright else 0)))
+    return '\x1b[%sm' % ';'.join(codes) if codes else ''
+
+
+def ansi_wrap(text, **style):
+    start = ansi_style(**style)
+    return start + text + ANSI_RESET if start else text
+
+
+_WHITESPACE = re.compile(r'(\s+)')
+
+
+class ColoredFormatter(FastFormatter):
+    """
+    FastFormatter with ANSI colors: field_styles color format fields
+    (asctime, name, levelname...), level_styles color the message by level.
+    Fields are colored like coloredlogs.ColoredFormatter does: a whitespace
+    delimited group with one styled field is styled as a whole, separators
+    included ('%(levelname)s:' -> '\x1b[1;32mINFO:\x1b[0m'), a group with
+    several styled fields has each of them styled on its own.
+
+    Every styled template is compiled once per level, formatting a record is
+    one dict lookup plus the format call.
+    """
+
+    def __init__(self, fmt=None, datefmt=None, style='%', validate=True,
+                 field_styles=None, level_styles=None, **kwargs):
+        super(ColoredFormatter, self).__init__(fmt, datefmt, style, validate, **kwargs)
+        self.field_styles = dict(field_styles or {})
+        self.level_styles = dict(level_styles or {})
+        self._styled_fmt = self._colorize(self._fmt)
+        self._level_compiled = {}
+
+    def _colorize(self, fmt):
+        # (field name or None, text) tokens, the text between fields split on whitespace
+        tokens, pos = [], 0
+        for match in FIELD_PATTERN.finditer(fmt):
+            tokens.extend((None, text) for text in _WHITESPACE.split(fmt[pos:match.start()]) if text)
+            tokens.append((match.group(1), match.group(0)))
+            pos = match.end()
+        tokens.extend((None, text) for text in _WHITESPACE.split(fmt[pos:]) if text)
+
+        result, group = [], []
+        for name, text in tokens + [(None, ' ')]:
+            if name is not None or not text.isspace():
+                group.append((name, text))
+                continue
+            styles = [self.field_styles[field] for field, _ in group if self.field_styles.get(field)]
+            if len(styles) == 1:
+                result.append(ansi_wrap(''.join(t for _, t in group), **styles[0]))
+            else:
+                result.extend(ansi_wrap(t, **self.field_styles.get(field) or {}) for field, t in group)
+            result.append(text)
+            group = []
+        # drop the sentinel whitespace
+        return ''.join(result)[:-1]
+
+    def _compile_level(self, record):
+        style = self.level_styles.get(record.levelname.lower(), {})
+        start = ansi_style(**style)
+        fmt = self._styled_fmt
+        if start:
+            fmt = FIELD_PATTERN.sub(
+                lambda m: start + m.group(0) + ANSI_RESET if m.group(1) == 'message' else m.group(0), fmt)
+        compiled = self._compile(fmt)
+        self._level_compiled[record.levelno] = compiled
+        return compiled
+
+    def formatMessage(self, record):
+        if self._compiled is None:
+            return super(ColoredFormatter, self).formatMessage(record)
+        try:
+            positional, getter = self._level_compiled[record.levelno]
+        except KeyError:
+            positional, getter = self._compile_level(record)
+        try:
+            return positional % getter(record)
+        except AttributeError as e:
+            raise ValueError('Formatting field not found in record: %s' % e)
+
+
+# LogRecord attributes, anything else in record.__dict__ is `extra`
+# (preformatted: the text of ThreadLocalQueueHandler, see queue_handler.py)
+RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {
+    'message', 'asctime', 'taskName', 'context', 'preformatted'}
+
+
+def record_extra(record):
+    """names of the `extra` attributes of a record, in insertion order"""
+    extra = record.__dict__.keys() - RECORD_ATTRS
+    if len(extra) < 2:
+        return tuple(extra)
+    return [key for key in record.__dict__ if key in extra]
+
+
+# the structured formatters, in serialize.py: imported on first access
+_LAZY_NAMES = dict.fromkeys((
+    'JSON_FIELDS', 'JsonFormatter', 'json_value', 'json_load_value',
+    'RECORD_HEAD', 'RECORD_STR_FIELDS', 'pack_record', 'unpack_fields', 'unpack_records', 'BinaryFormatter',
+), 'serialize')
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+    value = getattr(importlib.import_module('.' + module, __package__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,350 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : metrics.py
+@Time  : 2026/10/19 02:50
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import time
+import logging
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+
+"""
+Metrics of the logging pipeline itself: records per logger and level, bytes
+and format / write time per handler, rollover and compression time, async
+queue depth and drops.
+
+Every thread adds to its own counters and histograms (plain dicts of a
+threading.local, no lock on the hot path); snapshot() merges them. The
+queue metrics are read from the async queue handlers when the snapshot is
+taken. Nothing is measured unless LoggerConfig(metrics=True), or
+METRICS.instrument() is called for a handler.
+
+how to use:
+
+from xlogs import get_logger, metrics
+
+logger = get_logger(logfile='service.log', metrics=True, metrics_file='log/xlogs.prom')
+...
+metrics.snapshot()['xlogs_records_total']    # {('test', 'INFO'): 10, ...}
+metrics.prometheus_text()                    # Prometheus text exposition format
+"""
+
+# histogram upper bounds, seconds
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 1e-2, 0.1, 1.0, 10.0)
+# seconds between two writes of metrics_file
+METRICS_INTERVAL = 10.0
+
+# name -> (type, label names, help)
+METRIC_SPECS = {
+    'xlogs_records_total': ('counter', ('logger', 'level'), 'Records logged.'),
+    'xlogs_handler_bytes_total': ('counter', ('handler',), 'Bytes formatted for the handler.'),
+    'xlogs_format_seconds': ('histogram', ('handler',), 'Time formatting one record.'),
+    'xlogs_write_seconds': ('histogram', ('handler',), 'Time writing one record, format time excluded.'),
+    'xlogs_rollover_seconds': ('histogram', ('handler',), 'Time of doRollover().'),
+    'xlogs_compress_seconds': ('histogram', ('handler',), 'Time compressing one rotated file.'),
+    'xlogs_queue_depth': ('gauge', ('handler',), 'Records waiting for the async writer.'),
+    'xlogs_queue_dropped_total': ('counter', ('handler',), 'Records dropped by the queue overflow policy.'),
+}
+
+# count, sum (seconds), ((upper bound, cumulative count), ...)
+Histogram = namedtuple('Histogram', 'count sum buckets')
+
+_clock = time.perf_counter_ns
+
+
+class _ThreadMetrics(object):
+    """counters / histograms of one thread, only written by that thread"""
+    __slots__ = ('thread', 'counters', 'histograms', 'format_ns')
+
+    def __init__(self, thread):
+        self.thread = thread
+        # (name, label values) -> number
+        self.counters = {}
+        # (name, label values) -> [bucket counts..., +Inf count, sum ns]
+        self.histograms = {}
+        # format time of the record being written, excluded from its write time
+        self.format_ns = 0
+
+
+class Metrics(object):
+    """registry of the per-thread accumulators"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._bucket_ns = tuple(int(b * 1e9) for b in self.buckets)
+        self._local = threading.local()
+        # taken when a thread registers its accumulator and by snapshot(), never when counting
+        self._lock = threading.Lock()
+        self._threads = []
+        self._retired = _ThreadMetrics(None)
+        # (label, AsyncQueueHandler), baseFilename -> handler label
+        self._queues = []
+        self._files = {}
+        self._dumper = None
+
+    def _acc(self):
+        try:
+            return self._local.acc
+        except AttributeError:
+            acc = self._local.acc = _ThreadMetrics(threading.current_thread())
+            with self._lock:
+                self._threads.append(acc)
+            return acc
+
+    def inc(self, name, labels, value=1):
+        counters = self._acc().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe_ns(self, name, labels, ns, acc=None):
+        histograms = (acc or self._acc()).histograms
+        key = (name, labels)
+        counts = histograms.get(key)
+        if counts is None:
+            counts = histograms[key] = [0] * (len(self._bucket_ns) + 2)
+        counts[bisect_left(self._bucket_ns, ns)] += 1
+        counts[-1] += ns
+
+    def observe(self, name, labels, seconds):
+        self.observe_ns(name, labels, int(seconds * 1e9))
+
+    # ---------------------------
+    # --- instrumentation
+    # ---------------------------
+    def instrument(self, handler, label=None):
+        """measure the format / write time, bytes and rollovers of a handler"""
+        if getattr(handler, '_metrics_label', None) is not None:
+            return
+        label = (label or handler_label(handler),)
+        handler._metrics_label = label
+        formatter = handler.formatter
+        if formatter is not None and not isinstance(formatter, _TimedFormatter):
+            klass = _TimedBytesFormatter if hasattr(formatter, 'format_bytes') else _TimedFormatter
+            handler.formatter = klass(formatter, label, self)
+        # instance attributes, the handler's own emit() / doRollover() calls go through them
+        handler.emit = self._timed_emit(handler.emit, label)
+        if hasattr(handler, 'doRollover'):
+            handler.doRollover = self._timed_rollover(handler.doRollover, label)
+        base_filename = getattr(handler, 'baseFilename', None)
+        if base_filename is not None:
+            self._files[base_filename] = label
+            from .compress import COMPRESSOR
+            if self._observe_job not in COMPRESSOR.observers:
+                COMPRESSOR.observers.append(self._observe_job)
+
+    def _timed_emit(self, emit, label):
+        def timed_emit(record):
+            acc = self._acc()
+            acc.format_ns = 0
+            start = _clock()
+            try:
+                emit(record)
+            finally:
+                self.observe_ns('xlogs_write_seconds', label, _clock() - start - acc.format_ns, acc)
+        return timed_emit
+
+    def _timed_rollover(self, do_rollover, label):
+        def timed_rollover():
+            start = _clock()
+            try:
+                do_rollover()
+            finally:
+                self.observe_ns('xlogs_rollover_seconds', label, _clock() - start)
+        return timed_rollover
+
+    def _observe_job(self, job, seconds):
+        """COMPRESSOR observer: a compression job finished (in the compressor thread)"""
+        label = self._files.get(job.base_filename)
+        if label is None:
+            # ArchiveJob: base_filename is the `<logfile>.<stamp>` segment
+            label = self._files.get(job.base_filename.rsplit('.', 1)[0])
+        if label is not None:
+            self.observe('xlogs_compress_seconds', label, seconds)
+
+    def watch_queue(self, handler, label='async'):
+        """report the depth and drops of an AsyncQueueHandler / ThreadLocalQueueHandler"""
+        with self._lock:
+            self._queues = [(name, h) for name, h in self._queues if not h._closed] + [(label, handler)]
+
+    # ---------------------------
+    # --- output
+    # ---------------------------
+    def _merge(self, counters, histograms, acc):
+        # copy(): a C level copy, consistent while the owner thread keeps counting
+        for key, value in acc.counters.copy().items():
+            counters[key] = counters.get(key, 0) + value
+        for key, counts in acc.histograms.copy().items():
+            counts = list(counts)
+            total = histograms.get(key)
+            histograms[key] = counts if total is None else [a + b for a, b in zip(total, counts)]
+
+    def snapshot(self):
+        """{metric name: {label values: number or Histogram}}, see METRIC_SPECS for the labels"""
+        counters = {}
+        histograms = {}
+        with self._lock:
+            alive = []
+            for acc in self._threads:
+                if acc.thread.is_alive():
+                    alive.append(acc)
+                else:
+                    # a finished thread: keep its numbers in one accumulator
+                    self._merge(self._retired.counters, self._retired.histograms, acc)
+            self._threads = alive
+            for acc in alive + [self._retired]:
+                self._merge(counters, histograms, acc)
+            queues = list(self._queues)
+        result = {name: {} for name in METRIC_SPECS}
+        for (name, labels), value in counters.items():
+            result.setdefault(name, {})[labels] = value
+        for (name, labels), counts in histograms.items():
+            cumulative = []
+            count = 0
+            for bound, n in zip(self.buckets, counts):
+                count += n
+                cumulative.append((bound, count))
+            count += counts[-2]
+            result.setdefault(name, {})[labels] = Histogram(count, counts[-1] / 1e9, tuple(cumulative))
+        for label, handler in queues:
+            result['xlogs_queue_depth'][(label,)] = handler.qsize
+            result['xlogs_queue_dropped_total'][(label,)] = handler.dropped
+        return result
+
+    def reset(self):
+        """forget the numbers counted so far (the accumulators of the running threads are cleared)"""
+        with self._lock:
+            for acc in self._threads + [self._retired]:
+                acc.counters.clear()
+                acc.histograms.clear()
+
+    def prometheus_text(self):
+        """the snapshot in the Prometheus text exposition format"""
+        lines = []
+        for name, values in self.snapshot().items():
+            kind, label_names, help_text = METRIC_SPECS.get(name, ('untyped', (), ''))
+            lines.append('# HELP {0} {1}'.format(name, help_text))
+            lines.append('# TYPE {0} {1}'.format(name, kind))
+            for labels, value in sorted(values.items()):
+                pairs = ['{0}="{1}"'.format(k, _escape(v)) for k, v in zip(label_names, labels)]
+                if isinstance(value, Histogram):
+                    for bound, count in value.buckets + (('+Inf', value.count),):
+                        le = ','.join(pairs + ['le="{0}"'.format(bound)])
+                        lines.append('{0}_bucket{{{1}}} {2}'.format(name, le, count))
+                    lines.append('{0}_sum{1} {2!r}'.format(name, _labels(pairs), value.sum))
+                    lines.append('{0}_count{1} {2}'.format(name, _labels(pairs), value.count))
+                else:
+                    lines.append('{0}{1} {2}'.format(name, _labels(pairs), value))
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """write prometheus_text() to path atomically, for the node_exporter textfile collector"""
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def start_dump(self, path, interval=METRICS_INTERVAL):
+        """write the Prometheus text to path every interval seconds, from a daemon thread"""
+        with self._lock:
+            if self._dumper is not None:
+                self._dumper.set()
+            stop = self._dumper = threading.Event()
+        thread = threading.Thread(target=self._dump_loop, args=(path, interval, stop),
+                                  name='xlogs-metrics', daemon=True)
+        thread.start()
+
+    def stop_dump(self):
+        with self._lock:
+            if self._dumper is not None:
+                self._dumper.set()
+                self._dumper = None
+
+    def _dump_loop(self, path, interval, stop):
+        while not stop.wait(interval):
+            try:
+                self.write_prometheus(path)
+            except OSError as e:
+                logging.getLogger('xlogs').warning('metrics dump to %s failed: %s', path, e)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def handler_label(handler):
+    """handler name, or the file name, or the class name"""
+    if handler.name:
+        return handler.name
+    base_filename = getattr(handler, 'baseFilename', None)
+    if base_filename is not None:
+        return os.path.basename(base_filename)
+    return type(handler).__name__.lstrip('_')
+
+
+class _TimedFormatter(object):
+    """formatter proxy adding the format time and the size of the output to the handler's metrics"""
+
+    def __init__(self, formatter, label, metrics):
+        self.formatter = formatter
+        self.label = label
+        self.metrics = metrics
+
+    def __getattr__(self, name):
+        # _fmt, _style, datefmt, usesTime()...: the wrapped formatter's
+        return getattr(self.formatter, name)
+
+    def format(self, record):
+        acc = self.metrics._acc()
+        start = _clock()
+        s = self.formatter.format(record)
+        ns = _clock() - start
+        acc.format_ns += ns
+        self.metrics.observe_ns('xlogs_format_seconds', self.label, ns, acc)
+        key = ('xlogs_handler_bytes_total', self.label)
+        # characters + terminator, the bytes of ASCII text
+        acc.counters[key] = acc.counters.get(key, 0) + len(s) + 1
+        return s
+
+
+class _TimedBytesFormatter(_TimedFormatter):
+    def format_bytes(self, record, buf):
+        acc = self.metrics._acc()
+        mark = len(buf)
+        start = _clock()
+        self.formatter.format_bytes(record, buf)
+        ns = _clock() - start
+        acc.format_ns += ns
+        self.metrics.observe_ns('xlogs_format_seconds', self.label, ns, acc)
+        key = ('xlogs_handler_bytes_total', self.label)
+        acc.counters[key] = acc.counters.get(key, 0) + len(buf) - mark
+        return buf
+
+
+class MetricsFilter(logging.Filter):
+    """count the records of a logger per logger name and level"""
+
+    def __init__(self, metrics=None):
+        logging.Filter.__init__(self)
+        self.metrics = metrics or METRICS
+
+    def filter(self, record):
+        counters = self.metrics._acc().counters
+        key = ('xlogs_records_total', (record.name, record.levelname))
+        counters[key] = counters.get(key, 0) + 1
+        return True
+
+
+METRICS = Metrics()
+snapshot = METRICS.snapshot
+prometheus_text = METRICS.prometheus_text
+write_prometheus = METRICS.write_prometheus
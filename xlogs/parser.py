@@ -0,0 +1,480 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : parser.py
+@Time  : 2026/10/18 16:50
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import io
+import os
+import re
+import glob
+import time
+import zlib
+import struct
+import logging
+from array import array
+from operator import itemgetter
+from collections import namedtuple
+
+from .formatter import FIELD_PATTERN
+from .serialize import unpack_fields
+from .compress import COMPRESS_CODECS, PENDING_SUFFIX
+from .rotation import stamped_segments
+
+"""
+Streaming log file parser driven by the format string which wrote the file.
+
+LogParser(fmt, datefmt) compiles fmt (INFO_FORMATE, DEBUG_FORMATE, a config.ini
+format...) into one regex. parse() reads a path or file object line by line,
+plain or rotated `.N.gz/.zz/.bz2/.xz` segments, and yields LogEntry records.
+Lines which do not start a record (tracebacks, multi-line messages) are
+appended to the message of the record before them, the '+'/'#' separator
+lines of the `log` decorator are skipped. Memory use is one record.
+
+how to use:
+
+from xlogs.parser import LogParser, iter_segments
+from xlogs.xlog2 import DEBUG_FORMATE
+
+parser = LogParser(DEBUG_FORMATE)
+for path in iter_segments('log/message.log'):
+    for entry in parser.parse(path):
+        if entry.levelno >= logging.ERROR:
+            print(entry.created, entry.filename, entry.lineno, entry.message)
+"""
+
+# default Formatter time layout: '%Y-%m-%d %H:%M:%S' + ',%03d' msecs
+DEFAULT_TIME_FORMAT = logging.Formatter.default_time_format
+
+_STRFTIME_REGEX = {
+    'Y': r'\d{4}', 'y': r'\d{2}', 'm': r'\d{2}', 'd': r'\d{2}', 'H': r'\d{2}', 'I': r'\d{2}',
+    'M': r'\d{2}', 'S': r'\d{2}', 'j': r'\d{3}', 'f': r'\d{6}', 'p': r'[AP]M', 'z': r'[+-]\d{4}',
+    'Z': r'[A-Za-z_ ]+?', 'a': r'[A-Za-z]{3}', 'A': r'[A-Za-z]+', 'b': r'[A-Za-z]{3}', 'B': r'[A-Za-z]+',
+    'e': r'[ \d]\d', '%': '%',
+}
+# regex of the LogRecord attributes, anything else matches lazily
+_FIELD_REGEX = {
+    'levelno': r'\d+', 'lineno': r'\d+', 'process': r'\d+', 'thread': r'\d+',
+    'created': r'\d+(?:\.\d+)?', 'msecs': r'\d+(?:\.\d+)?', 'relativeCreated': r'\d+(?:\.\d+)?',
+    # 'Level 25': logging.getLevelName() of a level without a name
+    'levelname': r'[A-Z]+|Level \d+',
+    'message': r'.*',
+}
+_INT_FIELDS = ('levelno', 'lineno', 'process', 'thread')
+_FLOAT_FIELDS = ('created', 'msecs', 'relativeCreated')
+# separator lines the `log` decorator writes around exceptions in error.log
+_SEPARATOR = re.compile(r'^([+#])\1{69}$')
+
+
+def _datefmt_regex(datefmt):
+    parts = []
+    i = 0
+    while i < len(datefmt):
+        if datefmt[i] == '%' and i + 1 < len(datefmt):
+            parts.append(_STRFTIME_REGEX.get(datefmt[i + 1], r'.+?'))
+            i += 2
+        else:
+            parts.append(re.escape(datefmt[i]))
+            i += 1
+    return ''.join(parts)
+
+
+def format_regex(fmt, datefmt=None):
+    """regex with one named group per field of a %-style logging format"""
+    parts = []
+    fields = []
+    pos = 0
+    for match in FIELD_PATTERN.finditer(fmt):
+        parts.append(re.escape(fmt[pos:match.start()]))
+        pos = match.end()
+        field, spec = match.group(1), match.group(2)
+        if field is None:
+            parts.append('%')
+            continue
+        if field == 'asctime':
+            if datefmt:
+                value = _datefmt_regex(datefmt)
+            else:
+                value = _datefmt_regex(DEFAULT_TIME_FORMAT) + r',\d{3}'
+        else:
+            value = _FIELD_REGEX.get(field, r'.*?')
+        group = '(?P<%s>%s)' % (field, value)
+        if field in fields:
+            # repeated field, match it again without a second group
+            group = '(?:%s)' % value
+        else:
+            fields.append(field)
+        if any(c.isdigit() for c in spec):
+            # width spec pads the value with spaces
+            group = r'\s*' + group + r'\s*'
+        parts.append(group)
+    parts.append(re.escape(fmt[pos:]))
+    if 'message' not in fields:
+        parts.append('$')
+    return re.compile(''.join(parts)), tuple(fields)
+
+
+# LogRecord attributes kept by LogEntry, other format fields go to LogEntry.extra
+ENTRY_FIELDS = ('asctime', 'created', 'name', 'levelname', 'levelno', 'pathname', 'filename', 'module',
+                'funcName', 'lineno', 'process', 'processName', 'thread', 'threadName', 'message', 'extra')
+# one parsed record, attributes not in the format are None
+LogEntry = namedtuple('LogEntry', ENTRY_FIELDS, defaults=(None,) * len(ENTRY_FIELDS))
+_ASCTIME, _CREATED, _LEVELNAME, _LEVELNO, _MESSAGE, _EXTRA = (
+    ENTRY_FIELDS.index(f) for f in ('asctime', 'created', 'levelname', 'levelno', 'message', 'extra'))
+
+
+def _zlib_lines(raw, encoding):
+    decompressor = zlib.decompressobj()
+    pending = b''
+    for chunk in iter(lambda: raw.read(1024 * 1024), b''):
+        lines = (pending + decompressor.decompress(chunk)).split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line.decode(encoding, 'replace') + '\n'
+    pending += decompressor.flush()
+    if pending:
+        yield pending.decode(encoding, 'replace')
+
+
+def open_segment(path, encoding='utf-8'):
+    """text line iterator of a plain or compressed log segment"""
+    name = path[:-len(PENDING_SUFFIX)] if path.endswith(PENDING_SUFFIX) else path
+    ext = os.path.splitext(name)[1]
+    if ext == '.gz':
+        import gzip
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding, 'replace', newline='\n')
+    elif ext == '.bz2':
+        import bz2
+        return io.TextIOWrapper(bz2.open(path, 'rb'), encoding, 'replace', newline='\n')
+    elif ext == '.xz':
+        import lzma
+        return io.TextIOWrapper(lzma.open(path, 'rb'), encoding, 'replace', newline='\n')
+    elif ext == '.zz':
+        raw = open(path, 'rb')
+        return _ClosingIter(_zlib_lines(raw, encoding), raw)
+    return open(path, 'r', encoding=encoding, errors='replace', newline='\n')
+
+
+class _ClosingIter(object):
+    def __init__(self, lines, raw):
+        self._lines = lines
+        self._raw = raw
+
+    def __iter__(self):
+        return self._lines
+
+    def close(self):
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _ZlibReader(object):
+    """read()/readline()/forward seek() over a raw zlib stream"""
+    def __init__(self, path):
+        self._raw = open(path, 'rb')
+        self._decompressor = zlib.decompressobj()
+        self._buffer = b''
+        self._pos = 0
+
+    def _fill(self):
+        chunk = self._raw.read(1024 * 1024)
+        if not chunk:
+            data = self._decompressor.flush()
+            self._buffer += data
+            return bool(data)
+        self._buffer += self._decompressor.decompress(chunk)
+        return True
+
+    def readline(self):
+        while True:
+            end = self._buffer.find(b'\n')
+            if end >= 0 or not self._fill():
+                break
+        end = len(self._buffer) if end < 0 else end + 1
+        line, self._buffer = self._buffer[:end], self._buffer[end:]
+        self._pos += len(line)
+        return line
+
+    def read(self, size=-1):
+        while (size is None or size < 0 or len(self._buffer) < size) and self._fill():
+            pass
+        end = len(self._buffer) if size is None or size < 0 else size
+        data, self._buffer = self._buffer[:end], self._buffer[end:]
+        self._pos += len(data)
+        return data
+
+    def seek(self, offset):
+        if offset < self._pos:
+            raise ValueError('backward seek in a zlib stream')
+        while offset - self._pos > len(self._buffer) and self._fill():
+            pass
+        skip = min(offset - self._pos, len(self._buffer))
+        self._buffer = self._buffer[skip:]
+        self._pos += skip
+
+    def close(self):
+        self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_binary(segment):
+    """binary reader with read(), readline() and seek() over the uncompressed data of a segment"""
+    name = segment[:-len(PENDING_SUFFIX)] if segment.endswith(PENDING_SUFFIX) else segment
+    ext = os.path.splitext(name)[1]
+    if ext == '.gz':
+        from .blockgzip import BlockGzipReader, is_block_gzip
+        if is_block_gzip(segment):
+            return BlockGzipReader(segment)
+        import gzip
+        return gzip.open(segment, 'rb')
+    elif ext == '.bz2':
+        import bz2
+        return bz2.open(segment, 'rb')
+    elif ext == '.xz':
+        import lzma
+        return lzma.open(segment, 'rb')
+    elif ext == '.zz':
+        return _ZlibReader(segment)
+    return open(segment, 'rb')
+
+
+def iter_segments(logfile):
+    """
+    segments of a rotated log, oldest first:
+    <logfile>.N[.ext] ... <logfile>.1[.ext], <logfile>.<%Y%m%d-%H%M%S>[.ext] (hybrid rotation),
+    <logfile>.<time_ns>.pending (being compressed), <logfile>
+    """
+    exts = tuple(COMPRESS_CODECS.values())
+    numbered = []
+    pending = []
+    for path in glob.glob(glob.escape(logfile) + '.*'):
+        suffix = path[len(logfile) + 1:]
+        if suffix.endswith(PENDING_SUFFIX) and suffix[:-len(PENDING_SUFFIX)].isdigit():
+            pending.append((int(suffix[:-len(PENDING_SUFFIX)]), path))
+            continue
+        for ext in exts:
+            if suffix.endswith(ext):
+                suffix = suffix[:-len(ext)]
+                break
+        if suffix.isdigit():
+            numbered.append((int(suffix), path))
+    segments = [path for _, path in sorted(numbered, reverse=True)]
+    segments.extend(stamped_segments(logfile))
+    segments.extend(path for _, path in sorted(pending))
+    if os.path.exists(logfile):
+        segments.append(logfile)
+    return segments
+
+
+class LogParser(object):
+    """parse the lines written by a logging format (and datefmt) into LogEntry records"""
+
+    def __init__(self, fmt, datefmt=None, encoding='utf-8'):
+        self.fmt = fmt
+        self.datefmt = datefmt
+        self.encoding = encoding
+        self.regex, self.fields = format_regex(fmt, datefmt)
+        self._time_cache = (None, None)
+        self._levels = {}
+        # m.groups() + (None,) -> LogEntry values in one itemgetter call, then convert the typed fields
+        missing = len(self.fields)
+        self._pick = itemgetter(*[self.fields.index(f) if f in self.fields else missing for f in ENTRY_FIELDS])
+        self._converts = [(ENTRY_FIELDS.index(f), int if f in _INT_FIELDS else float) for f in self.fields
+                          if f in ENTRY_FIELDS and (f in _INT_FIELDS or f in _FLOAT_FIELDS)]
+        self._extra = [(self.fields.index(f), f, int if f in _INT_FIELDS else float if f in _FLOAT_FIELDS else None)
+                       for f in self.fields if f not in ENTRY_FIELDS]
+        self._derive_created = 'asctime' in self.fields and 'created' not in self.fields
+        self._derive_levelno = 'levelname' in self.fields and 'levelno' not in self.fields
+
+    def created(self, asctime):
+        """epoch seconds of an asctime text, the strptime() result is cached per second"""
+        if self.datefmt:
+            text, msecs = asctime, 0
+        else:
+            text, _, msecs = asctime.rpartition(',')
+            msecs = int(msecs)
+        cached_text, seconds = self._time_cache
+        if cached_text != text:
+            seconds = time.mktime(time.strptime(text, self.datefmt or DEFAULT_TIME_FORMAT))
+            self._time_cache = (text, seconds)
+        return seconds + msecs / 1000.0
+
+    def levelno(self, levelname):
+        try:
+            return self._levels[levelname]
+        except KeyError:
+            value = logging.getLevelName(levelname)
+            if not isinstance(value, int):
+                value = int(levelname[6:]) if levelname.startswith('Level ') else None
+            self._levels[levelname] = value
+            return value
+
+    def _entry(self, match):
+        groups = match.groups()
+        values = list(self._pick(groups + (None,)))
+        for index, convert in self._converts:
+            values[index] = convert(values[index])
+        if self._extra:
+            values[_EXTRA] = {field: groups[index] if convert is None else convert(groups[index])
+                              for index, field, convert in self._extra}
+        if self._derive_created:
+            values[_CREATED] = self.created(values[_ASCTIME])
+        if self._derive_levelno:
+            values[_LEVELNO] = self.levelno(values[_LEVELNAME])
+        return values
+
+    def match(self, line):
+        """LogEntry of a record's first line, None for a continuation line"""
+        m = self.regex.match(line.rstrip('\r\n'))
+        return None if m is None else LogEntry._make(self._entry(m))
+
+    def parse_lines(self, lines, raw=False):
+        """yield LogEntry from an iterable of text lines, (LogEntry, text) with raw=True"""
+        match_head = self.regex.match
+        make_entry = self._entry
+        new_entry = LogEntry._make
+        values = None
+        continuation = []
+        text = []
+        for line in lines:
+            line = line.rstrip('\r\n')
+            m = match_head(line)
+            if m is not None:
+                if values is not None:
+                    if continuation:
+                        values[_MESSAGE] = '\n'.join([values[_MESSAGE] or ''] + continuation).rstrip('\n')
+                        continuation = []
+                    if raw:
+                        yield new_entry(values), '\n'.join(text).rstrip('\n')
+                        text = []
+                    else:
+                        yield new_entry(values)
+                values = make_entry(m)
+                if raw:
+                    text.append(line)
+            elif values is not None and not _SEPARATOR.match(line):
+                continuation.append(line)
+                if raw:
+                    text.append(line)
+        if values is not None:
+            if continuation:
+                values[_MESSAGE] = '\n'.join([values[_MESSAGE] or ''] + continuation).rstrip('\n')
+            if raw:
+                yield new_entry(values), '\n'.join(text).rstrip('\n')
+            else:
+                yield new_entry(values)
+
+    def parse(self, source):
+        """yield LogEntry from a path (plain or compressed segment) or a file object"""
+        if isinstance(source, (str, bytes, os.PathLike)):
+            with open_segment(os.fsdecode(source), self.encoding) as lines:
+                for entry in self.parse_lines(lines):
+                    yield entry
+        elif isinstance(source, io.TextIOBase):
+            for entry in self.parse_lines(source):
+                yield entry
+        else:
+            for entry in self.parse_lines(io.TextIOWrapper(source, self.encoding, 'replace', newline='\n')):
+                yield entry
+
+    def parse_segments(self, logfile):
+        """yield LogEntry from every rotated segment of logfile, oldest first"""
+        for path in iter_segments(logfile):
+            for entry in self.parse(path):
+                yield entry
+
+    def columns(self, source, fields=('created', 'levelno', 'name', 'message')):
+        """
+        parse into columnar arrays: {field: array}, int fields are array('q'),
+        float fields array('d') (missing values -1), others are lists.
+        """
+        result = {}
+        columns = []
+        for field in fields:
+            if field in _INT_FIELDS:
+                result[field] = array('q')
+            elif field in _FLOAT_FIELDS:
+                result[field] = array('d')
+            else:
+                result[field] = []
+            index = ENTRY_FIELDS.index(field) if field in ENTRY_FIELDS else None
+            numeric = field in _INT_FIELDS or field in _FLOAT_FIELDS
+            columns.append((result[field].append, index, field, numeric))
+        for entry in self.parse(source):
+            for append, index, field, numeric in columns:
+                value = entry[index] if index is not None else (entry.extra or {}).get(field)
+                append(-1 if numeric and value is None else value)
+        return result
+
+
+def parse_file(path, fmt, datefmt=None):
+    """shortcut of LogParser(fmt, datefmt).parse(path)"""
+    return LogParser(fmt, datefmt).parse(path)
+
+
+_RECORD_LEN = struct.Struct('<I')
+
+
+def _binary_entries(f, chunk_size):
+    levels = {}
+    # pathname -> (filename, module)
+    paths = {}
+    data = b''
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        data += chunk
+        view = memoryview(data)
+        offset = 0
+        while len(data) - offset >= 4:
+            length, = _RECORD_LEN.unpack_from(view, offset)
+            if len(data) - offset - 4 < length:
+                break
+            (created, levelno, process, thread, lineno), values, extra, _ = unpack_fields(view, offset + 4)
+            offset += 4 + length
+            name, msg, pathname, func_name, thread_name, process_name, exc_text, stack_info = values
+            for text in (exc_text, stack_info):
+                if text:
+                    msg = msg + '\n' + text
+            try:
+                levelname = levels[levelno]
+            except KeyError:
+                levelname = levels[levelno] = logging.getLevelName(levelno)
+            try:
+                filename, module = paths[pathname]
+            except KeyError:
+                filename = os.path.basename(pathname)
+                filename, module = paths[pathname] = filename, os.path.splitext(filename)[0]
+            yield LogEntry(None, created, name, levelname, levelno, pathname, filename, module,
+                           func_name, lineno, process, process_name, thread, thread_name, msg, extra)
+        view.release()
+        data = data[offset:]
+
+
+def parse_binary(source, chunk_size=1024 * 1024):
+    """
+    yield LogEntry from the records written by xlogs.formatter.BinaryFormatter,
+    source: path (plain or compressed segment) or binary file object. No regex
+    is involved, a truncated last record (crash during write) is ignored.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open_binary(os.fsdecode(source)) as f:
+            for entry in _binary_entries(f, chunk_size):
+                yield entry
+    else:
+        for entry in _binary_entries(source, chunk_size):
+            yield entry
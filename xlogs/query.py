@@ -0,0 +1,393 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : query.py
+@Time  : 2026/10/18 17:40
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import re
+import sys
+import mmap
+import time
+import struct
+import logging
+import argparse
+
+from .parser import LogParser, iter_segments, open_binary
+from .compress import COMPRESS_CODECS, PENDING_SUFFIX
+from .rotation import STAMP_PATTERN
+from .xlog2 import FILE_FORMATE, INFO_FORMATE, DEBUG_FORMATE
+
+"""
+Search rotated log files by time range, level, logger name and message regex.
+
+Every rotated segment (`<logfile>.N[.ext]`) gets a sparse sidecar index
+`<segment>.idx`: one entry per ~64KB block of records with the block's byte
+offset (of the uncompressed text), min/max timestamp and a bitmask of the
+levels in it. The compressed rotating handlers build it in the compressor
+thread at rollover and shift it with the archives; missing or stale indexes
+(stdlib rotation, another format) are built on the first query and saved.
+A lookup reads the index, skips whole segments and blocks outside the range,
+and seeks straight to the selected blocks.
+
+The live file (and `.pending` files being compressed) is mmap()ed and
+bisected by timestamp, then scanned until the records pass the end time.
+
+how to use:
+
+from xlogs.query import LogQuery
+
+query = LogQuery('log/message.log', fmt=DEBUG_FORMATE)
+for entry in query.search(start='2026-10-18 14:00', end='2026-10-18 14:05', level=logging.ERROR):
+    print(entry.asctime, entry.message)
+
+python -m xlogs.query log/message.log --format debug --start 14:00 --end 14:05 --level ERROR
+"""
+
+INDEX_SUFFIX = '.idx'
+# bytes of records per index block
+INDEX_BLOCK = 64 * 1024
+# tolerance (seconds) for records written out of time order by concurrent threads/processes
+SLACK = 1.0
+
+_MAGIC = b'XLIX'
+_VERSION = 1
+# magic, version, block size, blocks, segment size, segment mtime_ns, text size, min time, max time
+_HEADER = struct.Struct('<4sHIIQqQdd')
+# offset, min time, max time, level mask, records
+_BLOCK = struct.Struct('<QddII')
+_STR = struct.Struct('<H')
+_ALL_LEVELS = 0xffffffff
+
+
+def level_bit(levelno):
+    """bit of a level in the index mask: one bit per ten levels"""
+    if levelno is None:
+        return 1
+    return 1 << min(max(levelno, 0) // 10, 31)
+
+
+def level_mask(level=None):
+    """mask of the index bits which may hold records >= level"""
+    if not level:
+        return _ALL_LEVELS
+    return _ALL_LEVELS & ~((1 << min(level // 10, 31)) - 1)
+
+
+def index_path(segment):
+    return segment + INDEX_SUFFIX
+
+
+class SegmentIndex(object):
+    """sparse time/level index of one segment"""
+
+    def __init__(self, fmt, datefmt=None, block_size=INDEX_BLOCK):
+        self.fmt = fmt
+        self.datefmt = datefmt or ''
+        self.block_size = block_size
+        self.size = 0
+        self.mtime_ns = 0
+        self.data_size = 0
+        self.tmin = float('inf')
+        self.tmax = float('-inf')
+        # [offset, min time, max time, level mask, records]
+        self.blocks = []
+
+    @classmethod
+    def build(cls, segment, fmt, datefmt=None, block_size=INDEX_BLOCK, source=None, encoding='utf-8'):
+        """
+        index segment's records; source: plain file with the same text (the
+        .pending file of an archive being written), default the segment itself
+        """
+        index = cls(fmt, datefmt, block_size)
+        parser = LogParser(fmt, datefmt, encoding)
+        if 'asctime' not in parser.fields and 'created' not in parser.fields:
+            raise ValueError('format has no time field: %r' % fmt)
+        block = None
+        offset = 0
+        with open_binary(source or segment) as f:
+            for line in iter(f.readline, b''):
+                entry = parser.match(line.decode(encoding, 'replace'))
+                if entry is not None:
+                    created = entry.created
+                    if block is None or offset - block[0] >= block_size:
+                        block = [offset, created, created, 0, 0]
+                        index.blocks.append(block)
+                    elif created < block[1]:
+                        block[1] = created
+                    elif created > block[2]:
+                        block[2] = created
+                    block[3] |= level_bit(entry.levelno)
+                    block[4] += 1
+                offset += len(line)
+        index.data_size = offset
+        if index.blocks:
+            index.tmin = min(b[1] for b in index.blocks)
+            index.tmax = max(b[2] for b in index.blocks)
+        st = os.stat(segment)
+        index.size, index.mtime_ns = st.st_size, st.st_mtime_ns
+        return index
+
+    def save(self, path):
+        """write the index atomically"""
+        parts = [_HEADER.pack(_MAGIC, _VERSION, self.block_size, len(self.blocks), self.size, self.mtime_ns,
+                              self.data_size, self.tmin, self.tmax)]
+        for text in (self.fmt, self.datefmt):
+            data = text.encode('utf-8')
+            parts.append(_STR.pack(len(data)) + data)
+        parts.extend(_BLOCK.pack(*block) for block in self.blocks)
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'wb') as f:
+            f.write(b''.join(parts))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """read an index file, None if it is missing or not an index"""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size or data[:4] != _MAGIC:
+            return None
+        magic, version, block_size, count, size, mtime_ns, data_size, tmin, tmax = _HEADER.unpack_from(data)
+        if version != _VERSION:
+            return None
+        pos = _HEADER.size
+        texts = []
+        for _ in range(2):
+            length, = _STR.unpack_from(data, pos)
+            pos += _STR.size
+            texts.append(data[pos:pos + length].decode('utf-8'))
+            pos += length
+        index = cls(texts[0], texts[1], block_size)
+        index.size, index.mtime_ns, index.data_size, index.tmin, index.tmax = size, mtime_ns, data_size, tmin, tmax
+        index.blocks = [list(b) for b in _BLOCK.iter_unpack(data[pos:pos + count * _BLOCK.size])]
+        return index
+
+    def valid_for(self, segment, fmt, datefmt=None):
+        """the index belongs to segment's current content and format"""
+        try:
+            st = os.stat(segment)
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime_ns, self.fmt, self.datefmt) == (self.size, self.mtime_ns, fmt, datefmt or '')
+
+    def select(self, start=None, end=None, level=None):
+        """merged [(begin, stop)] byte ranges of the blocks which may hold matching records"""
+        mask = level_mask(level)
+        ranges = []
+        for i, (offset, tmin, tmax, bits, _) in enumerate(self.blocks):
+            if (start is not None and tmax < start) or (end is not None and tmin > end) or not bits & mask:
+                continue
+            stop = self.blocks[i + 1][0] if i + 1 < len(self.blocks) else self.data_size
+            if ranges and ranges[-1][1] == offset:
+                ranges[-1][1] = stop
+            else:
+                ranges.append([offset, stop])
+        return ranges
+
+
+def write_index(segment, fmt, datefmt=None, source=None, path=None):
+    """build and save the index of segment, see SegmentIndex.build()"""
+    index = SegmentIndex.build(segment, fmt, datefmt, source=source)
+    index.save(path or index_path(segment))
+    return index
+
+
+def parse_time(text):
+    """epoch seconds of '2026-10-18 14:00[:00]', '14:00[:00]' (today) or an epoch number"""
+    if text is None or isinstance(text, (int, float)):
+        return text
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    for datefmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return time.mktime(time.strptime(text, datefmt))
+        except ValueError:
+            pass
+    for datefmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            t = time.strptime(text, datefmt)
+        except ValueError:
+            continue
+        return time.mktime(time.localtime()[:3] + t[3:6] + (0, 0, -1))
+    raise ValueError('unknown time {0!r}, expect "%Y-%m-%d %H:%M:%S", "%H:%M:%S" or epoch seconds'.format(text))
+
+
+def _read_lines(f, ranges, encoding):
+    for begin, stop in ranges:
+        f.seek(begin)
+        pos = begin
+        while pos < stop:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            yield line.decode(encoding, 'replace')
+
+
+class LogQuery(object):
+    """time range / level / name / regex search over all segments of a rotated log file"""
+
+    def __init__(self, logfile, fmt=FILE_FORMATE, datefmt=None, encoding='utf-8', save_index=True):
+        self.logfile = logfile
+        self.fmt = fmt
+        self.datefmt = datefmt
+        self.encoding = encoding
+        self.save_index = save_index
+        self.parser = LogParser(fmt, datefmt, encoding)
+        if 'asctime' not in self.parser.fields and 'created' not in self.parser.fields:
+            raise ValueError('format has no time field: %r' % fmt)
+
+    def segments(self):
+        return iter_segments(self.logfile)
+
+    @staticmethod
+    def is_live(segment):
+        """the live file and .pending files may still grow, they are bisected instead of indexed"""
+        if segment.endswith(PENDING_SUFFIX):
+            return True
+        suffix = segment.rpartition('.')[2]
+        rotated = os.path.splitext(segment)[1] in COMPRESS_CODECS.values() or suffix.isdigit() \
+            or STAMP_PATTERN.fullmatch(suffix) is not None
+        return not rotated
+
+    def index(self, segment):
+        """valid index of a rotated segment, built (and saved) if missing or stale"""
+        index = SegmentIndex.load(index_path(segment))
+        if index is not None and index.valid_for(segment, self.fmt, self.datefmt):
+            return index
+        index = SegmentIndex.build(segment, self.fmt, self.datefmt, encoding=self.encoding)
+        if self.save_index:
+            try:
+                index.save(index_path(segment))
+            except OSError:
+                pass
+        return index
+
+    def _line_at(self, mm, pos):
+        """(offset, created) of the first record starting at or after pos, (len, None) if none"""
+        if pos > 0:
+            pos = mm.find(b'\n', pos - 1) + 1 or len(mm)
+        while pos < len(mm):
+            end = mm.find(b'\n', pos)
+            end = len(mm) if end < 0 else end + 1
+            entry = self.parser.match(mm[pos:end].decode(self.encoding, 'replace'))
+            if entry is not None:
+                return pos, entry.created
+            pos = end
+        return len(mm), None
+
+    def bisect(self, segment, start):
+        """byte offset of the first record at or after `start - SLACK` in a plain file"""
+        with open(segment, 'rb') as f:
+            if start is None or os.fstat(f.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                lo, hi = 0, len(mm)
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    pos, created = self._line_at(mm, mid)
+                    if created is None or created >= start - SLACK:
+                        hi = mid
+                    else:
+                        lo = pos + 1
+                return self._line_at(mm, lo)[0]
+
+    def _scan_live(self, segment, start, end):
+        offset = self.bisect(segment, start)
+        with open(segment, 'rb') as f:
+            f.seek(offset)
+            lines = (line.decode(self.encoding, 'replace') for line in iter(f.readline, b''))
+            for entry, text in self.parser.parse_lines(lines, raw=True):
+                if end is not None and entry.created > end + SLACK:
+                    break
+                yield entry, text
+
+    def _scan_indexed(self, segment, start, end, level):
+        index = self.index(segment)
+        if (start is not None and index.tmax < start) or (end is not None and index.tmin > end):
+            return
+        ranges = index.select(start, end, level)
+        if not ranges:
+            return
+        with open_binary(segment) as f:
+            for item in self.parser.parse_lines(_read_lines(f, ranges, self.encoding), raw=True):
+                yield item
+
+    def search(self, start=None, end=None, level=None, name=None, pattern=None, raw=False):
+        """
+        yield the LogEntry (or (LogEntry, text) with raw=True) of the records
+        start <= created <= end with levelno >= level, logger `name` or its
+        children, and a message matching the regex `pattern`, oldest first.
+        start/end: epoch seconds or text, see parse_time().
+        """
+        start, end = parse_time(start), parse_time(end)
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        search = re.compile(pattern).search if pattern else None
+        for segment in self.segments():
+            try:
+                if self.is_live(segment):
+                    items = self._scan_live(segment, start, end)
+                else:
+                    items = self._scan_indexed(segment, start, end, level)
+                for entry, text in items:
+                    if start is not None and entry.created < start or end is not None and entry.created > end:
+                        continue
+                    if level and (entry.levelno or 0) < level:
+                        continue
+                    if name and entry.name != name and not (entry.name or '').startswith(name + '.'):
+                        continue
+                    if search is not None and not search(entry.message or ''):
+                        continue
+                    yield (entry, text) if raw else entry
+            except FileNotFoundError:
+                # rotated or committed meanwhile
+                continue
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m xlogs.query', description='search xlogs log files')
+    parser.add_argument('logfile', help='live log file, its rotated segments are searched too')
+    parser.add_argument('--start', help='"%%Y-%%m-%%d %%H:%%M[:%%S]", "%%H:%%M[:%%S]" or epoch seconds')
+    parser.add_argument('--end', help='same as --start')
+    parser.add_argument('--level', help='minimum level name or number, e.g. ERROR')
+    parser.add_argument('--name', help='logger name (children included)')
+    parser.add_argument('--grep', help='message regex')
+    parser.add_argument('--format', default='info', help='info | debug | a logging format string')
+    parser.add_argument('--datefmt', default=None, help='datefmt of the log format')
+    parser.add_argument('--build-index', action='store_true', help='only build the indexes of rotated segments')
+    parser.add_argument('--no-save-index', action='store_true', help='do not write .idx files')
+    args = parser.parse_args(argv)
+
+    fmt = {'info': INFO_FORMATE, 'debug': DEBUG_FORMATE}.get(args.format, args.format)
+    query = LogQuery(args.logfile, fmt, args.datefmt, save_index=not args.no_save_index)
+    if args.build_index:
+        for segment in query.segments():
+            if not query.is_live(segment):
+                index = query.index(segment)
+                print('{0}: {1} blocks'.format(segment, len(index.blocks)))
+        return 0
+    level = args.level
+    if level is not None:
+        level = int(level) if level.isdigit() else logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            parser.error('unknown level {0!r}'.format(args.level))
+    try:
+        for _, text in query.search(args.start, args.end, level, args.name, args.grep, raw=True):
+            sys.stdout.write(text + '\n')
+    except BrokenPipeError:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
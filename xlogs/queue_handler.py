@@ -0,0 +1,459 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : queue_handler.py
+@Time  : 2026/10/18 09:12
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import heapq
+import logging
+import itertools
+import threading
+import collections
+
+"""
+Non-blocking emit path: the caller thread only appends the LogRecord to a
+bounded in-memory queue, one background writer thread formats and writes it
+through the real handlers.
+
+how to use:
+
+import logging
+from xlogs.queue_handler import AsyncQueueHandler, OVERFLOW_DROP_OLDEST
+
+file_handler = logging.FileHandler('message.log')
+qh = AsyncQueueHandler([file_handler], queue_size=10000, overflow=OVERFLOW_DROP_OLDEST)
+logging.getLogger('test').addHandler(qh)
+...
+qh.flush()   # wait until everything queued so far is written
+qh.close()   # drain the queue and stop the writer thread
+
+ThreadLocalQueueHandler is the variant for many logging threads: no lock
+shared by the callers. Each thread formats its records itself and appends
+them to its own deque; the writer takes them in batches (popleft), merges
+the deques by sequence number and writes the pre-formatted text through the
+real handlers, whose locks it is then the only one to take.
+"""
+
+# block the caller until the writer frees a slot
+OVERFLOW_BLOCK = 'block'
+# discard the oldest queued record to make room for the new one
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+# discard the new record, keep what is queued
+OVERFLOW_DROP_NEWEST = 'drop_newest'
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST)
+# default max records waiting in the queue
+QUEUE_SIZE = 10000
+
+
+class AsyncQueueHandler(logging.Handler):
+    """
+    Route records through a bounded queue to a single background writer thread.
+
+    Every record dropped by an overflow policy is counted in `dropped`, and the
+    writer reports the count with a WARNING record the next time it wakes up.
+    """
+
+    def __init__(self, handlers, queue_size=QUEUE_SIZE, overflow=OVERFLOW_BLOCK):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('overflow must be one of {0}, got {1!r}'.format(OVERFLOW_POLICIES, overflow))
+        if queue_size <= 0:
+            raise ValueError('queue_size must be > 0, got {0!r}'.format(queue_size))
+        logging.Handler.__init__(self)
+        self.handlers = list(handlers)
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.dropped = 0
+        self._reported = 0
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._start()
+
+    def _start(self):
+        # (re)create the queue state, also used in a forked child where the
+        # parent's writer thread and lock owners no longer exist
+        self._queue = collections.deque()
+        self._unfinished = 0
+        self._stopping = False
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+        self._all_done = threading.Condition(self._mutex)
+        # set when the writer thread returns, the callers then write synchronously
+        self._exited = False
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='xlogs-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def qsize(self):
+        """records waiting for the writer"""
+        return len(self._queue)
+
+    def handle(self, record):
+        """filter and enqueue, never take the handler lock in the caller thread"""
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        if self._closed or self._exited:
+            # after shutdown, fall back to a synchronous write
+            self._dispatch(record)
+            return
+        with self._mutex:
+            if len(self._queue) >= self.queue_size:
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    self.dropped += 1
+                    return
+                elif self.overflow == OVERFLOW_DROP_OLDEST:
+                    self._queue.popleft()
+                    self._unfinished -= 1
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.queue_size and not self._stopping and not self._exited:
+                        self._not_full.wait()
+            if not self._exited:
+                self._queue.append(record)
+                self._unfinished += 1
+                self._not_empty.notify()
+                return
+        self._dispatch(record)
+
+    def _dispatch(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                try:
+                    handler.handle(record)
+                except Exception:
+                    # a raising filter / handler must not kill the writer thread
+                    self.handleError(record)
+
+    def _drop_record(self, count):
+        return logging.makeLogRecord({
+            'name': 'xlogs', 'levelno': logging.WARNING, 'levelname': 'WARNING',
+            'msg': 'xlogs queue overflow (%s): dropped %d records', 'args': (self.overflow, count)})
+
+    def _run(self):
+        try:
+            self._write_loop()
+        finally:
+            with self._mutex:
+                # wake the callers blocked on a full queue and flush()
+                self._exited = True
+                self._not_full.notify_all()
+                self._all_done.notify_all()
+
+    def _write_loop(self):
+        while True:
+            with self._mutex:
+                while not self._queue and not self._stopping:
+                    self._not_empty.wait()
+                if not self._queue and self._stopping:
+                    return
+                batch = list(self._queue)
+                self._queue.clear()
+                dropped = self.dropped - self._reported
+                self._reported = self.dropped
+                self._not_full.notify_all()
+            if dropped:
+                self._dispatch(self._drop_record(dropped))
+            for record in batch:
+                self._dispatch(record)
+            with self._mutex:
+                self._unfinished -= len(batch)
+                if self._unfinished <= 0:
+                    self._all_done.notify_all()
+
+    def flush(self, timeout=None):
+        """wait until every record queued so far is written, then flush the handlers"""
+        if self._thread is not None and self._thread.is_alive() \
+                and self._thread is not threading.current_thread():
+            with self._mutex:
+                if self._unfinished > 0:
+                    self._all_done.wait_for(lambda: self._unfinished <= 0 or self._exited, timeout)
+        for handler in self.handlers:
+            handler.flush()
+
+    def shutdown(self):
+        """drain the queue, stop the writer thread and close the handlers"""
+        if self._closed:
+            return
+        with self._mutex:
+            self._stopping = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if self._pid == os.getpid() and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._closed = True
+        with self._mutex:
+            # records that raced in while the writer was stopping
+            leftover = list(self._queue)
+            self._queue.clear()
+        for record in leftover:
+            self._dispatch(record)
+        for handler in self.handlers:
+            handler.flush()
+            handler.close()
+
+    def close(self):
+        # logging.shutdown() calls this at exit
+        self.shutdown()
+        logging.Handler.close(self)
+
+
+# ThreadLocalQueueHandler: seconds between two writer passes, per-thread records which wake the writer at once
+WRITER_INTERVAL = 0.05
+WRITER_BATCH = 256
+
+
+class _PreformattedFormatter(object):
+    """formatter proxy returning the text formatted by the logging thread (record.preformatted)"""
+
+    def __init__(self, formatter):
+        self.formatter = formatter
+
+    def __getattr__(self, name):
+        # _fmt, _style, datefmt, usesTime()...: the wrapped formatter's
+        return getattr(self.formatter, name)
+
+    def format(self, record):
+        preformatted = record.__dict__.get('preformatted')
+        if preformatted is not None and self.formatter in preformatted:
+            return preformatted[self.formatter]
+        return self.formatter.format(record)
+
+
+class _PreformattedBytesFormatter(_PreformattedFormatter):
+    def format_bytes(self, record, buf):
+        preformatted = record.__dict__.get('preformatted')
+        key = (self.formatter, bytes)
+        if preformatted is not None and key in preformatted:
+            buf += preformatted[key]
+            return buf
+        return self.formatter.format_bytes(record, buf)
+
+
+class ThreadLocalQueueHandler(logging.Handler):
+    """
+    Route records through per-thread deques to a single background writer.
+
+    emit() checks the level and filters of every handler and formats the
+    record for those taking it in the calling thread (the text is kept on the
+    record, the handlers' formatters return it until close()), then appends
+    it with a sequence number to the thread's own deque: no lock is taken. Every `interval` seconds, or when a thread has `batch` records
+    waiting, the writer pops the records of every deque and writes them in
+    sequence order. A thread with max_pending records waiting blocks until
+    the writer has drained them. A record whose thread was preempted between its
+    sequence number and the append may be written in the next batch.
+    """
+
+    def __init__(self, handlers, interval=WRITER_INTERVAL, batch=WRITER_BATCH, max_pending=QUEUE_SIZE):
+        if max_pending <= 0:
+            raise ValueError('max_pending must be > 0, got {0!r}'.format(max_pending))
+        logging.Handler.__init__(self)
+        self.handlers = list(handlers)
+        self.interval = interval
+        self.batch = batch
+        self.max_pending = max_pending
+        # nothing is dropped, for the AsyncQueueHandler users (metrics)
+        self.dropped = 0
+        # handler: (formatter, preformatted key), the key is (formatter, bytes) for the handlers which call
+        # format_bytes(). Their formatters are swapped for a proxy until close()
+        self._formatters = {}
+        self._originals = []
+        for handler in self.handlers:
+            formatter = getattr(handler, 'formatter', None)
+            if formatter is None:
+                continue
+            if not isinstance(formatter, _PreformattedFormatter):
+                klass = _PreformattedBytesFormatter if hasattr(formatter, 'format_bytes') else _PreformattedFormatter
+                handler.formatter = klass(formatter)
+                self._originals.append((handler, formatter))
+            formatter = handler.formatter.formatter
+            as_bytes = getattr(handler, 'uses_format_bytes', False) and hasattr(formatter, 'format_bytes')
+            self._formatters[handler] = (formatter, (formatter, bytes) if as_bytes else formatter)
+        self._closed = False
+        self._start()
+
+    def _start(self):
+        # (re)create the writer state, also in a forked child
+        self._local = threading.local()
+        # (thread, deque) of every logging thread, the lock is only taken to add / remove one
+        self._queues = []
+        self._queues_lock = threading.Lock()
+        self._seq = itertools.count()
+        self._wake = threading.Event()
+        # writer passes started / finished, for flush()
+        self._done = threading.Condition(threading.Lock())
+        self._started = 0
+        self._finished = 0
+        self._stopping = False
+        # set when the writer thread returns, the callers then write synchronously
+        self._exited = False
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='xlogs-writer', daemon=True)
+        self._thread.start()
+
+    @property
+    def qsize(self):
+        """records waiting for the writer"""
+        return sum(len(queue) for _, queue in list(self._queues))
+
+    def _queue(self):
+        try:
+            return self._local.queue
+        except AttributeError:
+            queue = self._local.queue = collections.deque()
+            with self._queues_lock:
+                self._queues.append((threading.current_thread(), queue))
+            return queue
+
+    def handle(self, record):
+        """filter, format and enqueue, never take a handler lock in the caller thread"""
+        rv = self.filter(record)
+        if rv:
+            self.emit(record)
+        return rv
+
+    def _accept(self, record):
+        """the handlers taking the record (level and filters), formatted for them in the caller thread"""
+        handlers = []
+        preformatted = {}
+        for handler in self.handlers:
+            try:
+                if record.levelno < handler.level or not handler.filter(record):
+                    continue
+                handlers.append(handler)
+                formatter, key = self._formatters.get(handler, (None, None))
+                if formatter is not None and key not in preformatted:
+                    preformatted[key] = formatter.format(record) if key is formatter else \
+                        formatter.format_bytes(record, bytearray())
+            except Exception:
+                self.handleError(record)
+        record.preformatted = preformatted
+        return handlers
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        if self._closed or self._exited:
+            # after shutdown, fall back to a synchronous write
+            self._dispatch(record)
+            return
+        handlers = self._accept(record)
+        if not handlers:
+            return
+        queue = self._queue()
+        # next() and append() are atomic: no lock
+        queue.append((next(self._seq), record, handlers))
+        if len(queue) >= self.batch:
+            self._wake.set()
+            if len(queue) >= self.max_pending:
+                # the writer notifies _done after each pass
+                with self._done:
+                    self._done.wait_for(
+                        lambda: len(queue) < self.max_pending or self._stopping or self._exited)
+
+    def _dispatch(self, record, handlers=None):
+        if handlers is None:
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    try:
+                        handler.handle(record)
+                    except Exception:
+                        self.handleError(record)
+            return
+        # level and filters already checked by _accept()
+        for handler in handlers:
+            try:
+                handler.acquire()
+                try:
+                    handler.emit(record)
+                finally:
+                    handler.release()
+            except Exception:
+                # a raising handler must not kill the writer thread
+                self.handleError(record)
+
+    def _drain(self):
+        runs = []
+        with self._queues_lock:
+            queues = list(self._queues)
+        for thread, queue in queues:
+            # popleft() only what is there now: the thread keeps appending
+            run = [queue.popleft() for _ in range(len(queue))]
+            if run:
+                runs.append(run)
+            elif not thread.is_alive():
+                with self._queues_lock:
+                    self._queues.remove((thread, queue))
+        batch = runs[0] if len(runs) == 1 else heapq.merge(*runs)
+        for _, record, handlers in batch:
+            self._dispatch(record, handlers)
+
+    def _run(self):
+        try:
+            self._write_loop()
+        finally:
+            with self._done:
+                # wake flush()
+                self._exited = True
+                self._done.notify_all()
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._done:
+                self._started += 1
+                started = self._started
+            stopping = self._stopping
+            self._drain()
+            with self._done:
+                self._finished = started
+                self._done.notify_all()
+            if stopping:
+                return
+
+    def flush(self, timeout=None):
+        """wait until every record enqueued so far is written, then flush the handlers"""
+        if self._thread is not None and self._thread.is_alive() \
+                and self._thread is not threading.current_thread():
+            with self._done:
+                # a pass started after this call
+                target = self._started + 1
+                self._wake.set()
+                self._done.wait_for(lambda: self._finished >= target or self._exited, timeout)
+        for handler in self.handlers:
+            handler.flush()
+
+    def shutdown(self):
+        """write what is enqueued, stop the writer thread and close the handlers"""
+        if self._closed:
+            return
+        self._stopping = True
+        self._wake.set()
+        if self._pid == os.getpid() and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._closed = True
+        # records that raced in while the writer was stopping
+        self._drain()
+        for handler, formatter in self._originals:
+            if isinstance(handler.formatter, _PreformattedFormatter):
+                handler.formatter = formatter
+        for handler in self.handlers:
+            handler.flush()
+            handler.close()
+
+    def close(self):
+        # logging.shutdown() calls this at exit
+        self.shutdown()
+        logging.Handler.close(self)
@@ -0,0 +1,246 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : rotation.py
+@Time  : 2026/10/18 21:10
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import threading
+
+from .compress import COMPRESSOR, COMPRESS_CODECS, ArchiveJob, archive_ext, remove_stale_tmp
+
+"""
+Hybrid rotation engine: segment names, rollover times and retention.
+
+Rotated segments are named by the rollover time, `<logfile>.20261018-211000`
+(`-1`, `-2`... when several rollovers fall in one second), so a rollover is
+one rename, whatever the number of kept segments, and the names sort by age.
+Compressed segments get the codec extension, `<logfile>.20261018-211000.gz`.
+
+Retention runs on the background compressor thread, after the compression
+jobs submitted before it: rotated segments older than max_age, beyond
+backup_count per log, then the oldest ones until the files of the logs in a
+directory take at most total_bytes are deleted. The janitor thread submits
+the retention jobs of every registered log every JANITOR_INTERVAL seconds,
+so idle logs are cleaned too.
+
+The handlers are xlog2's HybridRotatingFileHandler (and its buffered
+variant), see LoggerConfig(rotate_when='midnight', max_age=..., total_bytes=...).
+"""
+
+# rotated segments older than MAX_AGE seconds are deleted
+MAX_AGE = 30 * 24 * 3600
+# seconds between two retention runs of the janitor thread
+JANITOR_INTERVAL = 60.0
+STAMP_FORMAT = '%Y%m%d-%H%M%S'
+STAMP_PATTERN = re.compile(r'(\d{8}-\d{6})(?:-(\d+))?')
+# when -> seconds, 'D' / 'MIDNIGHT' roll at local midnight
+_PERIODS = {'S': 1, 'M': 60, 'H': 3600}
+
+
+def next_rollover(now, when='midnight', interval=1):
+    """the first `when` * interval boundary (local time) after now"""
+    when = when.upper()
+    if when in ('D', 'MIDNIGHT'):
+        t = time.localtime(now)
+        # mktime() normalizes the day overflow and the DST change
+        return time.mktime((t.tm_year, t.tm_mon, t.tm_mday + interval, 0, 0, 0, 0, 0, -1))
+    try:
+        period = _PERIODS[when] * interval
+    except KeyError:
+        raise ValueError('unknown rotate when {0!r}, expect S, M, H, D or midnight'.format(when))
+    offset = time.localtime(now).tm_gmtoff
+    return (int(now + offset) // period + 1) * period - offset
+
+
+def segment_key(logfile, path):
+    """(stamp, n) of a rotated segment path of logfile (plain or compressed), None for other files"""
+    if not path.startswith(logfile + '.'):
+        return None
+    suffix = path[len(logfile) + 1:]
+    for ext in set(COMPRESS_CODECS.values()):
+        if suffix.endswith(ext):
+            suffix = suffix[:-len(ext)]
+            break
+    m = STAMP_PATTERN.fullmatch(suffix)
+    if m is None:
+        return None
+    return m.group(1), int(m.group(2) or 0)
+
+
+def stamped_segments(logfile):
+    """rotated segments of logfile, oldest first"""
+    keyed = []
+    for path in glob.glob(glob.escape(logfile) + '.[0-9]*-[0-9]*'):
+        key = segment_key(logfile, path)
+        if key is not None:
+            keyed.append((key, path))
+    return [path for _, path in sorted(keyed)]
+
+
+def next_segment(logfile, now, last=None):
+    """(key, path) of the segment rotated at `now`, always after the `last` key"""
+    stamp = time.strftime(STAMP_FORMAT, time.localtime(now))
+    key = (last[0], last[1] + 1) if last is not None and stamp <= last[0] else (stamp, 0)
+    if key[1]:
+        return key, '%s.%s-%d' % (logfile, key[0], key[1])
+    return key, '%s.%s' % (logfile, key[0])
+
+
+def recover_segments(logfile, codec, level=None, index=None):
+    """
+    finish the compression left by a previous run: compress the plain
+    segments, drop plain segments whose archive was committed, remove temp
+    files of dead processes. Return the submitted jobs.
+    """
+    remove_stale_tmp(glob.escape(logfile) + '.*.tmp')
+    jobs = []
+    ext = archive_ext(codec)
+    for path in stamped_segments(logfile):
+        if os.path.splitext(path)[1] in COMPRESS_CODECS.values():
+            continue
+        if os.path.exists(path + ext):
+            os.remove(path)
+        else:
+            jobs.append(COMPRESSOR.submit(ArchiveJob(path, codec, level, index)))
+    return jobs
+
+
+def _remove(path):
+    removed = 0
+    for name in (path, path + '.idx'):
+        try:
+            removed += os.path.getsize(name)
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _size(path):
+    size = 0
+    for name in (path, path + '.idx'):
+        try:
+            size += os.path.getsize(name)
+        except FileNotFoundError:
+            pass
+    return size
+
+
+def enforce_retention(policies, total_bytes=None, now=None):
+    """
+    delete rotated segments of the logs of one directory, return the deleted paths.
+    policies: {logfile: (max_age, backup_count)}, 0 / None disables a limit;
+    total_bytes: budget of the live files + segments (+ `.idx`) of all these logs.
+    """
+    now = time.time() if now is None else now
+    deleted = []
+    # (mtime, path, size) of the kept segments of every log
+    kept = []
+    for logfile, (max_age, backup_count) in policies.items():
+        segments = stamped_segments(logfile)
+        if backup_count and len(segments) > backup_count:
+            for path in segments[:len(segments) - backup_count]:
+                _remove(path)
+                deleted.append(path)
+            segments = segments[len(segments) - backup_count:]
+        for path in segments:
+            try:
+                mtime = os.path.getmtime(path)
+            except FileNotFoundError:
+                continue
+            if max_age and mtime < now - max_age:
+                _remove(path)
+                deleted.append(path)
+            else:
+                kept.append((mtime, path, _size(path)))
+    if total_bytes:
+        total = sum(size for _, _, size in kept) + sum(_size(logfile) for logfile in policies)
+        for _, path, size in sorted(kept):
+            if total <= total_bytes:
+                break
+            total -= _remove(path)
+            deleted.append(path)
+    return deleted
+
+
+class RetentionJob(object):
+    """enforce_retention() of one log directory, runs on the compressor thread"""
+
+    def __init__(self, directory, policies, total_bytes=None):
+        self.directory = directory
+        self.policies = policies
+        self.total_bytes = total_bytes
+        self.deleted = []
+        self.error = None
+        self.done = threading.Event()
+
+    def run(self):
+        self.deleted = enforce_retention(self.policies, self.total_bytes)
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def __str__(self):
+        return 'retention of {0}'.format(self.directory)
+
+
+class _Janitor(object):
+    """one daemon thread per process, submits the RetentionJobs of the registered logs periodically"""
+
+    def __init__(self, interval=JANITOR_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        # logfile -> (max_age, backup_count, total_bytes)
+        self._logs = {}
+        self._thread = None
+        self._pid = None
+
+    def register(self, logfile, max_age=MAX_AGE, backup_count=0, total_bytes=None):
+        with self._lock:
+            self._logs[logfile] = (max_age, backup_count, total_bytes)
+            if self._pid != os.getpid() or not self._thread.is_alive():
+                # first use, or a forked child where the thread does not exist
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='xlogs-janitor', daemon=True)
+                self._thread.start()
+
+    def unregister(self, logfile):
+        with self._lock:
+            self._logs.pop(logfile, None)
+
+    def jobs(self, directory=None):
+        """one RetentionJob per log directory (or for `directory` only), the smallest total_bytes applies"""
+        directories = {}
+        with self._lock:
+            for logfile, (max_age, backup_count, total_bytes) in self._logs.items():
+                key = os.path.dirname(logfile)
+                if directory is not None and key != directory:
+                    continue
+                policies, budget = directories.get(key, ({}, None))
+                policies[logfile] = (max_age, backup_count)
+                if total_bytes and (budget is None or total_bytes < budget):
+                    budget = total_bytes
+                directories[key] = (policies, budget)
+        return [RetentionJob(key, policies, budget) for key, (policies, budget) in directories.items()]
+
+    def submit(self, directory=None):
+        return [COMPRESSOR.submit(job) for job in self.jobs(directory)]
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.submit()
+            except Exception as e:
+                sys.stderr.write('xlogs: retention failed: {0}\n'.format(e))
+
+
+JANITOR = _Janitor()
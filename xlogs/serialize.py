@@ -0,0 +1,301 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : serialize.py
+@Time  : 2026/10/19 11:30
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import json
+import math
+import time
+import struct
+import logging
+from operator import attrgetter
+from json.encoder import encode_basestring
+from .context import Context
+from .formatter import FastFormatter, compile_format, record_context, record_extra
+
+"""
+Structured output: JsonFormatter writes one JSON object per line and
+BinaryFormatter length-prefixed binary records (the collector's record
+layout, read back by xlogs.parser.parse_binary). Both serialize the record
+fields and `extra` straight into the handler's reusable bytearray with
+format_bytes().
+
+Imported with the first json / binary formatter, the names are also
+xlogs.formatter's (config.ini: class = xlogs.formatter.JsonFormatter).
+"""
+
+JSON_FIELDS = ('created', 'asctime', 'name', 'levelname', 'filename', 'lineno', 'funcName', 'process', 'thread',
+               'message')
+
+_json_encode = json.JSONEncoder(default=str, ensure_ascii=False, separators=(',', ':'), allow_nan=False).encode
+
+
+def _finite(value):
+    """value with its NaN / inf floats replaced by None"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def _json_dumps(value):
+    try:
+        return _json_encode(value)
+    except ValueError as e:
+        if 'float' not in str(e):
+            raise
+        # NaN / inf are not JSON: null, as JSON.stringify()
+        return _json_encode(_finite(value))
+
+
+def _json_float(value):
+    return float.__repr__(value) if math.isfinite(value) else 'null'
+
+
+_JSON_ENCODERS = {
+    str: encode_basestring,
+    int: int.__repr__,
+    float: _json_float,
+    bool: lambda value: 'true' if value else 'false',
+    type(None): lambda value: 'null',
+}
+
+
+def json_value(value):
+    """JSON text of one value, str() for objects JSON has no type for"""
+    return _JSON_ENCODERS.get(value.__class__, _json_dumps)(value)
+
+
+_json_loads = json.JSONDecoder().decode
+_JSON_CONSTANTS = {'true': True, 'false': False, 'null': None}
+
+
+def json_load_value(text):
+    """inverse of json_value(), plain strings / ints / constants without the json module"""
+    if text[:1] == '"':
+        if '\\' not in text:
+            return text[1:-1]
+    elif text.isdigit():
+        return int(text)
+    elif text in _JSON_CONSTANTS:
+        return _JSON_CONSTANTS[text]
+    return _json_loads(text)
+
+
+class JsonFormatter(FastFormatter):
+    """
+    One JSON object per record: the fields named in fmt (JSON_FIELDS without
+    fmt), exc_text / stack_info when set, the `extra` attributes, then the
+    context fields (an `extra` of the same name wins).
+    """
+
+    def __init__(self, fmt=None, datefmt=None, style='%', validate=True, fields=None, **kwargs):
+        super(JsonFormatter, self).__init__(fmt, datefmt, style, validate, **kwargs)
+        if fields is None:
+            fields = compile_format(fmt)[1] if fmt and style == '%' else JSON_FIELDS
+        self.fields = tuple(dict.fromkeys(fields))
+        self._field_set = frozenset(self.fields)
+        self._uses_time = 'asctime' in self._field_set
+        self._prefixes = tuple(('{' if i == 0 else ',') + encode_basestring(f) + ':' for i, f in enumerate(self.fields))
+        getter = attrgetter(*self.fields)
+        self._getter = getter if len(self.fields) > 1 else lambda record: (getter(record),)
+        # (Context, its JSON members): the members are encoded once per bound context
+        self._context_cache = (None, '')
+
+    def _context_json(self, context):
+        cached, text = self._context_cache
+        if cached is not context:
+            text = ''.join([',' + encode_basestring(key) + ':' + json_value(value)
+                            for key, value in context.items() if key not in self._field_set])
+            self._context_cache = (context, text)
+        return text
+
+    def format(self, record):
+        record.message = record.getMessage()
+        if self._uses_time:
+            record.asctime = self.formatTime(record, self.datefmt)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        try:
+            values = self._getter(record)
+        except AttributeError:
+            values = [getattr(record, f, None) for f in self.fields]
+        encoders = _JSON_ENCODERS
+        s = ''.join([prefix + encoders.get(value.__class__, _json_dumps)(value)
+                     for prefix, value in zip(self._prefixes, values)])
+        if record.exc_text and 'exc_text' not in self._field_set:
+            s += ',"exc_text":' + encode_basestring(record.exc_text)
+        if record.stack_info and 'stack_info' not in self._field_set:
+            s += ',"stack_info":' + encode_basestring(self.formatStack(record.stack_info))
+        extra = record_extra(record)
+        for key in extra:
+            if key not in self._field_set:
+                s += ',' + encode_basestring(key) + ':' + json_value(record.__dict__[key])
+        context = record_context(record)
+        if context.__class__ is not Context:
+            # a plain `context` extra
+            s += ',"context":' + json_value(context)
+        elif context:
+            if extra:
+                s += ''.join([',' + encode_basestring(key) + ':' + json_value(value)
+                              for key, value in context.items() if key not in self._field_set and key not in extra])
+            else:
+                s += self._context_json(context)
+        return s + '}'
+
+    def format_bytes(self, record, buf):
+        """append the record's JSON line to bytearray buf"""
+        buf += self.format(record).encode('utf-8', 'backslashreplace')
+        buf += b'\n'
+        return buf
+
+
+# binary record layout, also the collector's wire format:
+# record := <f64 created> <u16 levelno> <u32 process> <u64 thread> <u32 lineno>
+#           <u32 * 8 utf-8 lengths of name, msg, pathname, funcName, threadName,
+#            processName, exc_text, stack_info> <the 8 utf-8 strings>
+#           <u16 extra count> (<u32 key length> <u32 value length> <key> <JSON value>)*
+#           (the log context is the extra `context`, a JSON object of its fields)
+# BinaryFormatter file := (<u32 record length> record)*
+RECORD_HEAD = struct.Struct('<dHIQI8I')
+RECORD_STR_FIELDS = ('name', 'msg', 'pathname', 'funcName', 'threadName', 'processName', 'exc_text', 'stack_info')
+_LEN = struct.Struct('<I')
+_COUNT = struct.Struct('<H')
+_EXTRA_LEN = struct.Struct('<II')
+_exc_formatter = logging.Formatter()
+_new_record = object.__new__
+_START_TIME = getattr(logging, '_startTime', time.time())
+
+
+def pack_record(record, buf):
+    """append the binary form of a LogRecord to bytearray `buf`, args are merged into msg"""
+    if record.exc_info and not record.exc_text:
+        record.exc_text = _exc_formatter.formatException(record.exc_info)
+    values = (record.name, record.getMessage(), record.pathname, record.funcName or '', record.threadName or '',
+              record.processName or '', record.exc_text or '', record.stack_info or '')
+    text = ''.join(values)
+    data = text.encode('utf-8', 'backslashreplace')
+    # one encode() for the common all-ASCII record: the str lengths are the byte lengths
+    lengths = map(len, values) if len(data) == len(text) else \
+        [len(value.encode('utf-8', 'backslashreplace')) for value in values]
+    buf += RECORD_HEAD.pack(record.created, record.levelno, record.process or 0, record.thread or 0,
+                            record.lineno or 0, *lengths)
+    buf += data
+    extra = record_extra(record)
+    context = record_context(record)
+    buf += _COUNT.pack(len(extra) + 1 if context else len(extra))
+    for key in extra:
+        key, value = key.encode('utf-8', 'backslashreplace'), json_value(record.__dict__[key]).encode(
+            'utf-8', 'backslashreplace')
+        buf += _EXTRA_LEN.pack(len(key), len(value))
+        buf += key
+        buf += value
+    if context:
+        value = json_value(dict(context.items()) if context.__class__ is Context else context).encode(
+            'utf-8', 'backslashreplace')
+        buf += _EXTRA_LEN.pack(7, len(value))
+        buf += b'context'
+        buf += value
+    return buf
+
+
+def unpack_fields(view, offset):
+    """(head tuple, [str fields], extra dict or None, next offset) of the record at offset"""
+    head = RECORD_HEAD.unpack_from(view, offset)
+    offset += RECORD_HEAD.size
+    lengths = head[5:]
+    size = sum(lengths)
+    text = str(view[offset:offset + size], 'utf-8')
+    values = []
+    if len(text) == size:
+        # ASCII: slice the str of all fields
+        pos = 0
+        for length in lengths:
+            values.append(text[pos:pos + length])
+            pos += length
+    else:
+        pos = offset
+        for length in lengths:
+            values.append(str(view[pos:pos + length], 'utf-8'))
+            pos += length
+    offset += size
+    count, = _COUNT.unpack_from(view, offset)
+    offset += 2
+    extra = None
+    if count:
+        extra = {}
+        for _ in range(count):
+            key_length, length = _EXTRA_LEN.unpack_from(view, offset)
+            offset += 8
+            key = str(view[offset:offset + key_length], 'utf-8')
+            offset += key_length
+            extra[key] = json_load_value(str(view[offset:offset + length], 'utf-8'))
+            offset += length
+    return head[:5], values, extra, offset
+
+
+def unpack_records(data, count):
+    """yield `count` LogRecords from consecutive binary records in data"""
+    view = memoryview(data)
+    offset = 0
+    for _ in range(count):
+        (created, levelno, process, thread, lineno), values, extra, offset = unpack_fields(view, offset)
+        name, msg, pathname, func_name, thread_name, process_name, exc_text, stack_info = values
+        filename = os.path.basename(pathname)
+        # skip LogRecord.__init__, every attribute comes from the binary record
+        record = _new_record(logging.LogRecord)
+        record.__dict__.update({
+            'name': name,
+            'msg': msg,
+            'args': None,
+            'levelno': levelno,
+            'levelname': logging.getLevelName(levelno),
+            'pathname': pathname,
+            'filename': filename,
+            'module': os.path.splitext(filename)[0],
+            'exc_info': None,
+            'exc_text': exc_text or None,
+            'stack_info': stack_info or None,
+            'lineno': lineno,
+            'funcName': func_name,
+            'created': created,
+            'msecs': int((created - int(created)) * 1000) + 0.0,
+            'relativeCreated': (created - _START_TIME) * 1000,
+            'thread': thread,
+            'threadName': thread_name,
+            'processName': process_name,
+            'process': process,
+        })
+        if extra:
+            context = extra.get('context')
+            if context.__class__ is dict:
+                extra['context'] = Context.from_items(context.items())
+            record.__dict__.update(extra)
+        yield record
+
+
+class BinaryFormatter(logging.Formatter):
+    """
+    Length-prefixed binary records, see the layout above. Writes bytes only:
+    use it with the xlogs file handlers (buffered / process safe), which call
+    format_bytes() instead of format().
+    """
+
+    def format_bytes(self, record, buf):
+        """append `<u32 length> record` to bytearray buf"""
+        start = len(buf)
+        buf += b'\0\0\0\0'
+        pack_record(record, buf)
+        _LEN.pack_into(buf, start, len(buf) - start - 4)
+        return buf
+
+    def format(self, record):
+        raise TypeError('BinaryFormatter writes bytes, use it with a buffered or process safe xlogs file handler')
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : helpers.py
+@Time  : 2026/10/19 10:20
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import logging
+
+"""
+shared by the test cases:
+    make_record('hello', logging.ERROR, request_id='r-1')  -> a LogRecord of logger 'test'
+    ListHandler(gate)                                      -> collect the records in .records, wait the gate event
+"""
+
+
+def make_record(msg='hello', level=logging.INFO, created=None, **extra):
+    record = logging.makeLogRecord({'name': 'test', 'levelno': level, 'levelname': logging.getLevelName(level),
+                                    'msg': msg})
+    if created is not None:
+        record.created = created
+    record.__dict__.update(extra)
+    return record
+
+
+class ListHandler(logging.Handler):
+    """collect records, optionally blocking until released"""
+    def __init__(self, gate=None):
+        logging.Handler.__init__(self)
+        self.records = []
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.records.append(record)
+
+
+if __name__ == '__main__':
+    pass
@@ -12,6 +12,7 @@ import logging
 import unittest
 
 from xlogs import LogConfig, log
+from xlogs.xlog2 import basic_config, get_logger
 
 
 class XLogTC(unittest.TestCase):
@@ -54,8 +55,62 @@ class XLogTC(unittest.TestCase):
         self.assertTrue(1)
 
 
+class LogTestCase(unittest.TestCase):
+    """xlog2 basic_config / get_logger test case"""
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_1(self):
+        log_file = "test_1.log"
+        basic_config(log_file)
+        logger = logging.getLogger(__name__)
+        logger.info('test_1 start ...')
+        logger.warning('test_1 hello,world')
+        logger.debug('test_1 hello,world')
+        logger.error('test_1 hello,world')
+        logger.critical('test_1 hello,world')
+
+    def test_2(self):
+        logfile = "test_2.log"
+        logger = get_logger(logfile=logfile, logger_name='test2', debug=True)
+        logger.info('test_2 start ...')
+        logger.warning('test_2 hello,world')
+        logger.debug('test_2 hello,world')
+        logger.error('test_2 hello,world')
+        logger.critical('test_2 hello,world')
+
+    def test_2_2(self):
+        log_file = "test_2_2.log"
+        basic_config(log_file)
+        logger = logging.getLogger(__name__)
+        logger.info('test_2_2 start ...')
+        logger.warning('test_2_2 hello,world')
+        logger.debug('test_2_2 hello,world')
+        logger.error('test_2_2 hello,world')
+        logger.critical('test_2_2 hello,world')
+
+    def test_3(self):
+        logger = get_logger(logger_name='test2', logfile='test.log', reset=True)
+        logger.info('test_3 start ...')
+        logger.warning('test_3 hello,world')
+        logger.debug('test_3 hello,world')
+        logger.error('test_3 hello,world')
+        logger.critical('test_3 hello,world')
+        logger.log(21, 'test_3 hello,world')
+
+    def test_4(self):
+        logger = get_logger(logger_name='test2')
+        logger.info('test_4 start ...')
+        logger.warning('test_4 hello,world')
+
+
 if __name__ == '__main__':
     # test
     # unittest.main()
     suite = unittest.TestLoader().loadTestsFromTestCase(XLogTC)
+    suite.addTests(unittest.TestLoader().loadTestsFromTestCase(LogTestCase))
     unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,93 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_aio.py
+@Time  : 2026/10/19 01:30
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import time
+import asyncio
+import logging
+import unittest
+import contextvars
+
+from xlogs import aio, xlog2
+from xlogs.xlog2 import LoggerConfig
+from xlogs.aio import AioQueueHandler, attach_context
+from xlogs.queue_handler import OVERFLOW_DROP_OLDEST
+
+request_id = contextvars.ContextVar('request_id')
+
+
+class _SlowHandler(logging.Handler):
+    def __init__(self, delay=0.0):
+        logging.Handler.__init__(self)
+        self.delay = delay
+        self.records = []
+
+    def emit(self, record):
+        time.sleep(self.delay)
+        self.records.append(record)
+
+
+class AioTC(unittest.TestCase):
+    """asyncio logger test case"""
+
+    def test_1_task_and_context(self):
+        record = attach_context(logging.makeLogRecord({'msg': 'x'}), [request_id])
+        self.assertIsNone(record.taskName)
+        self.assertFalse(hasattr(record, 'request_id'))
+
+        target = _SlowHandler()
+        logger = aio.get_logger(logger_name='aio', output_logfile=False, print_console=False, reset=True,
+                                context_vars=[request_id])
+        self.assertIsInstance(logger.handlers[0], AioQueueHandler)
+        self.assertEqual(logger.handlers[0].overflow, OVERFLOW_DROP_OLDEST)
+        logger.handlers[0].handlers.append(target)
+
+        async def job(i):
+            request_id.set('req-%d' % i)
+            logger.info('job %d', i, extra={'request_id': 'extra'} if i == 2 else None)
+
+        async def main():
+            await asyncio.gather(*(asyncio.create_task(job(i), name='job-%d' % i) for i in range(3)))
+            await logger.aflush()
+
+        asyncio.run(main())
+        self.assertEqual([(r.taskName, r.request_id, r.getMessage()) for r in target.records],
+                         [('job-0', 'req-0', 'job 0'), ('job-1', 'req-1', 'job 1'), ('job-2', 'extra', 'job 2')])
+
+    def test_2_emit_does_not_wait_for_the_writer(self):
+        target = _SlowHandler(0.01)
+        handler = AioQueueHandler([target], queue_size=1000)
+        logger = logging.getLogger('aio2')
+        logger.propagate = False
+        logger.handlers = [handler]
+
+        async def main():
+            start = time.perf_counter()
+            for i in range(20):
+                logger.warning('record %d', i)
+            elapsed = time.perf_counter() - start
+            await handler.aflush()
+            await handler.ashutdown()
+            return elapsed
+
+        self.assertLess(asyncio.run(main()), 0.1)
+        self.assertEqual(len(target.records), 20)
+        logger.handlers = []
+
+    def test_3_after_a_sync_logger(self):
+        xlog2.get_logger(logger_name='aio3', output_logfile=False, print_console=False, reset=True)
+        logger = aio.get_logger(logger_name='aio3', output_logfile=False, print_console=False)
+        self.assertIsInstance(logger.handlers[0], AioQueueHandler)
+        # already in asyncio mode: the same handler
+        handler = logger.handlers[0]
+        self.assertIs(aio.get_logger(logger_name='aio3').handlers[0], handler)
+        LoggerConfig().shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_analysis.py
+@Time  : 2026/10/18 20:10
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import io
+import os
+import json
+import tempfile
+import unittest
+import contextlib
+
+from xlogs.xlog2 import DEBUG_FORMATE
+from xlogs.analysis import analyze, work_units, main
+from xlogs.bench.analysis import make_corpus, LEVELS, SOURCES
+
+
+class AnalysisTC(unittest.TestCase):
+    """xlogs.analysis test case"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmp.name, 'message.log')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertCounts(self, result, records):
+        self.assertEqual(result.records, records)
+        expect_levels = {}
+        for seq in range(records):
+            expect_levels[LEVELS[seq % 6]] = expect_levels.get(LEVELS[seq % 6], 0) + 1
+        self.assertEqual(dict(result.levels), expect_levels)
+        self.assertEqual(sum(result.srclines.values()), records)
+        self.assertEqual(result.srclines['%s[%d]' % SOURCES[0]], (records + 4) // 5)
+        self.assertEqual(sum(result.buckets.values()), records)
+
+    def test_1_ranges_split_anywhere(self):
+        records = make_corpus(self.logfile, size_mb=1, segments=2)
+        units = work_units(self.logfile, chunk_size=10007)
+        self.assertGreater(len(units), 50)
+        self.assertCounts(analyze(self.logfile, DEBUG_FORMATE, workers=1, chunk_size=10007), records)
+        self.assertEqual(analyze(self.logfile, DEBUG_FORMATE, workers=1, chunk_size=10007),
+                         analyze(self.logfile, DEBUG_FORMATE, workers=1))
+
+    def test_2_process_pool_and_archives(self):
+        records = make_corpus(self.logfile, size_mb=1, segments=2, codec='gzip_blocks')
+        self.assertTrue(all(kind == 'block' for kind, path, _, _ in work_units(self.logfile) if path.endswith('.gz')))
+        self.assertCounts(analyze(self.logfile, DEBUG_FORMATE, workers=2, chunk_size=100000), records)
+
+    def test_3_cli_json(self):
+        records = make_corpus(self.logfile, size_mb=1, segments=0, codec=None)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            main([self.logfile, '--format', 'debug', '--workers', '1', '--json'])
+        result = json.loads(out.getvalue())
+        self.assertEqual(result['records'], records)
+        self.assertEqual(set(result['names']), {'app', 'app.db', 'app.http', 'worker'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_bench.py
+@Time  : 2026/10/19 03:50
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import json
+import logging
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from xlogs.bench.suite import main, cases
+
+
+class BenchSuiteTC(unittest.TestCase):
+    """python -m xlogs.bench test case"""
+
+    def test_1_json_report(self):
+        disabled = {name: logger.disabled for name, logger in logging.root.manager.loggerDict.items()
+                    if isinstance(logger, logging.Logger)}
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'bench.json')
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                main(['--number', '50', '--repeat', '1', '--threads', '2', '--output', output])
+                main(['--number', '50', '--repeat', '1', '--case', 'console', '--compare', output])
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(list(report['results']), [name for name, _ in cases(2)])
+        for row in report['results'].values():
+            self.assertEqual(row['records'], 50)
+            self.assertGreater(row['records_per_s'], 0)
+        # the LogConfig case left the other loggers as they were
+        self.assertEqual({name: logging.root.manager.loggerDict[name].disabled for name in disabled}, disabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_blockgzip.py
+@Time  : 2026/10/18 19:10
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from xlogs.blockgzip import BlockGzipFile, BlockGzipReader, block_ranges, read_block, read_index, is_block_gzip
+
+LINES = [('%06d %s\n' % (i, 'x' * (i % 97))).encode() for i in range(20000)]
+TEXT = b''.join(LINES)
+
+
+class BlockGzipTC(unittest.TestCase):
+    """block gzip archive test case"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'message.log.1.gz')
+        with open(self.path, 'wb') as raw:
+            with BlockGzipFile(raw, level=1, block_size=64 * 1024) as f:
+                for i in range(0, len(TEXT), 10000):
+                    f.write(TEXT[i:i + 10000])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_1_plain_gzip_compatible(self):
+        with gzip.open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), TEXT)
+        if shutil.which('zcat'):
+            self.assertEqual(subprocess.run(['zcat', self.path], stdout=subprocess.PIPE, check=True).stdout, TEXT)
+
+    def test_2_blocks_cut_at_lines(self):
+        blocks, size, _ = read_index(self.path)
+        self.assertEqual(size, len(TEXT))
+        self.assertGreater(len(blocks), 10)
+        for coffset, length, offset in block_ranges(self.path):
+            data = read_block(self.path, coffset, length)
+            self.assertEqual(data, TEXT[offset:offset + len(data)])
+            self.assertTrue(data.endswith(b'\n'))
+        self.assertFalse(is_block_gzip(__file__))
+
+    def test_3_seek_read_tail(self):
+        with BlockGzipReader(self.path) as f:
+            for offset in (0, 1, 70000, len(TEXT) - 5, len(TEXT) // 2):
+                f.seek(offset)
+                self.assertEqual(f.read(200000), TEXT[offset:offset + 200000])
+            offset = TEXT.index(LINES[12345])
+            f.seek(offset)
+            self.assertEqual(f.readline(), LINES[12345])
+            self.assertEqual(f.tell(), offset + len(LINES[12345]))
+            self.assertEqual(f.tail(1000), LINES[-1000:])
+
+    def test_4_parallel_decompress(self):
+        with ThreadPoolExecutor(4) as pool:
+            parts = pool.map(lambda r: read_block(self.path, r[0], r[1]), block_ranges(self.path))
+            self.assertEqual(b''.join(parts), TEXT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_collector.py
+@Time  : 2026/10/18 14:30
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import logging
+import tempfile
+import threading
+import unittest
+import subprocess
+import multiprocessing
+
+from xlogs.compress import WINDOWS
+from xlogs.collector import CollectorHandler, LogCollector, pack_record, unpack_records
+
+
+class CollectorTC(unittest.TestCase):
+    """collector mode test case"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmp.name, 'collector.log')
+        self.logger = logging.getLogger('worker')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+
+    def tearDown(self):
+        self.logger.handlers = []
+        self.tmp.cleanup()
+
+    def _collector(self):
+        return LogCollector(os.path.join(self.tmp.name, 'xlogs.sock'), logger_name='collector',
+                            logfile=self.logfile, print_console=False, reset=True)
+
+    def _lines(self):
+        with open(self.logfile) as f:
+            return f.read().splitlines()
+
+    def test_1_pack_unpack(self):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = self.logger.makeRecord('worker', logging.ERROR, __file__, 10, 'x=%d', (5,), sys.exc_info(),
+                                            func='test_1')
+        buf = pack_record(record, bytearray())
+        copy, = unpack_records(bytes(buf), 1)
+        for key in ('name', 'levelno', 'levelname', 'pathname', 'filename', 'lineno', 'funcName',
+                    'created', 'msecs', 'process', 'thread', 'threadName'):
+            self.assertEqual(getattr(copy, key), getattr(record, key), key)
+        self.assertEqual(copy.getMessage(), 'x=5')
+        self.assertIn('ValueError: boom', copy.exc_text)
+
+    def test_2_unix_socket(self):
+        collector = self._collector()
+        collector.bind()
+        server = threading.Thread(target=collector.serve_forever)
+        server.start()
+        handler = CollectorHandler(collector.address, batch_size=4, spill_dir=self.tmp.name)
+        self.logger.addHandler(handler)
+        for i in range(10):
+            self.logger.info('line %d', i)
+        handler.close()
+        while collector.received < 10:
+            pass
+        collector.shutdown()
+        server.join()
+        lines = self._lines()
+        self.assertEqual(len(lines), 10)
+        self.assertTrue(lines[-1].endswith('worker INFO: line 9'))
+
+    def test_3_spill_and_replay(self):
+        collector = self._collector()
+        handler = CollectorHandler(collector.address, batch_size=2, spill_dir=self.tmp.name, retry_interval=0)
+        self.logger.addHandler(handler)
+        for i in range(4):
+            self.logger.info('spilled %d', i)
+        self.assertTrue(os.path.exists(handler.spill_file))
+        collector.bind()
+        server = threading.Thread(target=collector.serve_forever)
+        server.start()
+        self.logger.info('live 0')
+        handler.close()
+        while collector.received < 5:
+            pass
+        collector.shutdown()
+        server.join()
+        self.assertFalse(os.path.exists(handler.spill_file))
+        self.assertEqual([line.rsplit(': ', 1)[1] for line in self._lines()],
+                         ['spilled 0', 'spilled 1', 'spilled 2', 'spilled 3', 'live 0'])
+
+    def test_4_pipe(self):
+        collector = self._collector()
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        server = threading.Thread(target=collector.serve_connection, args=(reader,))
+        server.start()
+        handler = CollectorHandler(writer, batch_size=3)
+        self.logger.addHandler(handler)
+        for i in range(7):
+            self.logger.warning('pipe %d', i)
+        handler.close()
+        writer.close()
+        server.join()
+        self.assertEqual(len(self._lines()), 7)
+
+    @unittest.skipIf(WINDOWS, 'no spill claims on Windows')
+    def test_5_replay_dead_worker_spills(self):
+        collector = self._collector()
+        handler = CollectorHandler(collector.address, batch_size=1, spill_dir=self.tmp.name, retry_interval=0)
+        self.logger.addHandler(handler)
+        self.logger.info('crashed worker')
+        # as if written by a worker which is gone
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+        dead_spill = os.path.join(self.tmp.name, 'xlogs-%d.spill' % dead.pid)
+        os.rename(handler.spill_file, dead_spill)
+        alive = os.path.join(self.tmp.name, 'xlogs-%d.spill' % os.getppid())
+        with open(alive, 'wb'):
+            pass
+        collector.bind()
+        server = threading.Thread(target=collector.serve_forever)
+        server.start()
+        self.logger.info('live 0')
+        handler.close()
+        while collector.received < 2:
+            pass
+        collector.shutdown()
+        server.join()
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), sorted(['collector.log', os.path.basename(alive)]))
+        self.assertEqual([line.rsplit(': ', 1)[1] for line in self._lines()], ['crashed worker', 'live 0'])
+
+    def test_6_timed_send_error(self):
+        handler = CollectorHandler(os.path.join(self.tmp.name, 'xlogs.sock'), flush_interval=0.05,
+                                   spill_dir=os.path.join(self.tmp.name, 'not', 'a', 'dir'))
+        with open(os.path.join(self.tmp.name, 'not'), 'w'):
+            pass
+        errors = []
+        handler.handleError = errors.append
+        self.logger.addHandler(handler)
+        self.logger.info('lost')
+        handler._timer.join()
+        self.assertEqual([r.getMessage() for r in errors], ['timed send of 1 batched records to the collector'])
+
+
+if __name__ == '__main__':
+    unittest.main()
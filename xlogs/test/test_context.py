@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_context.py
+@Time  : 2026/10/19 02:20
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import json
+import asyncio
+import unittest
+import threading
+
+from xlogs import bind, unbind, get_context
+from xlogs.context import EMPTY, MAX_DEPTH, Context, ContextFilter, current_context, clear_context
+from xlogs.formatter import FastFormatter, JsonFormatter, pack_record, unpack_records
+from xlogs.xlog2 import get_logger
+from xlogs.test.helpers import make_record, ListHandler
+
+
+class ContextTC(unittest.TestCase):
+    """bound log context test case"""
+
+    def tearDown(self):
+        clear_context()
+
+    def test_1_bind_snapshots(self):
+        self.assertIs(current_context(), EMPTY)
+        self.assertFalse(EMPTY)
+        outer = bind(request_id='abc', tenant='t1').context
+        with bind(request_id='def', user='tao') as inner:
+            # the inner snapshot shares the outer one
+            self.assertIs(inner.parent.parent, outer)
+            self.assertEqual(inner.items(), (('request_id', 'def'), ('tenant', 't1'), ('user', 'tao')))
+            self.assertEqual(str(inner), 'request_id=def tenant=t1 user=tao')
+            self.assertEqual(inner.get('tenant'), 't1')
+        self.assertIs(current_context(), outer)
+        self.assertEqual(outer.prefix, '[request_id=abc tenant=t1] ')
+        unbind('tenant')
+        self.assertEqual(get_context(), {'request_id': 'abc'})
+        for i in range(MAX_DEPTH * 2):
+            bind(n=i)
+        self.assertLessEqual(current_context().depth, MAX_DEPTH + 1)
+        self.assertEqual(get_context(), {'request_id': 'abc', 'n': MAX_DEPTH * 2 - 1})
+
+    def test_2_isolation(self):
+        bind(request_id='main')
+        seen = {}
+
+        def worker():
+            seen['thread'] = get_context()
+            bind(request_id='thread')
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        async def job(i):
+            bind(task=i)
+            await asyncio.sleep(0)
+            return get_context()
+
+        async def main():
+            return await asyncio.gather(job(1), job(2))
+
+        self.assertEqual(seen['thread'], {})
+        self.assertEqual(asyncio.run(main()), [{'request_id': 'main', 'task': 1}, {'request_id': 'main', 'task': 2}])
+        self.assertEqual(get_context(), {'request_id': 'main'})
+
+    def test_3_formatters(self):
+        fmt = '%(levelname)s: %(message)s'
+        with bind(request_id='abc', tenant='t1'):
+            self.assertEqual(FastFormatter(fmt, context=True).format(make_record()),
+                             'INFO: [request_id=abc tenant=t1] hello')
+            self.assertEqual(FastFormatter('%(context)s %(message)s', context=True).format(make_record()),
+                             'request_id=abc tenant=t1 hello')
+            self.assertEqual(FastFormatter(fmt).format(make_record()), 'INFO: hello')
+            data = json.loads(JsonFormatter('%(levelname)s %(message)s').format(make_record(tenant='extra')))
+            self.assertEqual(data, {'levelname': 'INFO', 'message': 'hello', 'tenant': 'extra', 'request_id': 'abc'})
+            buf = pack_record(make_record(), bytearray())
+        self.assertEqual(FastFormatter(fmt, context=True).format(make_record()), 'INFO: hello')
+        self.assertNotIn('request_id', JsonFormatter().format(make_record()))
+        record, = unpack_records(buf, 1)
+        self.assertIsInstance(record.context, Context)
+        self.assertEqual(FastFormatter('%(context)s').format(record), 'request_id=abc tenant=t1')
+
+        # captured when logged, for the records formatted later
+        record = make_record()
+        with bind(request_id='abc'):
+            ContextFilter().filter(record)
+        self.assertEqual(FastFormatter(fmt, context=True).format(record), 'INFO: [request_id=abc] hello')
+
+    def test_4_async_logger(self):
+        target = ListHandler()
+        logger = get_logger(logger_name='context', output_logfile=False, print_console=False, reset=True,
+                            async_mode=True)
+        logger.handlers[0].handlers.append(target)
+        with bind(request_id='abc'):
+            logger.info('start')
+        logger.handlers[0].flush()
+        self.assertEqual(str(target.records[0].context), 'request_id=abc')
+        logger.handlers[0].shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
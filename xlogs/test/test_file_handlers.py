@@ -0,0 +1,186 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_file_handlers.py
+@Time  : 2026/10/18 10:25
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import bz2
+import glob
+import gzip
+import lzma
+import zlib
+import logging
+import tempfile
+import unittest
+
+from xlogs.query import SegmentIndex
+from xlogs.compress import pending_name
+from xlogs.formatter import FastFormatter
+from xlogs.xlog2 import WINDOWS, INFO_FORMATE, DATE_FORMATE, _BufferedRotatingFileHandler, \
+    _CompressedRotatingFileHandler
+from xlogs.test.helpers import make_record
+
+
+class BufferedFileHandlerTC(unittest.TestCase):
+    """_BufferedRotatingFileHandler test case"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmp.name, 'message.log')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, path=None):
+        with open(path or self.logfile) as f:
+            return f.read()
+
+    def test_1_coalesce_until_limit(self):
+        h = _BufferedRotatingFileHandler(self.logfile, buffer_records=3, flush_interval=0)
+        h.handle(make_record('a'))
+        h.handle(make_record('b'))
+        self.assertEqual(self._read(), '')
+        h.handle(make_record('c'))
+        self.assertEqual(self._read(), 'a\nb\nc\n')
+        h.close()
+
+    def test_2_error_flushes_at_once(self):
+        h = _BufferedRotatingFileHandler(self.logfile, flush_interval=0)
+        h.handle(make_record('a'))
+        h.handle(make_record('boom', logging.ERROR))
+        self.assertEqual(self._read(), 'a\nboom\n')
+        h.handle(make_record('b'))
+        h.close()
+        self.assertEqual(self._read(), 'a\nboom\nb\n')
+
+    def test_3_rollover(self):
+        h = _BufferedRotatingFileHandler(self.logfile, maxBytes=100, backupCount=2, flush_interval=0)
+        for i in range(50):
+            h.handle(make_record('%08d' % i))
+        h.close()
+        self.assertEqual(sorted(glob.glob(self.logfile + '*')),
+                         [self.logfile, self.logfile + '.1', self.logfile + '.2'])
+        for path in glob.glob(self.logfile + '*'):
+            self.assertLessEqual(os.path.getsize(path), 100)
+        self.assertTrue(self._read().endswith('00000049\n'))
+        self.assertTrue(self._read(self.logfile + '.1').endswith('%08d\n' % (49 - len(self._read()) // 9)))
+
+    def test_4_flush_interval(self):
+        h = _BufferedRotatingFileHandler(self.logfile, flush_interval=0.05)
+        h.handle(make_record('a'))
+        timer = h._timer
+        timer.join()
+        self.assertEqual(self._read(), 'a\n')
+        h.close()
+
+    def test_5_timed_write_error(self):
+        class _FullDisk(object):
+            def write(self, data):
+                raise OSError(28, 'No space left on device')
+
+        h = _BufferedRotatingFileHandler(self.logfile, flush_interval=0.05)
+        errors = []
+        h.handleError = errors.append
+        h.handle(make_record('a'))
+        stream, h.stream = h.stream, _FullDisk()
+        h._timer.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].getMessage(), 'timed write of 1 buffered records to %s' % h.baseFilename)
+        # kept for the next write
+        h.stream = stream
+        h.close()
+        self.assertEqual(self._read(), 'a\n')
+
+
+class CompressedFileHandlerTC(unittest.TestCase):
+    """_CompressedRotatingFileHandler test case"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmp.name, 'message.log')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _rotate(self, codec, ext, decompress):
+        h = _CompressedRotatingFileHandler(self.logfile, maxBytes=100, backupCount=3, codec=codec, level=1)
+        for i in range(40):
+            h.handle(make_record('%08d' % i))
+        h.close()
+        self.assertEqual(sorted(os.listdir(self.tmp.name)),
+                         ['message.log'] + ['message.log.%d%s' % (i, ext) for i in (1, 2, 3)])
+        with open(self.logfile + '.1' + ext, 'rb') as f:
+            data = decompress(f.read()).decode()
+        with open(self.logfile) as f:
+            first_live = int(f.readline())
+        self.assertTrue(data.endswith('%08d\n' % (first_live - 1)))
+
+    def test_1_gzip(self):
+        self._rotate('gzip', '.gz', gzip.decompress)
+
+    def test_2_zlib(self):
+        self._rotate('zlib', '.zz', zlib.decompress)
+
+    def test_3_bz2(self):
+        self._rotate('bz2', '.bz2', bz2.decompress)
+
+    def test_4_lzma(self):
+        self._rotate('lzma', '.xz', lzma.decompress)
+
+    def test_5_gzip_blocks(self):
+        self._rotate('gzip_blocks', '.gz', gzip.decompress)
+
+    def test_6_recover_pending(self):
+        pending = pending_name(self.logfile, 1)
+        with open(pending, 'w') as f:
+            f.write('left over\n')
+        h = _CompressedRotatingFileHandler(self.logfile, maxBytes=100, backupCount=3)
+        h.close()
+        self.assertFalse(os.path.exists(pending))
+        with gzip.open(self.logfile + '.1.gz', 'rt') as f:
+            self.assertEqual(f.read(), 'left over\n')
+
+    def test_7_recover_pending_index(self):
+        # killed mid-rollover: the pending file is committed with its index, the older archive keeps its own
+        formatter = FastFormatter(INFO_FORMATE, DATE_FORMATE)
+        h = _CompressedRotatingFileHandler(self.logfile, maxBytes=100, backupCount=3)
+        h.setFormatter(formatter)
+        h.handle(make_record('first'))
+        h.doRollover()
+        h.close()
+        with open(pending_name(self.logfile, 1), 'w') as f:
+            f.write(formatter.format(make_record('left over')) + '\n')
+        h = _CompressedRotatingFileHandler(self.logfile, maxBytes=100, backupCount=3)
+        h.setFormatter(formatter)
+        h.close()
+        self.assertEqual(sorted(os.listdir(self.tmp.name)),
+                         ['message.log', 'message.log.1.gz', 'message.log.1.gz.idx',
+                          'message.log.2.gz', 'message.log.2.gz.idx'])
+        for ext in ('.1.gz', '.2.gz'):
+            index = SegmentIndex.load(self.logfile + ext + '.idx')
+            self.assertEqual(sum(block[4] for block in index.blocks), 1)
+
+
+@unittest.skipIf(WINDOWS, 'process_safe needs fcntl')
+class ProcessSafeFileHandlerTC(unittest.TestCase):
+    """_ProcessSafeRotatingFileHandler test case"""
+
+    def _stress(self, mode):
+        from xlogs.bench.multiprocess import run
+        result = run(processes=4, records=500, maxbytes=8192, mode=mode)
+        self.assertGreater(result['segments'], 2)
+        self.assertEqual((result['lost'], result['duplicated'], result['torn']), (0, 0, 0))
+
+    def test_1_no_lost_or_torn_lines(self):
+        self._stress('safe')
+
+    def test_2_compressed(self):
+        self._stress('safe-compress')
+
+
+if __name__ == '__main__':
+    unittest.main()
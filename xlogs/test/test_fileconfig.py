@@ -0,0 +1,160 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_fileconfig.py
+@Time  : 2026/10/19 00:40
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import logging
+import tempfile
+import unittest
+
+from xlogs import fileconfig
+from xlogs.fileconfig import Ref, compile_expr, compile_config, load_config, apply_config
+from xlogs.xlog2 import _fast_logger
+
+CONFIG = """
+[loggers]
+keys = root,app
+
+[handlers]
+keys = console,file
+
+[formatters]
+keys = brief
+
+[formatter_brief]
+class = xlogs.formatter.FastFormatter
+format = %(name)s %(levelname)s: %(message)s
+
+[handler_console]
+class = StreamHandler
+level = {console_level}
+formatter = brief
+args = (sys.stdout,)
+
+[handler_file]
+class = handlers.RotatingFileHandler
+formatter = brief
+args = ('{logfile}', 'a', {max_bytes}, 3)
+kwargs = {{'encoding': 'utf-8'}}
+
+[logger_root]
+level = WARNING
+handlers = console
+
+[logger_app]
+level = DEBUG
+handlers = file
+qualname = fcapp
+propagate = 0
+"""
+
+
+class FileConfigTC(unittest.TestCase):
+    """compiled ini config test case"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'logging.ini')
+        self.logfile = os.path.join(self.tmp.name, 'app.log')
+        root = logging.root
+        self.saved = (root.level, root.handlers[:], {name: logger.disabled for name, logger in
+                                                     root.manager.loggerDict.items()
+                                                     if isinstance(logger, logging.Logger)})
+
+    def tearDown(self):
+        for _, handler in fileconfig._APPLIED.values():
+            handler.close()
+        fileconfig._APPLIED.clear()
+        fileconfig._CACHE.clear()
+        level, handlers, disabled = self.saved
+        logging.root.setLevel(level)
+        logging.root.handlers = handlers
+        for name, value in disabled.items():
+            logging.root.manager.loggerDict[name].disabled = value
+        self.tmp.cleanup()
+
+    def _write(self, console_level='INFO', max_bytes=1024):
+        with open(self.path, 'w') as f:
+            f.write(CONFIG.format(console_level=console_level, logfile=self.logfile, max_bytes=max_bytes))
+
+    def test_1_compile_without_eval(self):
+        self.assertEqual(compile_expr("('a.log', 'a', -1, 2.5, None, [sys.stdout], {'when': 'H'})"),
+                         ('a.log', 'a', -1, 2.5, None, [Ref('sys.stdout')], {'when': 'H'}))
+        for text in ("__import__('os').system('true')", "(1 + 2,)", "open('x')", "(lambda: 1)"):
+            with self.assertRaises(ValueError):
+                compile_expr(text)
+        self.assertIs(fileconfig.resolve('sys.stdout'), sys.stdout)
+        self.assertIs(fileconfig.resolve('handlers.RotatingFileHandler'), logging.handlers.RotatingFileHandler)
+        self.assertEqual(fileconfig.resolve('xlogs.formatter.FastFormatter').__name__, 'FastFormatter')
+
+        with open(os.path.join(os.path.dirname(fileconfig.__file__), 'config.ini')) as f:
+            config = compile_config(f.read())
+        self.assertEqual(config.handlers['info'].kwargs, {'when': 'midnight', 'max_age': 2592000})
+        self.assertEqual(config.loggers['error'].handlers, ('error',))
+
+    def test_2_cache(self):
+        self._write()
+        cache_file = self.path + '.cache'
+        config = load_config(self.path, cache_file)
+        self.assertIs(load_config(self.path, cache_file), config)
+        # touched, same content: not parsed again
+        os.utime(self.path, ns=(1, 1))
+        self.assertIs(load_config(self.path, cache_file), config)
+        # a new process: the sidecar, still not parsed
+        fileconfig._CACHE.clear()
+        compile_config, fileconfig.compile_config = fileconfig.compile_config, None
+        try:
+            self.assertEqual(load_config(self.path, cache_file), config)
+        finally:
+            fileconfig.compile_config = compile_config
+        self._write(max_bytes=2048)
+        changed = load_config(self.path, cache_file)
+        self.assertEqual(changed.handlers['file'].args[2], 2048)
+        self.assertNotEqual(changed.digest, config.digest)
+
+    def test_3_incremental_apply(self):
+        # get_logger() loggers: apply_config() refreshes their cached level
+        existing = _fast_logger('fcother')
+        child = _fast_logger('fcapp.child')
+        child.setLevel(logging.ERROR)
+        _fast_logger('fcapp').setLevel(logging.ERROR)
+        self._write()
+        self.assertEqual(apply_config(load_config(self.path)), ['console', 'file'])
+        app = logging.getLogger('fcapp')
+        file_handler = app.handlers[0]
+        app.info('one')
+        self.assertTrue(existing.disabled)
+        self.assertFalse(existing.isEnabledFor(logging.CRITICAL))
+        self.assertTrue(child.isEnabledFor(logging.DEBUG))
+        self.assertEqual((child.disabled, child.level), (False, logging.NOTSET))
+        self.assertFalse(app.propagate)
+
+        # same handler settings, new level: nothing rebuilt
+        self._write(console_level='ERROR')
+        self.assertEqual(apply_config(load_config(self.path), disable_existing_loggers=False), [])
+        self.assertIs(app.handlers[0], file_handler)
+        self.assertEqual(logging.root.handlers[0].level, logging.ERROR)
+
+        # new args: the file handler only, the old one is closed once the lock is released
+        locked = []
+        close = file_handler.close
+        file_handler.close = lambda: (locked.append(fileconfig._apply_lock.locked()), close())
+        self._write(console_level='ERROR', max_bytes=2048)
+        self.assertEqual(apply_config(load_config(self.path)), ['file'])
+        self.assertEqual(locked, [False])
+        self.assertIsNot(app.handlers[0], file_handler)
+        self.assertIsNone(file_handler.stream)
+        app.info('two')
+        app.handlers[0].flush()
+        with open(self.logfile) as f:
+            self.assertEqual(f.read(), 'fcapp INFO: one\nfcapp INFO: two\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_formatter.py
+@Time  : 2026/10/18 16:30
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import sys
+import json
+import time
+import logging
+import unittest
+
+from xlogs.xlog2 import INFO_FORMATE, DEBUG_FORMATE, DATE_FORMATE, DEFAULT_FIELD_STYLES, DEFAULT_LEVEL_STYLES
+from xlogs.formatter import FastFormatter, ColoredFormatter, JsonFormatter, BinaryFormatter, JSON_FIELDS, \
+    ansi_style, unpack_records
+from xlogs.bench.formatter import make_records
+
+
+class FastFormatterTC(unittest.TestCase):
+    """FastFormatter test case"""
+
+    def assertSameOutput(self, fmt=None, datefmt=None, records=None, **kwargs):
+        std = logging.Formatter(fmt, datefmt, **kwargs)
+        fast = FastFormatter(fmt, datefmt, **kwargs)
+        for record in records or make_records(300):
+            self.assertEqual(fast.format(record), std.format(record))
+
+    def test_1_xlogs_formats(self):
+        for fmt in (INFO_FORMATE, DEBUG_FORMATE):
+            self.assertSameOutput(fmt)
+            self.assertSameOutput(fmt, DATE_FORMATE)
+
+    def test_2_specs_and_escapes(self):
+        self.assertSameOutput('%(levelname)-8s|%(lineno)5d|%(relativeCreated).1f|100%%|%%(name)s %(message)r')
+        self.assertSameOutput(None)
+        self.assertSameOutput('no fields 100%%', validate=False)
+        self.assertSameOutput('%(message)s')
+        self.assertSameOutput('{asctime} {message}', style='{')
+
+    def test_3_gmtime_converter(self):
+        class _GmtFormatter(FastFormatter):
+            converter = time.gmtime
+
+        class _StdGmtFormatter(logging.Formatter):
+            converter = time.gmtime
+
+        for record in make_records(50):
+            self.assertEqual(_GmtFormatter(INFO_FORMATE).format(record),
+                             _StdGmtFormatter(INFO_FORMATE).format(record))
+
+    def test_4_exc_and_stack_info(self):
+        logger = logging.getLogger('test')
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            record = logger.makeRecord('test', logging.ERROR, __file__, 1, 'failed', None, sys.exc_info())
+        record.stack_info = 'Stack (most recent call last):\n  here'
+        self.assertSameOutput(DEBUG_FORMATE, records=[record])
+
+    def test_5_missing_field(self):
+        record = make_records(1)[0]
+        with self.assertRaises(ValueError):
+            FastFormatter('%(nosuchfield)s').format(record)
+
+    def test_6_format_time_datefmt(self):
+        # the same record, same second, with and without a datefmt
+        for datefmt in ('%H:%M', DATE_FORMATE, None):
+            std = logging.Formatter('%(asctime)s %(message)s', datefmt)
+            fast = FastFormatter('%(asctime)s %(message)s', datefmt)
+            for record in make_records(20):
+                for fmt in (datefmt, None, '%H:%M', datefmt):
+                    self.assertEqual(fast.formatTime(record, fmt), std.formatTime(record, fmt))
+                self.assertEqual(fast.format(record), std.format(record))
+
+
+class ColoredFormatterTC(unittest.TestCase):
+    """ColoredFormatter test case"""
+
+    def test_1_ansi_style(self):
+        self.assertEqual(ansi_style(color='red', bold=True), '\x1b[1;31m')
+        self.assertEqual(ansi_style(color='green', faint=True), '\x1b[2;32m')
+        self.assertEqual(ansi_style(color=208), '\x1b[38;5;208m')
+        self.assertEqual(ansi_style(), '')
+
+    def test_2_field_and_level_styles(self):
+        formatter = ColoredFormatter(INFO_FORMATE, DATE_FORMATE, field_styles=DEFAULT_FIELD_STYLES,
+                                     level_styles=DEFAULT_LEVEL_STYLES)
+        plain = FastFormatter(INFO_FORMATE, DATE_FORMATE)
+        record = make_records(1)[0]
+        asctime = plain.formatTime(record, DATE_FORMATE)
+        message = record.getMessage()
+        self.assertEqual(formatter.format(record), '\x1b[32m%s\x1b[0m \x1b[36m%s\x1b[0m \x1b[1;32mINFO:\x1b[0m %s' % (
+            asctime, record.name, message))
+        record.levelno, record.levelname = logging.ERROR, 'ERROR'
+        self.assertTrue(formatter.format(record).endswith(':\x1b[0m \x1b[31m%s\x1b[0m' % message))
+        record.levelno, record.levelname = 25, 'Level 25'
+        self.assertTrue(formatter.format(record).endswith(':\x1b[0m %s' % message))
+
+    def test_3_field_groups(self):
+        # coloredlogs: the whitespace delimited group of one styled field is styled as a whole
+        record = logging.makeLogRecord({'name': 'a.b', 'levelno': logging.INFO, 'levelname': 'INFO', 'msg': 'hi',
+                                        'process': 42})
+        styles = dict(field_styles=DEFAULT_FIELD_STYLES, level_styles=DEFAULT_LEVEL_STYLES)
+        self.assertEqual(ColoredFormatter('%(levelname)s:%(message)s', **styles).format(record),
+                         '\x1b[1;32mINFO:hi\x1b[0m')
+        self.assertEqual(ColoredFormatter('%(name)s[%(process)d] %(message)s', **styles).format(record),
+                         '\x1b[36ma.b[42]\x1b[0m hi')
+        # several styled fields in a group: each one on its own, not the text between them
+        self.assertEqual(ColoredFormatter('%(levelname)s|%(name)s  %(message)s 100%%', **styles).format(record),
+                         '\x1b[1;32mINFO\x1b[0m|\x1b[36ma.b\x1b[0m  hi 100%')
+
+
+class StructuredFormatterTC(unittest.TestCase):
+    """JsonFormatter / BinaryFormatter test case"""
+
+    def test_1_json_fields_and_extra(self):
+        formatter = JsonFormatter()
+        std = logging.Formatter()
+        record = make_records(1)[0]
+        record.user, record.cost, record.ok, record.tags = 'tao "x"\n', 0.25, True, {'a': [1, None]}
+        obj = json.loads(formatter.format(record))
+        self.assertEqual(list(obj), list(JSON_FIELDS) + ['user', 'cost', 'ok', 'tags'])
+        self.assertEqual(obj['message'], record.getMessage())
+        self.assertEqual(obj['asctime'], std.formatTime(record))
+        self.assertEqual(obj['created'], record.created)
+        self.assertEqual((obj['user'], obj['cost'], obj['ok'], obj['tags']), ('tao "x"\n', 0.25, True, {'a': [1, None]}))
+        record.obj = object()
+        self.assertTrue(json.loads(formatter.format(record))['obj'].startswith('<object'))
+
+    def test_2_json_format_and_exc(self):
+        formatter = JsonFormatter('%(levelname)s %(lineno)d %(message)s')
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            record = logging.getLogger('test').makeRecord('test', logging.ERROR, __file__, 3, 'bad \u00e9', None,
+                                                          sys.exc_info())
+        line = formatter.format_bytes(record, bytearray(b'x'))
+        self.assertTrue(line.startswith(b'x{') and line.endswith(b'}\n') and line.count(b'\n') == 1)
+        obj = json.loads(line[1:].decode('utf-8'))
+        self.assertEqual(list(obj), ['levelname', 'lineno', 'message', 'exc_text'])
+        self.assertEqual(obj['message'], 'bad \u00e9')
+        self.assertIn('ZeroDivisionError', obj['exc_text'])
+
+    def test_3_binary_round_trip(self):
+        formatter = BinaryFormatter()
+        records = make_records(20)
+        records[3].request_id = 'r-3'
+        buf = bytearray()
+        for record in records:
+            formatter.format_bytes(record, buf)
+        offset, payload = 0, bytearray()
+        for _ in records:
+            length = int.from_bytes(buf[offset:offset + 4], 'little')
+            payload += buf[offset + 4:offset + 4 + length]
+            offset += 4 + length
+        self.assertEqual(offset, len(buf))
+        for record, back in zip(records, unpack_records(payload, len(records))):
+            self.assertEqual(back.getMessage(), record.getMessage())
+            self.assertEqual((back.created, back.levelno, back.lineno), (record.created, record.levelno, record.lineno))
+        self.assertEqual(list(unpack_records(payload, 4))[3].request_id, 'r-3')
+        with self.assertRaises(TypeError):
+            formatter.format(records[0])
+
+    def test_4_json_non_finite_floats(self):
+        formatter = JsonFormatter()
+        record = make_records(1)[0]
+        record.cost, record.stats = float('nan'), {'max': float('inf'), 'values': [1.5, float('-inf')]}
+
+        def reject(constant):
+            raise ValueError('invalid JSON: %s' % constant)
+
+        obj = json.loads(formatter.format(record), parse_constant=reject)
+        self.assertEqual((obj['cost'], obj['stats']), (None, {'max': None, 'values': [1.5, None]}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_import.py
+@Time  : 2026/10/18 23:50
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import sys
+import tempfile
+import unittest
+import subprocess
+
+import xlogs
+from xlogs import xlog2
+
+# not needed to call get_logger() and log to the file / a non-tty console
+HEAVY_MODULES = ('unittest', 'logging.config', 'configparser', 'shutil', 'gzip', 'platform', 'coloredlogs',
+                 'xlogs.color_stream_handler', 'xlogs.xlog')
+# imported by LoggerConfig only with the options that use them (metrics / compress / async_mode / context ...)
+OPTIONAL_MODULES = ('xlogs.metrics', 'xlogs.compress', 'xlogs.rotation', 'xlogs.queue_handler', 'xlogs.context',
+                    'xlogs.file_handler', 'xlogs.serialize', 'glob', 'json')
+
+
+def imported_modules(code):
+    """(module names, cumulative us of the top level imports) of `python -X importtime -c code`"""
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], stderr=subprocess.PIPE,
+                            stdout=subprocess.DEVNULL, check=True, universal_newlines=True).stderr
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class ImportTC(unittest.TestCase):
+    """import cost test case: `python -X importtime`"""
+
+    def test_1_import_package(self):
+        modules = imported_modules('import xlogs')
+        self.assertIn('xlogs', modules)
+        for name in HEAVY_MODULES + ('xlogs.xlog2', 'logging.handlers'):
+            self.assertNotIn(name, modules)
+
+    def test_2_get_logger(self):
+        modules = imported_modules('from xlogs import get_logger\n'
+                                   'get_logger(output_logfile=False, colored_console=False).info("x")')
+        self.assertIn('xlogs.formatter', modules)
+        for name in HEAVY_MODULES + OPTIONAL_MODULES + ('logging.handlers', 'socket', 'pickle', 'heapq'):
+            self.assertNotIn(name, modules)
+
+    def test_3_get_file_logger(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            modules = imported_modules('import os\n'
+                                       'from xlogs import get_logger\n'
+                                       'os.chdir(%r)\n'
+                                       'get_logger(colored_console=False).info("x")' % tmp)
+        self.assertIn('logging.handlers', modules)
+        for name in HEAVY_MODULES + OPTIONAL_MODULES:
+            self.assertNotIn(name, modules)
+
+    def test_4_lazy_defaults(self):
+        from xlogs import compress, rotation, queue_handler
+        self.assertEqual(xlog2.QUEUE_SIZE, queue_handler.QUEUE_SIZE)
+        self.assertEqual((xlog2.OVERFLOW_BLOCK, xlog2.OVERFLOW_DROP_OLDEST, xlog2.OVERFLOW_DROP_NEWEST),
+                         queue_handler.OVERFLOW_POLICIES)
+        self.assertEqual(xlog2.COMPRESS_CODEC, compress.COMPRESS_CODEC)
+        self.assertEqual(xlog2.MAX_AGE, rotation.MAX_AGE)
+
+    def test_5_lazy_names(self):
+        self.assertEqual(set(xlog2.__all__) - set(xlogs.__all__), set())
+        for name in xlogs.__all__:
+            self.assertIsNotNone(getattr(xlogs, name))
+        self.assertIs(xlogs.get_logger, xlog2.get_logger)
+        self.assertIs(xlogs.xlog2, xlog2)
+        self.assertIs(xlog2.HybridRotatingFileHandler, xlogs.file_handler.HybridRotatingFileHandler)
+        self.assertIn('get_logger', dir(xlogs))
+        with self.assertRaises(AttributeError):
+            xlogs.no_such_name
+
+
+if __name__ == '__main__':
+    unittest.main()
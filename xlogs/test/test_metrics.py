@@ -0,0 +1,119 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_metrics.py
+@Time  : 2026/10/19 03:10
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import logging
+import tempfile
+import unittest
+import threading
+
+from xlogs.metrics import Metrics, MetricsFilter, Histogram, METRICS
+from xlogs.formatter import FastFormatter, JsonFormatter
+from xlogs.queue_handler import AsyncQueueHandler
+from xlogs.xlog2 import get_logger, _BufferedCompressedRotatingFileHandler
+from xlogs.test.helpers import make_record
+
+
+class _NullHandler(logging.Handler):
+    def emit(self, record):
+        self.format(record)
+
+
+class MetricsTC(unittest.TestCase):
+    """pipeline metrics test case"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_1_threads_and_histograms(self):
+        metrics = Metrics(buckets=(0.001, 0.01))
+        log_filter = MetricsFilter(metrics)
+
+        def worker():
+            for _ in range(100):
+                log_filter.filter(make_record())
+            metrics.observe('xlogs_write_seconds', ('a',), 0.005)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log_filter.filter(make_record(level=logging.ERROR))
+        metrics.observe('xlogs_write_seconds', ('a',), 0.0001)
+        metrics.observe('xlogs_write_seconds', ('a',), 1.0)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['xlogs_records_total'], {('test', 'INFO'): 400, ('test', 'ERROR'): 1})
+        histogram = snapshot['xlogs_write_seconds'][('a',)]
+        self.assertIsInstance(histogram, Histogram)
+        self.assertEqual(histogram.count, 6)
+        self.assertEqual(histogram.buckets, ((0.001, 1), (0.01, 5)))
+        self.assertAlmostEqual(histogram.sum, 1.0201)
+        # the finished threads were merged, counted once
+        self.assertEqual(metrics.snapshot()['xlogs_records_total'][('test', 'INFO')], 400)
+        text = metrics.prometheus_text()
+        self.assertIn('# TYPE xlogs_records_total counter', text)
+        self.assertIn('xlogs_records_total{logger="test",level="INFO"} 400', text)
+        self.assertIn('xlogs_write_seconds_bucket{handler="a",le="0.01"} 5', text)
+        self.assertIn('xlogs_write_seconds_bucket{handler="a",le="+Inf"} 6', text)
+        self.assertIn('xlogs_write_seconds_count{handler="a"} 6', text)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()['xlogs_records_total'], {})
+
+    def test_2_handlers(self):
+        metrics = Metrics()
+        logfile = os.path.join(self.tmp.name, 'message.log')
+        handler = _BufferedCompressedRotatingFileHandler(logfile, maxBytes=200, backupCount=2, buffer_records=1)
+        handler.setFormatter(JsonFormatter())
+        text = _NullHandler()
+        text.setFormatter(FastFormatter('%(message)s'))
+        metrics.instrument(handler)
+        metrics.instrument(text, 'console')
+        metrics.instrument(text)
+        self.assertIs(handler.formatter._style, handler.formatter.formatter._style)
+        for i in range(10):
+            handler.handle(make_record('record %d' % i))
+            text.handle(make_record('x' * 9))
+        handler.close()
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['xlogs_handler_bytes_total'][('console',)], 100)
+        self.assertGreater(snapshot['xlogs_handler_bytes_total'][('message.log',)], 400)
+        self.assertEqual(snapshot['xlogs_format_seconds'][('console',)].count, 10)
+        self.assertEqual(snapshot['xlogs_write_seconds'][('message.log',)].count, 10)
+        rollovers = snapshot['xlogs_rollover_seconds'][('message.log',)].count
+        self.assertGreater(rollovers, 1)
+        self.assertEqual(snapshot['xlogs_compress_seconds'][('message.log',)].count, rollovers)
+
+    def test_3_logger_config(self):
+        prom = os.path.join(self.tmp.name, 'xlogs.prom')
+        METRICS.reset()
+        logger = get_logger(logger_name='metrics', logfile=os.path.join(self.tmp.name, 'm.log'),
+                            print_console=False, reset=True, async_mode=True, metrics=True, metrics_file=prom,
+                            metrics_interval=0.05)
+        for i in range(5):
+            logger.warning('warning %d', i)
+        logger.handlers[0].flush()
+        snapshot = METRICS.snapshot()
+        self.assertEqual(snapshot['xlogs_records_total'][('metrics', 'WARNING')], 5)
+        self.assertEqual(snapshot['xlogs_write_seconds'][('m.log',)].count, 5)
+        self.assertEqual(snapshot['xlogs_queue_depth'][('metrics',)], 0)
+        self.assertEqual(snapshot['xlogs_queue_dropped_total'][('metrics',)], 0)
+        self.assertIsInstance(logger.handlers[0], AsyncQueueHandler)
+        METRICS.write_prometheus(prom)
+        with open(prom) as f:
+            self.assertIn('xlogs_records_total{logger="metrics",level="WARNING"} 5', f.read())
+        METRICS.stop_dump()
+        get_logger(logger_name='metrics', output_logfile=False, print_console=False, reset=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
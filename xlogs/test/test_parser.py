@@ -0,0 +1,139 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_parser.py
+@Time  : 2026/10/18 17:10
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import io
+import os
+import sys
+import gzip
+import logging
+import tempfile
+import unittest
+
+from xlogs.xlog2 import INFO_FORMATE, DEBUG_FORMATE, DATE_FORMATE
+from xlogs.xlog2 import _BufferedCompressedRotatingFileHandler
+from xlogs.formatter import FastFormatter, BinaryFormatter
+from xlogs.parser import LogParser, iter_segments, parse_binary
+from xlogs.bench.formatter import make_records
+
+
+def _error_record(msg='failed'):
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        return logging.getLogger('test').makeRecord('test', logging.ERROR, __file__, 7, msg, None, sys.exc_info())
+
+
+class LogParserTC(unittest.TestCase):
+    """LogParser test case"""
+
+    def render(self, fmt, datefmt, records):
+        formatter = FastFormatter(fmt, datefmt)
+        return ''.join(formatter.format(r) + '\n' for r in records)
+
+    def test_1_xlogs_formats(self):
+        records = make_records(50)
+        for fmt, datefmt in ((INFO_FORMATE, None), (DEBUG_FORMATE, None), (DEBUG_FORMATE, DATE_FORMATE)):
+            entries = list(LogParser(fmt, datefmt).parse(io.StringIO(self.render(fmt, datefmt, records))))
+            self.assertEqual(len(entries), len(records))
+            for record, entry in zip(records, entries):
+                self.assertEqual(entry.message, record.getMessage())
+                self.assertEqual((entry.name, entry.levelname, entry.levelno), (record.name, 'INFO', logging.INFO))
+                self.assertAlmostEqual(entry.created, record.created, delta=1 if datefmt else 0.002)
+                if fmt == DEBUG_FORMATE:
+                    self.assertEqual((entry.filename, entry.lineno, entry.process, entry.thread),
+                                     (record.filename, record.lineno, record.process, record.thread))
+
+    def test_2_traceback_and_separators(self):
+        records = make_records(2)
+        text = self.render(DEBUG_FORMATE, None, records[:1])
+        # error.log layout of the `log` decorator
+        text += '+' * 70 + '\n' + self.render(DEBUG_FORMATE, None, [_error_record()]) + '#' * 70 + '\n\n'
+        text += self.render(DEBUG_FORMATE, None, records[1:])
+        first, error, last = LogParser(DEBUG_FORMATE).parse(io.StringIO(text))
+        self.assertEqual(first.message, records[0].getMessage())
+        self.assertTrue(error.message.startswith('failed\nTraceback (most recent call last):\n'))
+        self.assertTrue(error.message.endswith('ZeroDivisionError: division by zero'))
+        self.assertEqual(last.message, records[1].getMessage())
+
+    def test_3_padded_and_extra_fields(self):
+        fmt = '%(levelname)-8s|%(lineno)5d|%(module)s|%(custom)s %(message)s'
+        record = make_records(1)[0]
+        record.custom = 'abc'
+        entry, = LogParser(fmt).parse(io.StringIO(self.render(fmt, None, [record])))
+        self.assertEqual((entry.levelname, entry.levelno, entry.lineno), ('INFO', logging.INFO, record.lineno))
+        self.assertEqual(entry.extra, {'custom': 'abc'})
+        self.assertIsNone(entry.created)
+
+    def test_4_unnamed_level(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(FastFormatter(DEBUG_FORMATE))
+        logger = logging.getLogger('test.parser.level')
+        logger.propagate = False
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+        try:
+            logger.log(25, 'between %s and %s', 'INFO', 'WARNING')
+            logger.warning('named')
+        finally:
+            logger.removeHandler(handler)
+        stream.seek(0)
+        unnamed, named = LogParser(DEBUG_FORMATE).parse(stream)
+        self.assertEqual((unnamed.levelname, unnamed.levelno, unnamed.message),
+                         ('Level 25', 25, 'between INFO and WARNING'))
+        self.assertEqual((named.levelname, named.levelno), ('WARNING', logging.WARNING))
+
+    def test_5_segments_and_columns(self):
+        records = make_records(30)
+        with tempfile.TemporaryDirectory() as tmp:
+            logfile = os.path.join(tmp, 'message.log')
+            with gzip.open(logfile + '.2.gz', 'wt') as f:
+                f.write(self.render(INFO_FORMATE, None, records[:10]))
+            with open(logfile + '.1', 'w') as f:
+                f.write(self.render(INFO_FORMATE, None, records[10:20]))
+            with open(logfile, 'w') as f:
+                f.write(self.render(INFO_FORMATE, None, records[20:]))
+            self.assertEqual(iter_segments(logfile), [logfile + '.2.gz', logfile + '.1', logfile])
+            parser = LogParser(INFO_FORMATE)
+            messages = [e.message for e in parser.parse_segments(logfile)]
+            self.assertEqual(messages, [r.getMessage() for r in records])
+            with open(logfile + '.1', 'rb') as f:
+                columns = parser.columns(f, fields=('levelno', 'created', 'lineno'))
+            self.assertEqual(list(columns['levelno']), [logging.INFO] * 10)
+            self.assertEqual(list(columns['lineno']), [-1] * 10)
+            self.assertAlmostEqual(columns['created'][0], records[10].created, delta=0.002)
+
+    def test_6_binary_segments(self):
+        records = make_records(600)
+        records[5].user = 'tao'
+        records.append(_error_record())
+        with tempfile.TemporaryDirectory() as tmp:
+            logfile = os.path.join(tmp, 'message.bin')
+            handler = _BufferedCompressedRotatingFileHandler(logfile, maxBytes=16 * 1024, backupCount=20)
+            handler.setFormatter(BinaryFormatter())
+            for record in records:
+                handler.handle(record)
+            handler.close()
+            self.assertTrue(os.path.exists(logfile + '.1.gz'))
+            entries = [e for segment in iter_segments(logfile) for e in parse_binary(segment)]
+            live = len(list(parse_binary(logfile)))
+            # a record cut by a crash is skipped
+            with open(logfile, 'ab') as f:
+                f.write(b'\xff\x00\x00\x00partial')
+            with open(logfile, 'rb') as f:
+                self.assertEqual(len(list(parse_binary(io.BytesIO(f.read()), chunk_size=100))), live)
+        self.assertEqual([e.message.split('\n')[0] for e in entries], [r.getMessage() for r in records])
+        self.assertEqual([e.created for e in entries], [r.created for r in records])
+        self.assertEqual(entries[5].extra, {'user': 'tao'})
+        self.assertEqual((entries[-1].levelname, entries[-1].lineno), ('ERROR', 7))
+        self.assertIn('ZeroDivisionError', entries[-1].message)
+
+
+if __name__ == '__main__':
+    unittest.main()
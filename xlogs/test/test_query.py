@@ -0,0 +1,98 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_query.py
+@Time  : 2026/10/18 18:20
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import io
+import os
+import logging
+import tempfile
+import unittest
+import contextlib
+
+from xlogs.xlog2 import DEBUG_FORMATE, _CompressedRotatingFileHandler
+from xlogs.formatter import FastFormatter
+from xlogs.query import LogQuery, SegmentIndex, index_path, main
+from xlogs.bench.formatter import make_records
+
+START = 1790000000.0
+
+
+def _records(count):
+    records = make_records(count, START)
+    for i, record in enumerate(records):
+        if i % 7 == 0:
+            record.levelno, record.levelname = logging.ERROR, 'ERROR'
+    return records
+
+
+class LogQueryTC(unittest.TestCase):
+    """LogQuery test case"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmp.name, 'message.log')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assertSearch(self, query, records, start, end, level=None):
+        expect = [r.getMessage() for r in records
+                  if start <= r.created <= end and (level is None or r.levelno >= level)]
+        self.assertEqual([e.message for e in query.search(start, end, level)], expect)
+
+    def test_1_indexed_archives(self):
+        records = _records(3000)
+        handler = _CompressedRotatingFileHandler(self.logfile, maxBytes=40 * 1024, backupCount=20)
+        handler.setFormatter(FastFormatter(DEBUG_FORMATE))
+        for record in records:
+            handler.handle(record)
+        handler.close()
+        archive = self.logfile + '.1.gz'
+        index = SegmentIndex.load(index_path(archive))
+        self.assertIsNotNone(index)
+        self.assertTrue(index.valid_for(archive, DEBUG_FORMATE))
+        self.assertTrue(os.path.exists(index_path(self.logfile + '.2.gz')))
+
+        query = LogQuery(self.logfile, DEBUG_FORMATE)
+        self.assertSearch(query, records, START + 1.0, START + 1.5)
+        self.assertSearch(query, records, START + 0.5, START + 7.0, logging.ERROR)
+        self.assertSearch(query, records, START - 10, START + 100)
+        self.assertEqual(list(query.search(START + 100, START + 200)), [])
+
+    def test_2_live_file_and_stale_index(self):
+        records = _records(2000)
+        formatter = FastFormatter(DEBUG_FORMATE)
+        with open(self.logfile + '.1', 'w') as f:
+            f.writelines(formatter.format(r) + '\n' for r in records[:1000])
+        with open(index_path(self.logfile + '.1'), 'wb') as f:
+            f.write(b'not an index')
+        with open(self.logfile, 'w') as f:
+            f.writelines(formatter.format(r) + '\n' for r in records[1000:])
+        query = LogQuery(self.logfile, DEBUG_FORMATE)
+        self.assertSearch(query, records, START + 2.0, START + 4.0)
+        self.assertSearch(query, records, START + 4.5, START + 5.0, logging.ERROR)
+        # rebuilt and saved by the first search
+        self.assertIsNotNone(SegmentIndex.load(index_path(self.logfile + '.1')))
+        self.assertFalse(os.path.exists(index_path(self.logfile)))
+        self.assertEqual(query.bisect(self.logfile, START), 0)
+        self.assertEqual(query.bisect(self.logfile, START + 100), os.path.getsize(self.logfile))
+
+    def test_3_cli(self):
+        records = _records(100)
+        formatter = FastFormatter(DEBUG_FORMATE)
+        with open(self.logfile, 'w') as f:
+            f.writelines(formatter.format(r) + '\n' for r in records)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            main([self.logfile, '--format', 'debug', '--level', 'ERROR', '--grep', r'request \d*7 '])
+        expect = [formatter.format(r) for r in records if r.levelno == logging.ERROR and r.args[0] % 10 == 7]
+        self.assertEqual(out.getvalue().splitlines(), expect)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_queue_handler.py
+@Time  : 2026/10/18 09:40
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import logging
+import tempfile
+import threading
+import unittest
+
+from xlogs.xlog2 import get_logger, LoggerConfig, ASYNC_THREADS
+from xlogs.queue_handler import AsyncQueueHandler, ThreadLocalQueueHandler, OVERFLOW_DROP_NEWEST, \
+    OVERFLOW_DROP_OLDEST
+from xlogs.test.helpers import make_record, ListHandler
+
+
+def _raising_filter(record):
+    if record.msg == 'boom':
+        raise RuntimeError('filter failed')
+    return True
+
+
+class AsyncQueueHandlerTC(unittest.TestCase):
+    """AsyncQueueHandler test case"""
+
+    def test_1_flush_writes_in_order(self):
+        target = ListHandler()
+        qh = AsyncQueueHandler([target], queue_size=100)
+        for i in range(1000):
+            qh.handle(make_record(str(i)))
+        qh.flush()
+        self.assertEqual([r.msg for r in target.records], [str(i) for i in range(1000)])
+        self.assertNotEqual(target.records[0].thread, None)
+        qh.close()
+
+    def _fill_blocked(self, overflow):
+        gate = threading.Event()
+        target = ListHandler(gate)
+        qh = AsyncQueueHandler([target], queue_size=2, overflow=overflow)
+        qh.handle(make_record('first'))
+        # wait until the writer took 'first' and is blocked in the target
+        while qh.qsize:
+            pass
+        for i in range(5):
+            qh.handle(make_record(str(i)))
+        gate.set()
+        qh.close()
+        return qh, [r.msg for r in target.records]
+
+    def test_2_drop_newest(self):
+        qh, msgs = self._fill_blocked(OVERFLOW_DROP_NEWEST)
+        self.assertEqual(qh.dropped, 3)
+        self.assertEqual(msgs[0], 'first')
+        self.assertIn('dropped %d records', msgs[1])
+        self.assertEqual(msgs[2:], ['0', '1'])
+
+    def test_3_drop_oldest(self):
+        qh, msgs = self._fill_blocked(OVERFLOW_DROP_OLDEST)
+        self.assertEqual(qh.dropped, 3)
+        self.assertEqual(msgs[2:], ['3', '4'])
+
+    def test_4_handler_level(self):
+        target = ListHandler()
+        target.setLevel(logging.WARNING)
+        qh = AsyncQueueHandler([target])
+        qh.handle(make_record('info'))
+        qh.handle(make_record('warn', logging.WARNING))
+        qh.close()
+        self.assertEqual([r.msg for r in target.records], ['warn'])
+
+    def test_5_raising_filter(self):
+        target = ListHandler()
+        target.addFilter(_raising_filter)
+        qh = AsyncQueueHandler([target], queue_size=2)
+        errors = []
+        qh.handleError = errors.append
+        for i in range(100):
+            qh.handle(make_record('boom' if i % 10 == 0 else str(i)))
+        qh.flush()
+        self.assertTrue(qh._thread.is_alive())
+        self.assertEqual(len(errors), 10)
+        self.assertEqual(len(target.records), 90)
+        qh.close()
+
+    def test_6_logger_config_async_mode(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                logger = get_logger(logger_name='async', logfile='async.log', print_console=False,
+                                    async_mode=True, reset=True)
+                self.assertIsInstance(logger.handlers[0], AsyncQueueHandler)
+                for i in range(100):
+                    logger.info('line %d', i)
+                LoggerConfig().flush()
+                with open(os.path.join(tmp, 'log', 'async.log')) as f:
+                    lines = f.readlines()
+                self.assertEqual(len(lines), 100)
+                self.assertTrue(lines[-1].endswith('line 99\n'))
+                LoggerConfig().shutdown()
+            finally:
+                os.chdir(cwd)
+
+
+class _ThreadFormatter(logging.Formatter):
+    """text of the thread which formats the record"""
+    def format(self, record):
+        return threading.current_thread().name + ':' + record.getMessage()
+
+
+class _TextHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+class ThreadLocalQueueHandlerTC(unittest.TestCase):
+    """ThreadLocalQueueHandler test case"""
+
+    def test_1_order_and_preformatted(self):
+        target = _TextHandler()
+        target.setFormatter(_ThreadFormatter())
+        qh = ThreadLocalQueueHandler([target], batch=16)
+        for i in range(500):
+            qh.handle(make_record(str(i)))
+        qh.flush()
+        self.assertEqual(target.lines, ['MainThread:%d' % i for i in range(500)])
+
+        target.lines = []
+
+        def worker(n):
+            for i in range(200):
+                qh.handle(make_record('%d-%d' % (n, i)))
+
+        threads = [threading.Thread(target=worker, args=(n,), name='t%d' % n) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        qh.flush()
+        self.assertEqual(len(target.lines), 1600)
+        for n in range(8):
+            # formatted by the logging thread, in its order
+            self.assertEqual([line for line in target.lines if line.startswith('t%d:' % n)],
+                             ['t%d:%d-%d' % (n, n, i) for i in range(200)])
+        qh.close()
+        self.assertEqual(qh.qsize, 0)
+        qh.handle(make_record('after close'))
+        self.assertEqual(target.lines[-1], 'MainThread:after close')
+
+    def test_2_raising_filter(self):
+        target = _TextHandler()
+        target.addFilter(_raising_filter)
+        qh = ThreadLocalQueueHandler([target], batch=2, max_pending=4)
+        errors = []
+        qh.handleError = errors.append
+        for i in range(100):
+            qh.handle(make_record('boom' if i % 10 == 0 else str(i)))
+        qh.flush()
+        self.assertTrue(qh._thread.is_alive())
+        self.assertEqual(len(errors), 10)
+        self.assertEqual(len(target.lines), 90)
+        qh.close()
+
+    def test_3_backpressure(self):
+        gate = threading.Event()
+        target = ListHandler(gate)
+        qh = ThreadLocalQueueHandler([target], batch=2, max_pending=4)
+        worker = threading.Thread(target=lambda: [qh.handle(make_record(str(i))) for i in range(20)])
+        worker.start()
+        # blocked until the writer drains its deque
+        worker.join(0.2)
+        self.assertTrue(worker.is_alive())
+        gate.set()
+        worker.join()
+        qh.flush()
+        self.assertEqual([record.msg for record in target.records], [str(i) for i in range(20)])
+        qh.close()
+
+    def test_4_level_filter_and_close(self):
+        calls = []
+
+        class CountingFormatter(logging.Formatter):
+            def format(self, record):
+                calls.append(record.msg)
+                return logging.Formatter.format(self, record)
+
+        warnings, filtered = _TextHandler(), _TextHandler()
+        warnings.setLevel(logging.WARNING)
+        filtered.addFilter(lambda record: record.msg != 'skip')
+        formatters = [CountingFormatter(), CountingFormatter()]
+        warnings.setFormatter(formatters[0])
+        filtered.setFormatter(formatters[1])
+        qh = ThreadLocalQueueHandler([warnings, filtered])
+        qh.handle(make_record('info'))
+        qh.handle(make_record('skip', level=logging.WARNING))
+        qh.flush()
+        # formatted only for the handlers taking the record
+        self.assertEqual(calls, ['info', 'skip'])
+        self.assertEqual(warnings.lines, ['skip'])
+        self.assertEqual(filtered.lines, ['info'])
+        qh.close()
+        self.assertIs(warnings.formatter, formatters[0])
+        self.assertIs(filtered.formatter, formatters[1])
+
+    def test_5_logger_config_threads_mode(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            logger = get_logger(logger_name='threads', logfile=os.path.join(tmp, 'threads.log'), print_console=False,
+                                async_mode=ASYNC_THREADS, gen_wf=True, reset=True)
+            self.assertIsInstance(logger.handlers[0], ThreadLocalQueueHandler)
+
+            def worker():
+                for i in range(100):
+                    logger.info('line %d', i)
+                    logger.warning('warn %d', i)
+
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            LoggerConfig().flush()
+            with open(os.path.join(tmp, 'threads.log')) as f:
+                lines = f.readlines()
+            with open(os.path.join(tmp, 'threads.log.wf')) as f:
+                warnings = f.readlines()
+            self.assertEqual(len(lines), 800)
+            self.assertEqual(len(warnings), 800)
+            self.assertTrue(all(' INFO: line ' in line for line in lines))
+            LoggerConfig().shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
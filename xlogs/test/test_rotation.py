@@ -0,0 +1,144 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_rotation.py
+@Time  : 2026/10/18 21:40
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import gzip
+import time
+import tempfile
+import unittest
+
+from xlogs.xlog2 import INFO_FORMATE, DATE_FORMATE, HybridRotatingFileHandler, _BufferedHybridRotatingFileHandler
+from xlogs.query import SegmentIndex
+from xlogs.formatter import FastFormatter
+from xlogs.parser import iter_segments, open_segment
+from xlogs.rotation import next_rollover, next_segment, stamped_segments, enforce_retention
+from xlogs.test.helpers import make_record
+
+
+class RotationTC(unittest.TestCase):
+    """hybrid rotation test case"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.logfile = os.path.join(self.tmp.name, 'message.log')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _lines(self):
+        lines = []
+        for segment in iter_segments(self.logfile):
+            with open_segment(segment) as f:
+                lines.extend(line.rstrip('\n') for line in f)
+        return lines
+
+    def test_1_rollover_time_and_names(self):
+        now = time.mktime((2026, 10, 18, 21, 10, 30, 0, 0, -1))
+        self.assertEqual(next_rollover(now), time.mktime((2026, 10, 19, 0, 0, 0, 0, 0, -1)))
+        self.assertEqual(next_rollover(now, 'D', 2), time.mktime((2026, 10, 20, 0, 0, 0, 0, 0, -1)))
+        self.assertEqual(next_rollover(now, 'H'), time.mktime((2026, 10, 18, 22, 0, 0, 0, 0, -1)))
+        self.assertEqual(next_rollover(now, 'M', 5), time.mktime((2026, 10, 18, 21, 15, 0, 0, 0, -1)))
+        with self.assertRaises(ValueError):
+            next_rollover(now, 'W')
+        key, path = next_segment('a.log', now)
+        self.assertEqual(path, 'a.log.20261018-211030')
+        key, path = next_segment('a.log', now, key)
+        self.assertEqual(path, 'a.log.20261018-211030-1')
+        # clock set back: still after the last segment
+        key, path = next_segment('a.log', now - 3600, key)
+        self.assertEqual(path, 'a.log.20261018-211030-2')
+
+    def test_2_size_rollover(self):
+        h = HybridRotatingFileHandler(self.logfile, maxBytes=100, when=None)
+        for i in range(40):
+            h.handle(make_record('%08d' % i))
+        h.close()
+        segments = stamped_segments(self.logfile)
+        self.assertGreater(len(segments), 2)
+        for path in segments + [self.logfile]:
+            self.assertLessEqual(os.path.getsize(path), 100)
+        self.assertEqual(self._lines(), ['%08d' % i for i in range(40)])
+
+    def test_3_time_rollover_and_compress(self):
+        now = time.time()
+        h = _BufferedHybridRotatingFileHandler(self.logfile, when='H', flush_interval=0, codec='gzip', level=1)
+        h.handle(make_record('a', created=now))
+        h.rollover_at = now + 1
+        h.handle(make_record('b', created=now + 1))
+        h.handle(make_record('c', created=now + 2))
+        self.assertGreater(h.rollover_at, now + 2)
+        h.close()
+        segments = stamped_segments(self.logfile)
+        self.assertEqual(len(segments), 1)
+        self.assertTrue(segments[0].endswith('.gz'))
+        with gzip.open(segments[0], 'rt') as f:
+            self.assertEqual(f.read(), 'a\n')
+        self.assertEqual(self._lines(), ['a', 'b', 'c'])
+
+        # an empty live file is not rotated
+        h = HybridRotatingFileHandler(self.logfile, mode='w', when='H')
+        h.rollover_at = now
+        h.handle(make_record('d', created=now + 3))
+        h.close()
+        self.assertEqual(len(stamped_segments(self.logfile)), 1)
+
+    def test_4_recover(self):
+        for name, data in (('20261001-000000', b'old\n'), ('20261002-000000', b'new\n')):
+            with open('%s.%s' % (self.logfile, name), 'wb') as f:
+                f.write(data)
+        with gzip.open(self.logfile + '.20261001-000000.gz', 'wb') as f:
+            f.write(b'old\n')
+        with open(self.logfile + '.20261002-000000.gz.99999999.tmp', 'wb') as f:
+            f.write(b'partial')
+        h = HybridRotatingFileHandler(self.logfile, codec='gzip', max_age=0)
+        h.close()
+        self.assertEqual(sorted(os.listdir(self.tmp.name)),
+                         ['message.log', 'message.log.20261001-000000.gz', 'message.log.20261002-000000.gz'])
+
+        # indexed with the formatter set after __init__
+        formatter = FastFormatter(INFO_FORMATE, DATE_FORMATE)
+        with open(self.logfile + '.20261003-000000', 'w') as f:
+            f.write(formatter.format(make_record('left over')) + '\n')
+        h = HybridRotatingFileHandler(self.logfile, codec='gzip', max_age=0)
+        h.setFormatter(formatter)
+        h.close()
+        index = SegmentIndex.load(self.logfile + '.20261003-000000.gz.idx')
+        self.assertEqual(sum(block[4] for block in index.blocks), 1)
+
+    def test_5_retention(self):
+        other = os.path.join(self.tmp.name, 'error.log')
+        now = time.time()
+        for logfile in (self.logfile, other):
+            with open(logfile, 'wb') as f:
+                f.write(b'x' * 100)
+            for day in range(1, 6):
+                path = '%s.202610%02d-000000' % (logfile, day)
+                with open(path, 'wb') as f:
+                    f.write(b'x' * 100)
+                os.utime(path, (now - (10 - day) * 86400, now - (10 - day) * 86400))
+        with open(self.logfile + '.20261004-000000.idx', 'wb') as f:
+            f.write(b'x' * 10)
+        # older than 7 days: day 1 and 2
+        deleted = enforce_retention({self.logfile: (7 * 86400, 0)}, now=now)
+        self.assertEqual(deleted, [self.logfile + '.20261001-000000', self.logfile + '.20261002-000000'])
+        # two newest kept
+        deleted = enforce_retention({other: (0, 2)}, now=now)
+        self.assertEqual(len(deleted), 3)
+        self.assertEqual(stamped_segments(other), [other + '.20261004-000000', other + '.20261005-000000'])
+        # 2 live + 3 + 2 segments + idx = 710 bytes, the oldest go first across the logs
+        deleted = enforce_retention({self.logfile: (0, 0), other: (0, 0)}, total_bytes=500, now=now)
+        self.assertEqual(deleted, [self.logfile + '.20261003-000000', other + '.20261004-000000',
+                                   self.logfile + '.20261004-000000'])
+        self.assertFalse(os.path.exists(self.logfile + '.20261004-000000.idx'))
+        self.assertEqual(sum(os.path.getsize(os.path.join(self.tmp.name, name))
+                             for name in os.listdir(self.tmp.name)), 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
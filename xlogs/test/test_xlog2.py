@@ -0,0 +1,335 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+"""
+@file  : test_xlog2.py
+@Time  : 2026/10/18 15:20
+@Author: Tao.Xu
+@Email : tao.xu2008@outlook.com
+"""
+
+import os
+import sys
+import random
+import logging
+import tempfile
+import unittest
+
+from xlogs.xlog2 import LoggerConfig, get_logger, backtrace_info, backtrace_debug, backtrace_warn, backtrace_error, \
+    _proc_thd_id, _RateLimitFilter, _RepeatCollapseHandler, \
+    _RingBufferHandler, set_loglevel, info, debug_if, info_if
+from xlogs.test.helpers import ListHandler
+
+
+class BacktraceTC(unittest.TestCase):
+    """backtrace_* helpers test case"""
+
+    def setUp(self):
+        self.logger = get_logger(logger_name='backtrace', output_logfile=False, print_console=False, reset=True)
+        self.handler = ListHandler()
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.INFO)
+
+    def test_1_prefix_and_caller(self):
+        backtrace_info('hello'); lineno = sys._getframe().f_lineno
+        record, = self.handler.records
+        self.assertEqual(record.getMessage(), ' * [%d:%d] [test_xlog2.py:%d] hello' % (
+            os.getpid(), record.thread, lineno))
+        self.assertEqual((record.filename, record.lineno, record.funcName),
+                         ('test_xlog2.py', lineno, 'test_1_prefix_and_caller'))
+        self.assertEqual(record.levelno, logging.INFO)
+
+    def test_2_back_trace_len(self):
+        def helper():
+            backtrace_error('from helper', back_trace_len=1)
+        helper(); lineno = sys._getframe().f_lineno
+        record, = self.handler.records
+        self.assertTrue(record.getMessage().endswith('[test_xlog2.py:%d] from helper' % lineno))
+
+    def test_3_disabled(self):
+        backtrace_debug('hidden')
+        self.assertEqual(self.handler.records, [])
+
+    def test_4_proc_thd_id_cached(self):
+        self.assertIs(_proc_thd_id(), _proc_thd_id())
+
+
+class RateLimitFilterTC(unittest.TestCase):
+    """_RateLimitFilter test case"""
+
+    def setUp(self):
+        self.logger = logging.getLogger('ratelimit')
+        self.logger.propagate = False
+        self.handler = ListHandler()
+        self.logger.handlers = [self.handler]
+        self.logger.filters = []
+
+    def _log(self, created, level=logging.WARNING, lineno=10, count=1):
+        for _ in range(count):
+            record = self.logger.makeRecord(self.logger.name, level, __file__, lineno, 'hot %d', (lineno,), None)
+            record.created = created
+            self.logger.handle(record)
+
+    def test_1_token_bucket_and_summary(self):
+        log_filter = _RateLimitFilter(rate=10, burst=5, summary_interval=60)
+        self.logger.addFilter(log_filter)
+        now = log_filter._summary_at - 60
+        self._log(now, count=20)
+        self.assertEqual(len(self.handler.records), 5)
+        # 0.5s refill 5 tokens, other call sites have their own bucket
+        self._log(now + 0.5, count=10)
+        self._log(now + 0.5, lineno=11, count=3)
+        self.assertEqual(len(self.handler.records), 13)
+        # the next record after summary_interval logs the summaries first
+        self._log(now + 61, lineno=11)
+        summary = self.handler.records[13]
+        self.assertEqual(summary.getMessage(), 'suppressed 20 similar messages in the last 61s')
+        self.assertEqual((summary.suppressed, summary.lineno, summary.levelno), (20, 10, logging.WARNING))
+        self.assertEqual(len(self.handler.records), 15)
+        self.assertEqual(log_filter.summarize(now + 62), [])
+
+    def test_2_sampling(self):
+        log_filter = _RateLimitFilter(rate=None, sample=0.25)
+        log_filter._random = random.Random(7).random
+        self.logger.addFilter(log_filter)
+        now = log_filter._summary_at - 10
+        self._log(now, logging.INFO, count=1000)
+        self._log(now, logging.WARNING, count=100)
+        info = len([r for r in self.handler.records if r.levelno == logging.INFO])
+        self.assertTrue(200 < info < 300, info)
+        self.assertEqual(len(self.handler.records) - info, 100)
+        summary, = log_filter.summarize(now + 1)
+        self.assertEqual(summary.suppressed, 1000 - info)
+
+    def test_3_logger_config(self):
+        logger = get_logger(logger_name='ratelimit2', output_logfile=False, print_console=False, reset=True,
+                            rate_limit=1, rate_burst=2)
+        handler = ListHandler()
+        logger.addHandler(handler)
+        for _ in range(10):
+            logger.warning('spam')
+        self.assertEqual(len(handler.records), 2)
+        LoggerConfig().flush()
+        self.assertEqual(handler.records[-1].suppressed, 8)
+        logger = get_logger(logger_name='ratelimit2', output_logfile=False, print_console=False, reset=True)
+        self.assertEqual(logger.filters, [])
+
+
+class RepeatCollapseHandlerTC(unittest.TestCase):
+    """_RepeatCollapseHandler test case"""
+
+    def setUp(self):
+        self.target = ListHandler()
+        self.handler = _RepeatCollapseHandler([self.target], flush_interval=0)
+
+    def _log(self, msg, *args, **kwargs):
+        record = logging.getLogger('repeat').makeRecord('repeat', kwargs.get('level', logging.WARNING), __file__, 1,
+                                                        msg, args, kwargs.get('exc_info'))
+        self.handler.handle(record)
+
+    def messages(self):
+        return [r.getMessage() for r in self.target.records]
+
+    def test_1_collapse_until_change(self):
+        for _ in range(5):
+            self._log('retry %s', 'db')
+        self._log('retry %s', 'cache')
+        self._log('retry %s', 'cache', level=logging.ERROR)
+        self.assertEqual(self.messages(), ['retry db', 'last message repeated 4 times', 'retry cache', 'retry cache'])
+        self.assertEqual(self.target.records[1].repeated, 4)
+        self.assertEqual(self.target.records[1].levelno, logging.WARNING)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            for _ in range(2):
+                self._log('failed', exc_info=sys.exc_info())
+        self.assertEqual(len(self.target.records), 6)
+        self.handler.flush()
+        self.assertEqual(len(self.target.records), 6)
+
+    def test_2_flush_interval(self):
+        self.handler.flush_interval = 0.05
+        for _ in range(3):
+            self._log('tick')
+        timer = self.handler._timer
+        timer.join()
+        self.assertEqual(self.messages(), ['tick', 'last message repeated 2 times'])
+        self._log('tick')
+        self.handler.close()
+        self.assertEqual(self.messages()[-1], 'last message repeated 1 times')
+
+    def test_3_timed_write_error(self):
+        def _raising_filter(record):
+            if getattr(record, 'repeated', None):
+                raise RuntimeError('filter failed')
+            return True
+
+        self.target.addFilter(_raising_filter)
+        errors = []
+        self.handler.handleError = errors.append
+        self.handler.flush_interval = 0.05
+        for _ in range(3):
+            self._log('tick')
+        self.handler._timer.join()
+        self.assertEqual(self.messages(), ['tick'])
+        self.assertEqual([r.getMessage() for r in errors], ['tick'])
+        self.handler.close()
+
+    def test_4_backtrace_records(self):
+        logger = get_logger(logger_name='repeat2', output_logfile=False, print_console=False, reset=True,
+                            collapse_repeats=True)
+        handler = logger.handlers[0]
+        self.assertIsInstance(handler, _RepeatCollapseHandler)
+        handler.handlers.append(self.target)
+        for _ in range(3):
+            backtrace_warn('disk full')
+        LoggerConfig().flush()
+        self.assertEqual(len(self.target.records), 2)
+        self.assertTrue(self.messages()[0].endswith('disk full'))
+        self.assertEqual(self.target.records[1].repeated, 2)
+
+
+class RingBufferHandlerTC(unittest.TestCase):
+    """_RingBufferHandler test case"""
+
+    def setUp(self):
+        self.target = ListHandler()
+        self.handler = _RingBufferHandler(self.target, capacity=3)
+        self.logger = logging.getLogger('ring')
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.handlers = [self.handler]
+
+    def tearDown(self):
+        self.logger.handlers = []
+
+    def messages(self):
+        return [r.getMessage() for r in self.target.records]
+
+    def test_1_dump_on_error(self):
+        for i in range(5):
+            self.logger.debug('step %d', i, extra={'step': i})
+        self.logger.info('started')
+        self.assertEqual(self.messages(), ['started'])
+        self.assertEqual(len(self.handler), 3)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            self.logger.debug('divide', exc_info=True)
+        self.logger.error('failed')
+        self.assertEqual(self.messages(), ['started', 'step 3', 'step 4', 'divide', 'failed'])
+        record = self.target.records[1]
+        self.assertEqual((record.levelname, record.step, record.funcName), ('DEBUG', 3, 'test_1_dump_on_error'))
+        self.assertIn('ZeroDivisionError', self.target.records[3].exc_text)
+        self.assertEqual(len(self.handler), 0)
+        # nothing left to write
+        self.logger.critical('again')
+        self.assertEqual(self.messages()[-1:], ['again'])
+
+    def test_2_max_bytes_and_dump(self):
+        self.handler = _RingBufferHandler(self.target, capacity=100, max_bytes=1000)
+        self.logger.handlers = [self.handler]
+        for i in range(10):
+            self.logger.debug('%d %s', i, 'x' * 100)
+        self.assertLess(len(self.handler), 10)
+        self.assertLessEqual(self.handler._bytes, 1000)
+        self.handler.dump()
+        self.assertEqual([r.args[0] for r in self.target.records], list(range(10 - len(self.target.records), 10)))
+        self.handler.dump()
+        self.assertEqual(len(self.target.records), len(set(r.args[0] for r in self.target.records)))
+
+    def test_3_logger_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            logfile = os.path.join(tmp, 'ring.log')
+            logger = get_logger(logger_name='ring2', logfile=logfile, print_console=False, reset=True,
+                                gen_wf=True, ring_buffer=2)
+            for i in range(3):
+                logger.debug('debug %d', i)
+            logger.info('info')
+            logger.error('error')
+            LoggerConfig().flush()
+            with open(logfile) as f:
+                self.assertEqual([line.split(': ', 1)[1] for line in f.read().splitlines()], ['info'])
+            with open(logfile + '.wf') as f:
+                self.assertEqual([line.split(': ', 1)[1] for line in f.read().splitlines()],
+                                 ['debug 1', 'debug 2', 'error'])
+            logger.debug('on demand')
+            LoggerConfig().dump()
+            LoggerConfig().flush()
+            with open(logfile + '.wf') as f:
+                self.assertTrue(f.read().endswith('on demand\n'))
+            get_logger(logger_name='ring3', output_logfile=False, print_console=False, reset=True)
+
+
+class FastLoggerTC(unittest.TestCase):
+    """get_logger() _FastLogger test case"""
+
+    def setUp(self):
+        self.logger = get_logger(logger_name='fast', output_logfile=False, print_console=False, reset=True)
+        self.handler = ListHandler()
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        self.logger.disabled = False
+        self.logger.refresh()
+
+    def test_1_cached_level(self):
+        self.assertIs(get_logger(logger_name='fast'), self.logger)
+        self.logger.setLevel(logging.INFO)
+        self.assertFalse(self.logger.isEnabledFor(logging.DEBUG))
+        self.logger.debug('hidden')
+        self.logger.info('shown %d', 1); lineno = sys._getframe().f_lineno
+        record, = self.handler.records
+        self.assertEqual((record.getMessage(), record.lineno, record.funcName), ('shown 1', lineno, 'test_1_cached_level'))
+        self.assertEqual(record.pathname, __file__)
+        set_loglevel(logging.DEBUG)
+        self.logger.debug('debug')
+        self.assertEqual(len(self.handler.records), 2)
+        # changed through logging: cached until refresh()
+        logging.disable(logging.ERROR)
+        self.logger.refresh()
+        self.logger.warning('disabled')
+        self.assertEqual(len(self.handler.records), 2)
+        logging.disable(logging.NOTSET)
+        self.logger.logger.level = logging.ERROR
+        self.logger.refresh()
+        self.logger.warning('above the level')
+        self.assertEqual(len(self.handler.records), 2)
+        self.logger.disabled = True
+        self.logger.critical('disabled')
+        self.assertEqual(len(self.handler.records), 2)
+
+    def test_2_module_functions(self):
+        # the root logger, like logging.info()
+        root = logging.getLogger()
+        level = root.level
+        root.addHandler(self.handler)
+        try:
+            root.setLevel(logging.INFO)
+            self.logger.refresh()
+            info('module %s', 'info'); lineno = sys._getframe().f_lineno
+            debug_if(True, 'not logged, root at INFO')
+            info_if(False, 'not logged')
+            info_if(True, 'info if %d')
+        finally:
+            root.removeHandler(self.handler)
+            root.setLevel(level)
+            self.logger.refresh()
+        first, second = self.handler.records
+        self.assertEqual((first.getMessage(), first.lineno, first.name), ('module info', lineno, 'root'))
+        self.assertEqual((second.name, second.getMessage()), ('root', 'info if 1'))
+
+    def test_3_logger_left_alone(self):
+        plain = logging.getLogger('fast')
+        self.assertIs(self.logger.logger, plain)
+        self.assertIs(type(plain), logging.Logger)
+        self.assertEqual(self.logger.name, 'fast')
+        self.assertEqual(self.logger.handlers, plain.handlers)
+        self.logger.disabled = True
+        self.assertTrue(plain.disabled)
+        self.logger.error('disabled')
+        self.assertEqual(self.handler.records, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,8 +10,6 @@
 import functools
 import logging
 import os
-import logging.config
-import configparser
 import threading
 import sys
 
@@ -20,12 +18,14 @@ class LogConfig(object):
     """Logging toolkit"""
     _lock = threading.Lock()  # 实现线程锁，增加安全性
 
-    def __init__(self, log_dir=None, config_file=None):
+    def __init__(self, log_dir=None, config_file=None, cache_file=None):
         """初始化日志保存文件和日志配置文件
         :param log_dir: 日志保存文件
         :param config_file: 日志配置文件
+        :param cache_file: 编译后配置的缓存文件(pickle), 新进程不用再解析配置文件
         """
         self.config_file = config_file or os.path.dirname(__file__) + os.sep + 'config.ini'
+        self.cache_file = cache_file
         self.log_dir = log_dir if log_dir else os.path.join(os.getcwd(), 'log')
         if not hasattr(LogConfig, "_init"):  # 增加初始化屬性
             with LogConfig._lock:  # 加锁防止多线程环境中两个线程同时实例化
@@ -33,32 +33,23 @@ class LogConfig(object):
                     self._config()
                     LogConfig._init = True
 
-    def _config(self) -> configparser:
+    def _config(self) -> 'CompiledConfig':
         """加载当前文件下的log.ini文件
         默认日志文件夹在当前运训目录的logs下
         如果要自定义文件夹，只需要将custom_dir定义该目录即可，修改目录下的日志文件夹只需要定义handlers即可，程序会自动寻找handlers下的args的值。
-        将匹配信息直接写入内存中
+        配置文件只在修改后重新解析, reset() 只重建配置有变化的 handler (见 fileconfig.py)
         [handlers]
         keys = consoleHandler,fileHandler,errorHandler
         self.config_file: 日志配置文件
         self.log_dir: 自定义日志保存文件夹
-        :return: 日志文件配置对象
+        :return: 编译后的日志配置
         """
-        cfg = configparser.RawConfigParser()
-        cfg.read(self.config_file)
+        # loaded on first use: not needed by the get_logger() users of the package
+        from .fileconfig import load_config, apply_config
+        cfg = load_config(self.config_file, self.cache_file)
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
-        handle = cfg.items('handlers')
-        for _, v in handle:
-            for vs in v.split(','):
-                for key, value in cfg.items('handler_' + vs):
-                    if key == 'args':
-                        e = eval(value)
-                        if isinstance(e[0], str):
-                            es = self.log_dir + os.sep + os.path.basename(e[0])
-                            value = str((es, *e[1:]))
-                            cfg.set('handler_' + vs, 'args', value)
-        logging.config.fileConfig(cfg)
+        apply_config(cfg, log_dir=self.log_dir)
         return cfg
 
     def reset(self):
@@ -10,25 +10,20 @@
 import os
 import re
 import sys
-import gzip
-import shutil
-import platform
+import time
+import random
 import logging
+import importlib
 import threading
-try:
-    import coloredlogs
-except ImportError as e:
-    print(e)
-from logging import handlers
-from logging.handlers import RotatingFileHandler
-import unittest
+from .formatter import FastFormatter, record_extra, record_context
 
 
 __all__ = [
     'debug', 'info', 'warning', 'error', 'critical',
     'get_logger', 'set_loglevel', 'get_inited_logger_name', 'basic_config',
-    'ROTATION', 'INFINITE', 'parse_msg',
-    'backtrace_info', 'backtrace_debug', 'backtrace_error', 'backtrace_critical',
+    'ROTATION', 'INFINITE', 'parse_msg', 'HybridRotatingFileHandler',
+    'OVERFLOW_BLOCK', 'OVERFLOW_DROP_OLDEST', 'OVERFLOW_DROP_NEWEST',
+    'backtrace_info', 'backtrace_debug', 'backtrace_warn', 'backtrace_error', 'backtrace_critical',
     'debug_if', 'info_if', 'error_if', 'warn_if', 'critical_if',
 ]
 
@@ -53,6 +48,34 @@ CONSOLE_LEVEL = logging.INFO
 FILE_BACKUPCOUNT = 5
 # RotatingFileHandler maxBytes
 FILE_MAXBYTES = 20 * 1024 * 1024
+# buffered file handler: write to disk once buffered bytes / records / seconds reach the limit
+BUFFER_SIZE = 64 * 1024
+BUFFER_RECORDS = 1000
+FLUSH_INTERVAL = 1.0
+# rate limit filter: records per second and burst per call site, summary of the suppressed records every N seconds
+RATE_LIMIT = 20.0
+RATE_BURST = 100
+SUMMARY_INTERVAL = 10.0
+# repeat collapsing handler: seconds before a pending 'last message repeated N times' is written
+REPEAT_INTERVAL = 5.0
+# ring buffer handler: DEBUG records kept in memory, dumped to the file when an ERROR arrives
+RING_RECORDS = 1000
+# metrics=True: seconds between two writes of metrics_file, see metrics.py
+METRICS_INTERVAL = 10.0
+# defaults of the modules LoggerConfig imports on demand, the same values as
+# queue_handler.QUEUE_SIZE / OVERFLOW_*, compress.COMPRESS_CODEC and rotation.MAX_AGE (see test_import.py)
+QUEUE_SIZE = 10000
+OVERFLOW_BLOCK = 'block'
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_DROP_NEWEST = 'drop_newest'
+COMPRESS_CODEC = 'gzip'
+MAX_AGE = 30 * 24 * 3600
+# async_mode value of the event loop flavour, see aio.py
+ASYNC_ASYNCIO = 'asyncio'
+# async_mode value of the per-thread queues, formatting in the logging threads, see queue_handler.py
+ASYNC_THREADS = 'threads'
+# file handler output: formatted text lines, json lines, length prefixed binary records
+LOG_FORMATS = ('text', 'json', 'binary')
 # date formate
 DATE_FORMATE = '%Y-%m-%d %H:%M:%S'
 # log format
@@ -62,7 +85,7 @@ CONSOLE_FORMATE = INFO_FORMATE if (CONSOLE_LEVEL == logging.INFO) else DEBUG_FOR
 FILE_FORMATE = INFO_FORMATE  # if (FILE_LEVEL == logging.INFO) else DEBUG_FORMATE
 
 # ---------------------------
-# --- Global for coloredlogs
+# --- Global for colored console (coloredlogs compatible styles)
 # ---------------------------
 # Windows requires special handling and the first step is detecting it :-).
 WINDOWS = sys.platform.startswith('win')
@@ -95,12 +118,6 @@ DEFAULT_LEVEL_STYLES = dict(
     error=dict(color='red'),
     critical=dict(color='red', bold=CAN_USE_BOLD_FONT))
 
-info = logging.info
-warning = logging.warning
-error = logging.error
-debug = logging.debug
-critical = logging.critical
-
 # Add a new log level 21 -- DESCRIBE, usage: logging.log(21, 'mesage')
 logging.addLevelName(21, 'DESCRIBE')
 
@@ -153,34 +170,389 @@ class _MsgFilter(logging.Filter):
             return logging.Filter.filter(self, record)
 
 
-class _CompressedRotatingFileHandler(RotatingFileHandler):
-    """Compress and rotating file handler"""
-    def doRollover(self):
-        if self.stream:
-            self.stream.close()
-            self.stream = None
-        if self.backupCount > 0:
-            for i in range(self.backupCount - 1, 0, -1):
-                sfn = "%s.%d.gz" % (self.baseFilename, i)
-                dfn = "%s.%d.gz" % (self.baseFilename, i + 1)
-                if os.path.exists(sfn):
-                    # print "%s -> %s" % (sfn, dfn)
-                    if os.path.exists(dfn):
-                        os.remove(dfn)
-                    os.rename(sfn, dfn)
-            dfn = self.baseFilename + ".1"
-            if os.path.exists(dfn):
-                os.remove(dfn)
-            # Issue 18940: A file may not have been created if delay is True.
-            if os.path.exists(self.baseFilename):
-                os.rename(self.baseFilename, dfn)
-            # Compress it.
-            with open(dfn, 'rb') as f_in, gzip.open('{}.gz'.format(dfn), 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-                os.remove(dfn)
-        if platform.python_version().strip() == '2.7.12':
-            if not self.delay:
-                self.stream = self._open()
+_SUPPRESSED_MSG = 'suppressed %d similar messages in the last %.0fs'
+
+
+class _RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site (logger name, level, pathname, lineno): `rate`
+    records per second (None: no limit), bursts up to `burst`. Records <= sample_level are
+    also kept with probability `sample` only. The suppressed records are
+    counted, every summary_interval seconds one record per call site reports
+    them: 'suppressed 12345 similar messages in the last 10s', with the
+    call site's level and source line and a `suppressed` attribute.
+
+    The message is never formatted: the key is built from record attributes
+    and the check is a dict lookup plus a few float operations.
+    """
+
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST, sample=1.0, sample_level=logging.INFO,
+                 summary_interval=SUMMARY_INTERVAL):
+        super(_RateLimitFilter, self).__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample = sample
+        self.sample_level = sample_level if sample < 1.0 else -1
+        self.summary_interval = summary_interval
+        # key -> [tokens, last refill time, suppressed count, a suppressed record]
+        self._buckets = {}
+        self._summary_at = time.time() + summary_interval
+        self._summary_lock = threading.Lock()
+        self._random = random.random
+
+    def filter(self, record):
+        if record.msg is _SUPPRESSED_MSG:
+            return True
+        now = record.created
+        if now >= self._summary_at:
+            self.summarize(now)
+        key = (record.name, record.levelno, record.pathname, record.lineno)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now, 0, None]
+        if record.levelno <= self.sample_level and self._random() >= self.sample:
+            bucket[2] += 1
+            bucket[3] = record
+            return False
+        if self.rate is None:
+            return True
+        tokens = bucket[0] + (now - bucket[1]) * self.rate
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            bucket[2] += 1
+            bucket[3] = record
+            return False
+        bucket[0] = tokens - 1.0 if tokens <= self.burst else self.burst - 1.0
+        return True
+
+    def summarize(self, now=None):
+        """log the summary records of the call sites with suppressed records, return them"""
+        now = time.time() if now is None else now
+        if not self._summary_lock.acquire(False):
+            # another thread is summarizing
+            return []
+        try:
+            elapsed = self.summary_interval + now - self._summary_at
+            self._summary_at = now + self.summary_interval
+            summaries = []
+            for bucket in list(self._buckets.values()):
+                count, record = bucket[2], bucket[3]
+                if not count:
+                    continue
+                bucket[2], bucket[3] = 0, None
+                logger = logging.getLogger(record.name)
+                summary = logger.makeRecord(record.name, record.levelno, record.pathname, record.lineno,
+                                            _SUPPRESSED_MSG, (count, elapsed), None, record.funcName,
+                                            {'suppressed': count})
+                summaries.append(summary)
+                logger.handle(summary)
+            return summaries
+        finally:
+            self._summary_lock.release()
+
+
+_REPEATED_MSG = 'last message repeated %d times'
+
+
+class _RepeatCollapseHandler(logging.Handler):
+    """
+    Collapse consecutive identical records, like syslog: a record with the
+    same logger, level, msg template and args as the previous one is only
+    counted, the count is written as 'last message repeated N times' (with
+    a `repeated` attribute) when a different record arrives or after
+    flush_interval seconds. The check compares the template and args
+    before anything is formatted; records with exc_info are never collapsed.
+    """
+
+    def __init__(self, handlers, flush_interval=REPEAT_INTERVAL):
+        logging.Handler.__init__(self)
+        self.handlers = list(handlers)
+        self.flush_interval = flush_interval
+        self._last = None
+        self._repeated = 0
+        self._repeat = None
+        self._timer = None
+
+    def _dispatch(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _same(self, record):
+        last = self._last
+        if last is None or record.exc_info or last.exc_info:
+            return False
+        try:
+            return record.msg == last.msg and record.levelno == last.levelno and record.name == last.name \
+                and record.args == last.args
+        except Exception:
+            # args which can not be compared
+            return False
+
+    def _write_repeated(self):
+        # caller holds self.lock
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._repeated:
+            return
+        record = self._repeat
+        summary = logging.makeLogRecord(dict(
+            record.__dict__, msg=_REPEATED_MSG, args=(self._repeated,), repeated=self._repeated))
+        self._repeated = 0
+        self._repeat = None
+        self._dispatch(summary)
+
+    def _on_timer(self):
+        self.acquire()
+        record = self._repeat
+        try:
+            self._timer = None
+            self._write_repeated()
+        except Exception:
+            self.handleError(record)
+        finally:
+            self.release()
+
+    def emit(self, record):
+        try:
+            if self._same(record):
+                self._repeated += 1
+                self._repeat = record
+                if self._timer is None and self.flush_interval:
+                    self._timer = threading.Timer(self.flush_interval, self._on_timer)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+            self._write_repeated()
+            self._last = record
+            self._dispatch(record)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            self._write_repeated()
+        finally:
+            self.release()
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self):
+        self.flush()
+        for handler in self.handlers:
+            handler.close()
+        logging.Handler.close(self)
+
+
+_exc_formatter = logging.Formatter()
+_new_record = object.__new__
+# attributes of a LogRecord without `extra`
+_PLAIN_RECORD_SIZE = len(vars(logging.makeLogRecord({})))
+
+
+class _RingSlot(object):
+    """one unformatted record of the ring buffer, the LogRecord fields needed to format it again"""
+    __slots__ = ('name', 'levelno', 'pathname', 'lineno', 'funcName', 'msg', 'args', 'exc_text', 'stack_info',
+                 'created', 'thread', 'threadName', 'process', 'processName', 'context', 'extra', 'size')
+
+    def store(self, record):
+        self.name = record.name
+        self.levelno = record.levelno
+        self.pathname = record.pathname
+        self.lineno = record.lineno
+        self.funcName = record.funcName
+        self.msg = record.msg
+        self.args = record.args
+        if record.exc_info and not record.exc_text:
+            # keep the text, not the traceback and its frames
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+        self.exc_text = record.exc_text
+        self.stack_info = record.stack_info
+        self.created = record.created
+        self.thread = record.thread
+        self.threadName = record.threadName
+        self.process = record.process
+        self.processName = record.processName
+        self.context = record_context(record)
+        self.extra = None
+        if len(record.__dict__) > _PLAIN_RECORD_SIZE:
+            extra = record_extra(record)
+            if extra:
+                self.extra = {key: record.__dict__[key] for key in extra}
+        # approximate memory of the record, for max_bytes
+        self.size = 200 + (len(self.msg) if isinstance(self.msg, str) else 64) + len(self.exc_text or '')
+
+    def record(self):
+        filename = os.path.basename(self.pathname)
+        record = _new_record(logging.LogRecord)
+        record.__dict__.update({
+            'name': self.name,
+            'msg': self.msg,
+            'args': self.args,
+            'levelno': self.levelno,
+            'levelname': logging.getLevelName(self.levelno),
+            'pathname': self.pathname,
+            'filename': filename,
+            'module': os.path.splitext(filename)[0],
+            'exc_info': None,
+            'exc_text': self.exc_text,
+            'stack_info': self.stack_info,
+            'lineno': self.lineno,
+            'funcName': self.funcName,
+            'created': self.created,
+            'msecs': int((self.created - int(self.created)) * 1000) + 0.0,
+            'relativeCreated': (self.created - logging._startTime) * 1000,
+            'thread': self.thread,
+            'threadName': self.threadName,
+            'processName': self.processName,
+            'process': self.process,
+        })
+        record.context = self.context
+        if self.extra:
+            record.__dict__.update(self.extra)
+        return record
+
+
+class _RingBufferHandler(logging.Handler):
+    """
+    Keep the records below pass_level (DEBUG) in memory instead of writing
+    them: the last `capacity` records, and at most about max_bytes, in a
+    preallocated ring of _RingSlot, unformatted. Records at pass_level or
+    above go to the target handler at once; a record at flush_level (ERROR)
+    or above first dumps the ring to dump_target (default the target), so
+    the debug context of a failure is written next to it. dump() writes the
+    ring on demand.
+    """
+
+    def __init__(self, target, capacity=RING_RECORDS, max_bytes=None, pass_level=logging.INFO,
+                 flush_level=logging.ERROR, dump_target=None):
+        logging.Handler.__init__(self)
+        if capacity < 1:
+            raise ValueError('capacity must be >= 1, got {0}'.format(capacity))
+        self.target = target
+        self.dump_target = dump_target
+        self.handlers = [target] if dump_target is None else [target, dump_target]
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.pass_level = pass_level
+        self.flush_level = flush_level
+        self._slots = [_RingSlot() for _ in range(capacity)]
+        # index of the oldest record, records in the ring and their approximate bytes
+        self._head = 0
+        self._count = 0
+        self._bytes = 0
+
+    def __len__(self):
+        return self._count
+
+    def emit(self, record):
+        try:
+            if record.levelno >= self.pass_level:
+                if record.levelno >= self.flush_level:
+                    self.dump()
+                self.target.handle(record)
+                return
+            slots = self._slots
+            if self._count == self.capacity:
+                # overwrite the oldest record
+                slot = slots[self._head]
+                self._bytes -= slot.size
+                self._head = (self._head + 1) % self.capacity
+            else:
+                slot = slots[(self._head + self._count) % self.capacity]
+                self._count += 1
+            slot.store(record)
+            self._bytes += slot.size
+            if self.max_bytes:
+                while self._bytes > self.max_bytes and self._count > 1:
+                    self._drop_oldest()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _drop_oldest(self):
+        slot = self._slots[self._head]
+        self._bytes -= slot.size
+        slot.msg = slot.args = slot.extra = None
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+
+    def records(self):
+        """the buffered records as LogRecords, oldest first"""
+        self.acquire()
+        try:
+            return [self._slots[(self._head + i) % self.capacity].record() for i in range(self._count)]
+        finally:
+            self.release()
+
+    def clear(self):
+        self.acquire()
+        try:
+            while self._count:
+                self._drop_oldest()
+            self._head = 0
+        finally:
+            self.release()
+
+    def dump(self):
+        """format and write the buffered records, oldest first, and empty the ring"""
+        self.acquire()
+        try:
+            records = self.records()
+            self.clear()
+            target = self.target if self.dump_target is None else self.dump_target
+            # Handler.handle() does not check the handler level: DEBUG records reach the .wf file too
+            for record in records:
+                target.handle(record)
+        finally:
+            self.release()
+
+    def flush(self):
+        for handler in self.handlers:
+            handler.flush()
+
+    def close(self):
+        for handler in self.handlers:
+            handler.close()
+        logging.Handler.close(self)
+
+
+# the rotating file handlers, in file_handler.py: imported with the first one used
+_LAZY_NAMES = dict.fromkeys((
+    '_CompressedRotatingFileHandler', '_BufferedRotatingFileHandler', '_BufferedCompressedRotatingFileHandler',
+    'HybridRotatingFileHandler', '_BufferedHybridRotatingFileHandler', '_FileLock',
+    '_ProcessSafeRotatingFileHandler', '_ProcessSafeCompressedRotatingFileHandler',
+), 'file_handler')
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_NAMES[name]
+    except KeyError:
+        raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
+    value = getattr(importlib.import_module('.' + module, __package__), name)
+    globals()[name] = value
+    return value
+
+
+def _loaded(module, *names):
+    """`names` of the xlogs submodule, () if it is not imported yet: none of them can be in use"""
+    module = sys.modules.get(__package__ + '.' + module)
+    return tuple(getattr(module, name) for name in names) if module is not None else ()
+
+
+def _config_filters():
+    return (_RateLimitFilter,) + _loaded('context', 'ContextFilter') + _loaded('metrics', 'MetricsFilter')
+
+
+def _queue_handlers():
+    return _loaded('queue_handler', 'AsyncQueueHandler', 'ThreadLocalQueueHandler')
 
 
 class LoggerConfig(object):
@@ -190,7 +562,14 @@ class LoggerConfig(object):
     def __init__(self, logger_name="test", logfile='message.log', log_level=FILE_LEVEL,
                  output_logfile=True, maxsize=FILE_MAXBYTES,
                  backup_count=FILE_BACKUPCOUNT, compress=False, gen_wf=False,
-                 print_console=True, colored_console=True, reset=False):
+                 print_console=True, colored_console=True, reset=False,
+                 async_mode=False, queue_size=QUEUE_SIZE, overflow=OVERFLOW_BLOCK,
+                 buffered=False, buffer_size=BUFFER_SIZE, buffer_records=BUFFER_RECORDS,
+                 flush_interval=FLUSH_INTERVAL, compress_codec=COMPRESS_CODEC, compress_level=None,
+                 process_safe=False, format='text', rotate_when=None, rotate_interval=1, max_age=MAX_AGE,
+                 total_bytes=None, rate_limit=None, rate_burst=RATE_BURST, sample=1.0,
+                 collapse_repeats=False, ring_buffer=0, ring_bytes=None, context_vars=(),
+                 metrics=False, metrics_file=None, metrics_interval=METRICS_INTERVAL):
         self.logger_name = logger_name
         self.logfile = logfile
         self.log_level = log_level
@@ -202,6 +581,31 @@ class LoggerConfig(object):
         self.print_console = print_console
         self.colored_console = colored_console
         self.reset = reset
+        self.async_mode = async_mode
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.buffered = buffered
+        self.buffer_size = buffer_size
+        self.buffer_records = buffer_records
+        self.flush_interval = flush_interval
+        self.compress_codec = compress_codec
+        self.compress_level = compress_level
+        self.process_safe = process_safe
+        self.format = format
+        self.rotate_when = rotate_when
+        self.rotate_interval = rotate_interval
+        self.max_age = max_age
+        self.total_bytes = total_bytes
+        self.rate_limit = rate_limit
+        self.rate_burst = rate_burst
+        self.sample = sample
+        self.collapse_repeats = collapse_repeats
+        self.ring_buffer = ring_buffer
+        self.ring_bytes = ring_bytes
+        self.context_vars = context_vars
+        self.metrics = metrics
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval
 
         if not hasattr(LoggerConfig, "_init"):  # 增加初始化屬性
             with LoggerConfig._lock:  # 加锁防止多线程环境中两个线程同时实例化
@@ -236,16 +640,19 @@ class LoggerConfig(object):
         logger = logging.getLogger(self.logger_name)
         self._mylogger = logger
         self._mylogger.handlers = []
+        self._mylogger.filters = [f for f in self._mylogger.filters if not isinstance(f, _config_filters())]
         self._mylogger.setLevel(logging.DEBUG)
 
     def reset_logger(self):
         if self._mylogger:
+            self.shutdown()
             del self._mylogger
         logging.root = logging.RootLogger(logging.WARNING)
         logger = logging.getLogger(self.logger_name)
         self._mylogger = logger
         # logging.root = logger
         self._mylogger.handlers = []
+        self._mylogger.filters = [f for f in self._mylogger.filters if not isinstance(f, _config_filters())]
         self._mylogger.setLevel(logging.DEBUG)
 
     def verify_logfile(self):
@@ -278,47 +685,190 @@ class LoggerConfig(object):
         self.verify_logfile()
         # Config the file handler
         # fd_handler = logging.FileHandler(logfile, 'a', encoding='utf-8')
-        if self.compress:
+        if self.format not in LOG_FORMATS:
+            raise LoggerException('format must be one of {0}, got {1!r}'.format(LOG_FORMATS, self.format))
+        compress_kwargs = dict(codec=self.compress_codec, level=self.compress_level) if self.compress else {}
+        hybrid = self.rotate_when or self.total_bytes
+        if hybrid and self.process_safe:
+            raise LoggerException('rotate_when / total_bytes are not supported with process_safe')
+        if hybrid:
+            # size or time rotation, timestamped segments, retention by age and total bytes
+            from .file_handler import HybridRotatingFileHandler, _BufferedHybridRotatingFileHandler
+            hybrid_kwargs = dict(compress_kwargs, when=self.rotate_when, interval=self.rotate_interval,
+                                 max_age=self.max_age, total_bytes=self.total_bytes)
+            if self.buffered or self.format == 'binary':
+                fd_handler = _BufferedHybridRotatingFileHandler(
+                    self.logfile, mode='a', maxBytes=self.maxsize, backupCount=self.backup_count,
+                    buffer_size=self.buffer_size, buffer_records=self.buffer_records,
+                    flush_interval=self.flush_interval, **hybrid_kwargs)
+            else:
+                fd_handler = HybridRotatingFileHandler(
+                    self.logfile, mode='a', maxBytes=self.maxsize, backupCount=self.backup_count,
+                    encoding='utf-8', **hybrid_kwargs)
+        elif self.process_safe:
+            from .file_handler import _ProcessSafeRotatingFileHandler, _ProcessSafeCompressedRotatingFileHandler
+            handler_class = _ProcessSafeCompressedRotatingFileHandler if self.compress \
+                else _ProcessSafeRotatingFileHandler
+            fd_handler = handler_class(
+                self.logfile, mode='a', maxBytes=self.maxsize, backupCount=self.backup_count, **compress_kwargs)
+        elif self.buffered or self.format == 'binary':
+            # binary records need a bytes handler
+            from .file_handler import _BufferedRotatingFileHandler, _BufferedCompressedRotatingFileHandler
+            handler_class = _BufferedCompressedRotatingFileHandler if self.compress else _BufferedRotatingFileHandler
+            fd_handler = handler_class(
+                self.logfile, mode='a', maxBytes=self.maxsize, backupCount=self.backup_count,
+                buffer_size=self.buffer_size, buffer_records=self.buffer_records,
+                flush_interval=self.flush_interval, **compress_kwargs)
+        elif self.compress:
+            from .file_handler import _CompressedRotatingFileHandler
             fd_handler = _CompressedRotatingFileHandler(
-                self.logfile, mode='a', maxBytes=self.maxsize, backupCount=self.backup_count)
+                self.logfile, mode='a', maxBytes=self.maxsize, backupCount=self.backup_count, **compress_kwargs)
         else:
-            fd_handler = handlers.RotatingFileHandler(
+            from logging.handlers import RotatingFileHandler
+            fd_handler = RotatingFileHandler(
                 self.logfile, mode='a', maxBytes=self.maxsize,
                 backupCount=self.backup_count, encoding='utf-8')
-        formatter = logging.Formatter(FILE_FORMATE)
-        fd_handler.setFormatter(formatter)
+        formatter = FastFormatter(FILE_FORMATE, context=True)
+        if self.format == 'json':
+            from .serialize import JsonFormatter
+            formatter = JsonFormatter()
+        if self.format == 'binary':
+            from .serialize import BinaryFormatter
+            fd_handler.setFormatter(BinaryFormatter())
+        else:
+            fd_handler.setFormatter(formatter)
         fd_handler.setLevel(self.log_level)
+        warn_handler = None
         if self.gen_wf:
-            # add .wf handler
+            # add .wf handler, json or text
             file_wf = str(self.logfile) + '.wf'
             warn_handler = logging.FileHandler(file_wf, 'a', encoding='utf-8')
             warn_handler.setLevel(logging.WARNING)
             warn_handler.setFormatter(formatter)
-            self._mylogger.addHandler(warn_handler)
             fd_handler.addFilter(_MsgFilter(logging.WARNING))
-        self._mylogger.addHandler(fd_handler)
+        ring = self.ring_buffer or self.ring_bytes
+        if ring:
+            # DEBUG records stay in memory, dumped to the logfile (the .wf file with gen_wf) before an ERROR
+            pass_level = max(self.log_level, logging.INFO)
+            fd_handler = _RingBufferHandler(fd_handler, self.ring_buffer or RING_RECORDS, self.ring_bytes,
+                                            pass_level=pass_level, dump_target=warn_handler)
+            fd_handler.setLevel(logging.DEBUG)
+            # the dump goes before the ERROR record written by the .wf handler
+            self._mylogger.addHandler(fd_handler)
+        if warn_handler is not None:
+            self._mylogger.addHandler(warn_handler)
+        if not ring:
+            self._mylogger.addHandler(fd_handler)
 
     def config_console_handler(self):
         # Config the console handler
         # print('print_console enabled, will print to stdout')
-        if self.colored_console and 'coloredlogs' in sys.modules and os.isatty(2):
-            coloredlogs.install(logger=self._mylogger, level=self.log_level, fmt=CONSOLE_FORMATE,
-                                field_styles=DEFAULT_FIELD_STYLES, level_styles=DEFAULT_LEVEL_STYLES)
+        if self.colored_console and os.isatty(2):
+            # only a colored tty console needs the styled handler
+            from .color_stream_handler import StyledStreamHandler
+            streamhandler = StyledStreamHandler(fmt=CONSOLE_FORMATE, datefmt=DATE_FORMATE,
+                                                field_styles=DEFAULT_FIELD_STYLES, level_styles=DEFAULT_LEVEL_STYLES,
+                                                context=True)
         else:
-            formatter = logging.Formatter(fmt=CONSOLE_FORMATE, datefmt=DATE_FORMATE)
+            formatter = FastFormatter(fmt=CONSOLE_FORMATE, datefmt=DATE_FORMATE, context=True)
             streamhandler = logging.StreamHandler()
-            streamhandler.setLevel(self.log_level)
             streamhandler.setFormatter(formatter)
-            self._mylogger.addHandler(streamhandler)
+        streamhandler.setLevel(self.log_level)
+        self._mylogger.addHandler(streamhandler)
+
+    def config_collapse_handler(self):
+        # Write consecutive identical records once, with a repeat count
+        self._mylogger.handlers = [_RepeatCollapseHandler(self._mylogger.handlers)]
+
+    def config_async_handler(self):
+        # Move every handler behind one queue, served by a background writer thread
+        if self.async_mode == ASYNC_ASYNCIO:
+            # + task name / contextvars on the records, awaitable flush
+            from .aio import AioQueueHandler
+            queue_handler = AioQueueHandler(self._mylogger.handlers, queue_size=self.queue_size,
+                                            overflow=self.overflow, context_vars=self.context_vars)
+        elif self.async_mode == ASYNC_THREADS:
+            # many logging threads: no lock shared by the callers, nothing dropped
+            from .queue_handler import ThreadLocalQueueHandler
+            queue_handler = ThreadLocalQueueHandler(self._mylogger.handlers, max_pending=self.queue_size)
+        else:
+            from .queue_handler import AsyncQueueHandler
+            queue_handler = AsyncQueueHandler(self._mylogger.handlers, queue_size=self.queue_size,
+                                              overflow=self.overflow)
+        self._mylogger.handlers = [queue_handler]
+
+    def config_filter(self):
+        # drop the records of hot call sites before they are formatted or queued
+        self._mylogger.addFilter(_RateLimitFilter(self.rate_limit, self.rate_burst, self.sample))
+
+    def config_metrics(self):
+        # count the records, time the formatting / writing of every handler, watch the async queue
+        from .metrics import METRICS, MetricsFilter
+        self._mylogger.addFilter(MetricsFilter())
+        queue_handlers = _queue_handlers()
+        for handler in _iter_handlers(self._mylogger.handlers):
+            if isinstance(handler, queue_handlers):
+                METRICS.watch_queue(handler, self.logger_name)
+            elif not hasattr(handler, 'handlers'):
+                METRICS.instrument(handler)
+        if self.metrics_file:
+            METRICS.start_dump(self.metrics_file, self.metrics_interval)
 
     def config_logger(self):
+        if self.rate_limit or self.sample < 1.0:
+            self.config_filter()
+        if self.async_mode or self.collapse_repeats:
+            # records formatted later / in the writer thread keep the context they were logged with
+            from .context import ContextFilter
+            self._mylogger.addFilter(ContextFilter())
         if self.output_logfile:
             self.config_file_handler()
         if self.print_console:
             self.config_console_handler()
-        global INITED_LOGGER
+        if self.collapse_repeats:
+            self.config_collapse_handler()
+        if self.async_mode:
+            self.config_async_handler()
+        if self.metrics:
+            self.config_metrics()
+        global INITED_LOGGER, _FAST_LOGGER
         if self.logger_name not in INITED_LOGGER:
             INITED_LOGGER.append(self.logger_name)
+        _FAST_LOGGER = _fast_logger(self.logger_name)
+        _refresh_fast_loggers()
+
+    def flush(self, timeout=None):
+        """write out everything logged so far, waiting for the async writer if enabled"""
+        for log_filter in self.m_logger.filters:
+            if isinstance(log_filter, _RateLimitFilter):
+                log_filter.summarize()
+        queue_handlers = _queue_handlers()
+        for handler in self.m_logger.handlers:
+            if isinstance(handler, queue_handlers):
+                handler.flush(timeout)
+            else:
+                handler.flush()
+
+    def dump(self):
+        """write the records kept by the ring buffer (ring_buffer=N) now"""
+        for handler in _iter_handlers(self.m_logger.handlers):
+            if isinstance(handler, _RingBufferHandler):
+                handler.dump()
+
+    def shutdown(self):
+        """drain and stop the async writer thread, no-op in sync mode"""
+        queue_handlers = _queue_handlers()
+        for handler in self.m_logger.handlers:
+            if isinstance(handler, queue_handlers):
+                handler.shutdown()
+
+
+def _iter_handlers(handler_list):
+    # the handlers and the handlers wrapped by the async / collapse / ring handlers
+    for handler in handler_list:
+        yield handler
+        for wrapped in _iter_handlers(getattr(handler, 'handlers', ())):
+            yield wrapped
 
 
 def get_logger(*args, debug=False, **kwargs):
@@ -336,7 +886,139 @@ def get_logger(*args, debug=False, **kwargs):
         CONSOLE_FORMATE = DEBUG_FORMATE
         FILE_FORMATE = DEBUG_FORMATE
     lcf = LoggerConfig(*args, **kwargs)
-    return logging.getLogger(lcf.logger_name)
+    return _fast_logger(lcf.logger_name)
+
+
+# a level above every logging level: all calls disabled
+_DISABLED = sys.maxsize
+
+
+class _FastLogger(object):
+    """
+    What get_logger() returns: the logging.Logger, left as it is, with its
+    enabled level cached here so a disabled debug()/info() call is one
+    attribute comparison. Every other Logger attribute and method is the
+    logger's. The cached levels are refreshed by set_loglevel(), setLevel()
+    and `disabled =` on this object, LoggerConfig (reset=True) and
+    apply_config(); after a level is changed through logging itself
+    (logging.disable(), setLevel() on the plain logger), call refresh().
+    """
+    # no __getattr__: it would slow down every method lookup, see _delegate()
+    __slots__ = ('logger', '_level')
+
+    def __init__(self, logger):
+        self.logger = logger
+        self._update()
+
+    def _update(self):
+        logger = self.logger
+        self._level = _DISABLED if logger.disabled else max(logger.getEffectiveLevel(), logger.manager.disable + 1)
+
+    def refresh(self):
+        """recompute the cached level of every get_logger() logger, the levels are inherited"""
+        _refresh_fast_loggers()
+
+    def __repr__(self):
+        return '<_FastLogger {0!r}>'.format(self.logger)
+
+    @property
+    def disabled(self):
+        return self.logger.disabled
+
+    @disabled.setter
+    def disabled(self, value):
+        self.logger.disabled = value
+        self._update()
+
+    def setLevel(self, level):
+        self.logger.setLevel(level)
+        _refresh_fast_loggers()
+
+    def isEnabledFor(self, level):
+        return level >= self._level
+
+    def aflush(self, timeout=None):
+        """awaitable flush: waits for the async writer in an executor thread, see xlogs.aio"""
+        from .aio import aflush
+        return aflush(self.logger, timeout)
+
+    def _emit(self, level, msg, args, kwargs):
+        # stacklevel + 2: skip _emit() and debug() ... log(), the record is the caller's
+        kwargs['stacklevel'] = kwargs.get('stacklevel', 1) + 2
+        self.logger._log(level, msg, args, **kwargs)
+
+    def debug(self, msg, *args, **kwargs):
+        if logging.DEBUG >= self._level:
+            self._emit(logging.DEBUG, msg, args, kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        if logging.INFO >= self._level:
+            self._emit(logging.INFO, msg, args, kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        if logging.WARNING >= self._level:
+            self._emit(logging.WARNING, msg, args, kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        if logging.ERROR >= self._level:
+            self._emit(logging.ERROR, msg, args, kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs):
+        if logging.ERROR >= self._level:
+            kwargs['exc_info'] = exc_info
+            self._emit(logging.ERROR, msg, args, kwargs)
+
+    def critical(self, msg, *args, **kwargs):
+        if logging.CRITICAL >= self._level:
+            self._emit(logging.CRITICAL, msg, args, kwargs)
+
+    fatal = critical
+
+    def log(self, level, msg, *args, **kwargs):
+        if not isinstance(level, int):
+            if logging.raiseExceptions:
+                raise TypeError('level must be an integer')
+            return
+        if level >= self._level:
+            self._emit(level, msg, args, kwargs)
+
+
+def _delegate(name):
+    return property(lambda self: getattr(self.logger, name), lambda self, value: setattr(self.logger, name, value))
+
+
+for _name in ('name', 'level', 'parent', 'propagate', 'handlers', 'filters', 'manager') + \
+        tuple(_name for _name in dir(logging.Logger) if not _name.startswith('__')):
+    if _name not in _FastLogger.__dict__:
+        setattr(_FastLogger, _name, _delegate(_name))
+del _name
+
+
+# logger name -> _FastLogger, one per name so every holder sees the refreshed level
+_FAST_LOGGERS = {}
+# _FastLogger of the LoggerConfig logger, used by backtrace_*
+_FAST_LOGGER = None
+
+
+def _fast_logger(name):
+    fast = _FAST_LOGGERS.get(name)
+    if fast is None:
+        fast = _FAST_LOGGERS.setdefault(name, _FastLogger(logging.getLogger(name)))
+    return fast
+
+
+# _FastLogger of the root logger, used by the module level debug() ... critical() and debug_if() ... critical_if()
+_ROOT_LOGGER = _fast_logger(None)
+
+
+def _refresh_fast_loggers():
+    global _ROOT_LOGGER
+    if _ROOT_LOGGER.logger is not logging.root:
+        # LoggerConfig replaces logging.root
+        _ROOT_LOGGER = _FAST_LOGGERS[None] = _FastLogger(logging.root)
+    # levels are inherited: refresh every cached logger
+    for fast in list(_FAST_LOGGERS.values()):
+        fast._update()
 
 
 def _line(back=0):
@@ -347,18 +1029,51 @@ def _file(back=0):
     return os.path.basename(sys._getframe(back + 1).f_code.co_filename)
 
 
+# per thread cache of the 'pid:tid' prefix, replaced in a forked child
+_PTID = threading.local()
+
+
 def _proc_thd_id():
-    return str(os.getpid()) + ':' + str(threading.current_thread().ident)
+    try:
+        return _PTID.value
+    except AttributeError:
+        _PTID.value = str(os.getpid()) + ':' + str(threading.current_thread().ident)
+        return _PTID.value
+
+
+def _reset_proc_thd_id():
+    global _PTID
+    _PTID = threading.local()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_proc_thd_id)
+
+
+class _CallerMsg(object):
+    """
+    msg of the backtrace_* records: keeps the caller's code object and line,
+    the ' * [pid:tid] [file:line] msg' text is only built when a handler
+    formats the record.
+    """
+    __slots__ = ('ptid', 'code', 'lineno', 'msg')
 
+    def __init__(self, ptid, code, lineno, msg):
+        self.ptid = ptid
+        self.code = code
+        self.lineno = lineno
+        self.msg = msg
 
-def _log_file_func_info(msg, back_trace_len=0):
-    tmp_msg = ' * [%s] [%s:%s] ' % (_proc_thd_id(), _file(2 + back_trace_len), _line(2 + back_trace_len))
+    def __str__(self):
+        return ' * [%s] [%s:%s] %s' % (self.ptid, os.path.basename(self.code.co_filename), self.lineno, self.msg)
 
-    msg = '%s%s' % (tmp_msg, msg)
-    if isinstance(msg, unicode):
-        return msg
-    else:
-        return msg.decode('utf8')
+    def __eq__(self, other):
+        # same caller and text, compared without building the string (see _RepeatCollapseHandler)
+        return isinstance(other, _CallerMsg) and self.code is other.code and self.lineno == other.lineno \
+            and self.ptid == other.ptid and self.msg == other.msg
+
+    def __hash__(self):
+        return hash((self.code, self.lineno, self.ptid, self.msg))
 
 
 def get_inited_logger_name():
@@ -370,79 +1085,105 @@ def get_inited_logger_name():
 
 
 def _fail_handle(msg, e):
-    if not isinstance(msg, unicode):
-        msg = msg.decode('utf8')
     print('{0}\nerror:{1}'.format(msg, e))
 
 
-def backtrace_info(msg, back_trace_len=0):
+def _backtrace_log(level, msg, back_trace_len):
     """
-    info with backtrace support
+    log msg with the caller's pid:tid and file:line prefix.
+    Return at once if level is disabled, else one frame lookup fills both
+    the prefix and the record's pathname/lineno/funcName (no findCaller walk).
     """
     try:
-        msg = _log_file_func_info(msg, back_trace_len)
-        logger_man = LoggerConfig()
-        logger_man.m_logger.info(msg)
+        fast = _FAST_LOGGER
+        if fast is None:
+            # first call: configure the default logger
+            LoggerConfig()
+            fast = _FAST_LOGGER
+        if level < fast._level:
+            return
+        frame = sys._getframe(2 + back_trace_len)
+        code = frame.f_code
+        logger = fast.logger
+        record = logger.makeRecord(logger.name, level, code.co_filename, frame.f_lineno,
+                                   _CallerMsg(_proc_thd_id(), code, frame.f_lineno, msg), None, None, code.co_name)
+        logger.handle(record)
     except LoggerException:
         return
     except Exception as e:
         _fail_handle(msg, e)
 
 
+def backtrace_info(msg, back_trace_len=0):
+    """
+    info with backtrace support
+    """
+    _backtrace_log(logging.INFO, msg, back_trace_len)
+
+
 def backtrace_debug(msg, back_trace_len=0):
     """
     debug with backtrace support
     """
-    try:
-        msg = _log_file_func_info(msg, back_trace_len)
-        logger_man = LoggerConfig()
-        logger_man.m_logger.debug(msg)
-    except LoggerException:
-        return
-    except Exception as e:
-        _fail_handle(msg, e)
+    _backtrace_log(logging.DEBUG, msg, back_trace_len)
 
 
 def backtrace_warn(msg, back_trace_len=0):
     """
     warning msg with backtrace support
     """
-    try:
-        msg = _log_file_func_info(msg, back_trace_len)
-        logger_man = LoggerConfig()
-        logger_man.m_logger.warn(msg)
-    except LoggerException:
-        return
-    except Exception as e:
-        _fail_handle(msg, e)
+    _backtrace_log(logging.WARNING, msg, back_trace_len)
 
 
 def backtrace_error(msg, back_trace_len=0):
     """
     error msg with backtarce support
     """
-    try:
-        msg = _log_file_func_info(msg, back_trace_len)
-        logger_man = LoggerConfig()
-        logger_man.m_logger.error(msg)
-    except LoggerException:
-        return
-    except Exception as error:
-        _fail_handle(msg, error)
+    _backtrace_log(logging.ERROR, msg, back_trace_len)
 
 
 def backtrace_critical(msg, back_trace_len=0):
     """
     logging.CRITICAL with backtrace support
     """
-    try:
-        msg = _log_file_func_info(msg, back_trace_len)
-        logger_man = LoggerConfig()
-        logger_man.m_logger.critical(msg)
-    except LoggerException:
-        return
-    except Exception as e:
-        _fail_handle(msg, e)
+    _backtrace_log(logging.CRITICAL, msg, back_trace_len)
+
+
+def _root_log(level, msg, args, kwargs):
+    # enabled record of debug() ... critical(): logging.log() on the root logger,
+    # stacklevel + 2 skips _root_log() and them
+    kwargs['stacklevel'] = kwargs.get('stacklevel', 1) + 2
+    logging.log(level, msg, *args, **kwargs)
+
+
+def debug(msg, *args, **kwargs):
+    """logging.debug(), checked against the cached root level first"""
+    if logging.DEBUG >= _ROOT_LOGGER._level:
+        _root_log(logging.DEBUG, msg, args, kwargs)
+
+
+def info(msg, *args, **kwargs):
+    """logging.info(), checked against the cached root level first"""
+    if logging.INFO >= _ROOT_LOGGER._level:
+        _root_log(logging.INFO, msg, args, kwargs)
+
+
+def warning(msg, *args, **kwargs):
+    """logging.warning(), checked against the cached root level first"""
+    if logging.WARNING >= _ROOT_LOGGER._level:
+        _root_log(logging.WARNING, msg, args, kwargs)
+
+
+def error(msg, *args, **kwargs):
+    """logging.error(), checked against the cached root level first"""
+    if logging.ERROR >= _ROOT_LOGGER._level:
+        _root_log(logging.ERROR, msg, args, kwargs)
+
+
+def critical(msg, *args, **kwargs):
+    """logging.critical(), checked against the cached root level first"""
+    if logging.CRITICAL >= _ROOT_LOGGER._level:
+        _root_log(logging.CRITICAL, msg, args, kwargs)
 
 
 def set_loglevel(logging_level):
@@ -451,12 +1192,17 @@ def set_loglevel(logging_level):
     """
     logger_man = LoggerConfig()
     logger_man.m_logger.setLevel(logging_level)
+    _refresh_fast_loggers()
+
+
+_BLANKS = re.compile('[ \t]+')
 
 
 def parse_msg(log_line):
     """
     return a dict if the line is valid.
     Otherwise, return None
+    To read whole log files in INFO_FORMATE / DEBUG_FORMATE, use xlogs.parser.LogParser
 
     ::
         dict_info:= {
@@ -474,8 +1220,7 @@ def parse_msg(log_line):
         content = log_line[log_line.find(']'):]
         content = content[(content.find(']') + 1):]
         content = content[(content.find(']') + 1):].strip()
-        regex = re.compile('[ \t]+')
-        items = regex.split(log_line)
+        items = _BLANKS.split(log_line)
         loglevel, date, time_, _, pid_tid, src = items[0:6]
         pid, tid = pid_tid.strip('[]').split(':')
         return {
@@ -493,33 +1238,33 @@ def parse_msg(log_line):
 
 
 def debug_if(bol, msg, back_trace_len=1):
-    """log msg with critical loglevel if bol is true"""
+    """log msg with debug loglevel if bol is true"""
     if bol:
-        logging.debug(msg, back_trace_len)
+        debug(msg, back_trace_len)
 
 
 def info_if(bol, msg, back_trace_len=1):
     """log msg with info loglevel if bol is true"""
     if bol:
-        logging.info(msg, back_trace_len)
+        info(msg, back_trace_len)
 
 
 def error_if(bol, msg, back_trace_len=1):
     """log msg with error loglevel if bol is true"""
     if bol:
-        logging.error(msg, back_trace_len)
+        error(msg, back_trace_len)
 
 
 def warn_if(bol, msg, back_trace_len=1):
-    """log msg with error loglevel if bol is true"""
+    """log msg with warning loglevel if bol is true"""
     if bol:
-        logging.warn(msg, back_trace_len)
+        warning(msg, back_trace_len)
 
 
 def critical_if(bol, msg, back_trace_len=1):
     """log msg with critical loglevel if bol is true"""
     if bol:
-        logging.critical(msg, back_trace_len)
+        critical(msg, back_trace_len)
 
 
 # ===================================================================
@@ -547,7 +1292,7 @@ def basic_config(log_file):
     #                     )
     console = logging.StreamHandler()
     console.setLevel(CONSOLE_LEVEL)
-    formatter = logging.Formatter(fmt=CONSOLE_FORMATE, datefmt=DATE_FORMATE)
+    formatter = FastFormatter(fmt=CONSOLE_FORMATE, datefmt=DATE_FORMATE)
     console.setFormatter(formatter)
     # add the handler to the root logger
     logging.getLogger('').addHandler(console)
@@ -565,67 +1310,3 @@ def init_config():
 # ===================================================================
 def json_config():
     pass
-
-
-# ===================================================================
-# --- unittest
-# ===================================================================
-
-class LogTestCase(unittest.TestCase):
-    """docstring for LogTestCase"""
-
-    def setUp(self):
-        pass
-
-    def tearDown(self):
-        pass
-
-    def test_1(self):
-        log_file = "test_1.log"
-        basic_config(log_file)
-        logger = logging.getLogger(__name__)
-        logger.info('test_1 start ...')
-        logger.warning('test_1 hello,world')
-        logger.debug('test_1 hello,world')
-        logger.error('test_1 hello,world')
-        logger.critical('test_1 hello,world')
-
-    def test_2(self):
-        logfile = "test_2.log"
-        logger = get_logger(logfile=logfile, logger_name='test2', debug=True)
-        logger.info('test_2 start ...')
-        logger.warning('test_2 hello,world')
-        logger.debug('test_2 hello,world')
-        logger.error('test_2 hello,world')
-        logger.critical('test_2 hello,world')
-
-    def test_2_2(self):
-        log_file = "test_2_2.log"
-        basic_config(log_file)
-        logger = logging.getLogger(__name__)
-        logger.info('test_2_2 start ...')
-        logger.warning('test_2_2 hello,world')
-        logger.debug('test_2_2 hello,world')
-        logger.error('test_2_2 hello,world')
-        logger.critical('test_2_2 hello,world')
-
-    def test_3(self):
-        logger = get_logger(logger_name='test2', logfile='test.log', reset=True)
-        logger.info('test_3 start ...')
-        logger.warning('test_3 hello,world')
-        logger.debug('test_3 hello,world')
-        logger.error('test_3 hello,world')
-        logger.critical('test_3 hello,world')
-        logger.log(21, 'test_3 hello,world')
-
-    def test_4(self):
-        logger = get_logger(logger_name='test2')
-        logger.info('test_4 start ...')
-        logger.warning('test_4 hello,world')
-
-
-if __name__ == '__main__':
-    # test
-    # unittest.main()
-    suite = unittest.TestLoader().loadTestsFromTestCase(LogTestCase)
-    unittest.TextTestRunner(verbosity=2).run(suite)